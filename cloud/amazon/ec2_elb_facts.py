@@ -28,6 +28,21 @@ options:
     required: false
     default: null
     aliases: ['elb_ids', 'ec2_elbs']
+  health:
+    description:
+      - Whether to query the health of the instances registered with each ELB. Set to C(no) to skip
+        the C(describe_instance_health) call per ELB; the C(instances_inservice*) and
+        C(instances_outofservice*) keys are then left out.
+    required: false
+    default: yes
+    version_added: "2.3"
+  workers:
+    description:
+      - Number of ELBs to gather facts about at the same time. Throttled requests are retried with
+        an exponential backoff. The ELBs are returned in the same order regardless.
+    required: false
+    default: 1
+    version_added: "2.3"
 extends_documentation_fragment:
     - aws
     - ec2
@@ -70,8 +85,18 @@ EXAMPLES = '''
     msg: "{{ item.dns_name }}"
   with_items: elb_facts.elbs
 
+# Gather facts about all ELBs of a large region, 10 at a time, without instance health
+- action:
+    module: ec2_elb_facts
+    health: no
+    workers: 10
+  register: elb_facts
+
 '''
 
+import random
+import threading
+import time
 import xml.etree.ElementTree as ET
 
 try:
@@ -131,7 +156,19 @@ def get_health_check(health_check):
     return health_check_dict
 
 
-def get_elb_info(connection,elb):
+def with_backoff(call, *args, **kwargs):
+    """Run call, retrying throttled requests with exponential backoff and jitter."""
+    retries = 6
+    for attempt in range(retries + 1):
+        try:
+            return call(*args, **kwargs)
+        except BotoServerError as e:
+            if e.error_code != 'Throttling' or attempt == retries:
+                raise
+            time.sleep(random.uniform(0, min(20, 0.5 * 2 ** attempt)))
+
+
+def get_elb_info(connection, elb, health=True):
     elb_info = {
         'name': elb.name,
         'zones': elb.availability_zones,
@@ -146,16 +183,21 @@ def get_elb_info(connection,elb):
         'security_groups': elb.security_groups,
         'health_check': get_health_check(elb.health_check),
         'subnets': elb.subnets,
+    }
+    if elb.vpc_id:
+        elb_info['vpc_id'] = elb.vpc_id
+    if not health:
+        return elb_info
+
+    elb_info.update({
         'instances_inservice': [],
         'instances_inservice_count': 0,
         'instances_outofservice': [],
         'instances_outofservice_count': 0,
         'instances_inservice_percent': 0.0,
-    }
-    if elb.vpc_id:
-        elb_info['vpc_id'] = elb.vpc_id
+    })
     if elb.instances:
-        instance_health = connection.describe_instance_health(elb.name)
+        instance_health = with_backoff(connection.describe_instance_health, elb.name)
         elb_info['instances_inservice'] = [inst.instance_id for inst in instance_health if inst.state == 'InService']
         elb_info['instances_inservice_count'] = len(elb_info['instances_inservice'])
         elb_info['instances_outofservice'] = [inst.instance_id for inst in instance_health if inst.state == 'OutOfService']
@@ -167,19 +209,65 @@ def get_elb_info(connection,elb):
     return elb_info
 
 
-def list_elb(connection, module):
+def gather_elb_info(connect, elbs, health, workers):
+    """Gather the facts of elbs over up to workers threads, each with its
+    own connection from connect(). Results keep the order of elbs."""
+    results = [None] * len(elbs)
+    errors = []
+    pending = list(enumerate(elbs))
+    lock = threading.Lock()
+
+    def worker():
+        try:
+            connection = connect()
+        except Exception as e:
+            errors.append(e)
+            return
+        while not errors:
+            lock.acquire()
+            try:
+                if not pending:
+                    return
+                index, elb = pending.pop(0)
+            finally:
+                lock.release()
+            try:
+                results[index] = get_elb_info(connection, elb, health)
+            except Exception as e:
+                errors.append(e)
+
+    threads = []
+    for i in range(min(workers, len(elbs))):
+        thread = threading.Thread(target=worker)
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+    return results
+
+
+def list_elb(connection, module, connect):
     elb_names = module.params.get("names")
     if not elb_names:
         elb_names = None
+    health = module.params.get("health")
+    workers = module.params.get("workers")
 
     try:
-        all_elbs = connection.get_all_load_balancers(elb_names)
+        all_elbs = with_backoff(connection.get_all_load_balancers, elb_names)
+        if workers > 1:
+            elb_array = gather_elb_info(connect, all_elbs, health, workers)
+        else:
+            elb_array = [get_elb_info(connection, elb, health) for elb in all_elbs]
     except BotoServerError as e:
         module.fail_json(msg = "%s: %s" % (e.error_code, e.error_message))
-
-    elb_array = []
-    for elb in all_elbs:
-        elb_array.append(get_elb_info(connection,elb))
+    except (boto.exception.NoAuthHandlerFound, AnsibleAWSError) as e:
+        # a worker could not open its own connection
+        module.fail_json(msg=str(e))
 
     module.exit_json(elbs=elb_array)
 
@@ -188,7 +276,9 @@ def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(
         dict(
-            names={'default': None, 'type': 'list'}
+            names={'default': None, 'type': 'list'},
+            health={'default': True, 'type': 'bool'},
+            workers={'default': 1, 'type': 'int'},
         )
     )
 
@@ -197,17 +287,25 @@ def main():
     if not HAS_BOTO:
         module.fail_json(msg='boto required for this module')
 
+    if module.params.get('workers') < 1:
+        module.fail_json(msg="workers must be at least 1")
+
     region, ec2_url, aws_connect_params = get_aws_connection_info(module)
 
+    # boto connections are not shared between threads, every worker
+    # gets its own
+    def connect():
+        return connect_to_aws(boto.ec2.elb, region, **aws_connect_params)
+
     if region:
         try:
-            connection = connect_to_aws(boto.ec2.elb, region, **aws_connect_params)
+            connection = connect()
         except (boto.exception.NoAuthHandlerFound, AnsibleAWSError), e:
             module.fail_json(msg=str(e))
     else:
         module.fail_json(msg="region must be specified")
 
-    list_elb(connection, module)
+    list_elb(connection, module, connect)
 
 from ansible.module_utils.basic import *
 from ansible.module_utils.ec2 import *
@@ -62,6 +62,12 @@ options:
     description:
       - "VPC ID of the VPC in which to create the route table."
     required: true
+  workers:
+    description:
+      - "Number of route create, replace and delete calls to run at the same time. Throttled calls are retried with an exponential backoff."
+    required: false
+    default: 1
+    version_added: "2.3"
 extends_documentation_fragment:
     - aws
     - ec2
@@ -105,7 +111,10 @@ EXAMPLES = '''
 
 
 import sys  # noqa
+import random
 import re
+import threading
+import time
 
 try:
     import boto.ec2
@@ -294,22 +303,37 @@ def rename_key(d, old_key, new_key):
     del d[old_key]
 
 
-def index_of_matching_route(route_spec, routes_to_match):
-    for i, route in enumerate(routes_to_match):
-        if route_spec_matches_route(route_spec, route):
-            return i
+def with_backoff(call, *args, **kwargs):
+    """
+    Runs call, retrying throttled requests with exponential backoff and
+    jitter.
 
+    Note that this function is duplicated in other ec2 modules, and should
+    potentially be moved into a shared module_utils
+    """
+    retries = 6
+    for attempt in range(retries + 1):
+        try:
+            return call(*args, **kwargs)
+        except EC2ResponseError as e:
+            if e.error_code not in ('RequestLimitExceeded', 'Throttling') or attempt == retries:
+                raise
+            time.sleep(random.uniform(0, min(20, 0.5 * 2 ** attempt)))
 
-def ensure_routes(vpc_conn, route_table, route_specs, propagating_vgw_ids,
-                  check_mode):
-    routes_to_match = list(route_table.routes)
-    route_specs_to_create = []
-    for route_spec in route_specs:
-        i = index_of_matching_route(route_spec, routes_to_match)
-        if i is None:
-            route_specs_to_create.append(route_spec)
-        else:
-            del routes_to_match[i]
+
+def plan_route_changes(route_table, route_specs, propagating_vgw_ids):
+    """
+    Computes the changes needed to converge the routes of route_table to
+    route_specs, as a list of (action, destination, route_spec) tuples.
+
+    Existing routes are grouped by destination. A destination can carry
+    more than one route (for example a propagated and a static one), so
+    the managed route is preferred. A wanted destination used only by
+    unmanaged routes raises AnsibleRouteTableException before any change.
+    """
+    routes_by_dest = {}
+    for route in route_table.routes:
+        routes_by_dest.setdefault(route.destination_cidr_block, []).append(route)
 
     # NOTE: As of boto==2.38.0, the origin of a route is not available
     # (for example, whether it came from a gateway with route propagation
@@ -317,31 +341,112 @@ def ensure_routes(vpc_conn, route_table, route_specs, propagating_vgw_ids,
     # correct than checking whether the route uses a propagating VGW.
     # The current logic will leave non-propagated routes using propagating
     # VGWs in place.
-    routes_to_delete = [r for r in routes_to_match
-                        if r.gateway_id != 'local'
-                        and r.gateway_id not in propagating_vgw_ids]
+    def is_managed(route):
+        return (route.gateway_id != 'local'
+                and route.gateway_id not in propagating_vgw_ids)
 
-    changed = routes_to_delete or route_specs_to_create
-    if changed:
-        for route_spec in route_specs_to_create:
-            try:
-                vpc_conn.create_route(route_table.id,
-                                      dry_run=check_mode,
-                                      **route_spec)
-            except EC2ResponseError as e:
-                if e.error_code == 'DryRunOperation':
-                    pass
+    changes = []
+    wanted = set()
+    for route_spec in route_specs:
+        dest = route_spec['destination_cidr_block']
+        wanted.add(dest)
+        routes = routes_by_dest.get(dest, [])
+        if not routes:
+            changes.append(('create', dest, route_spec))
+            continue
+        if [r for r in routes if route_spec_matches_route(route_spec, r)]:
+            continue
+        if [r for r in routes if is_managed(r)]:
+            changes.append(('replace', dest, route_spec))
+        else:
+            # creating another route would fail with RouteAlreadyExists
+            raise AnsibleRouteTableException(
+                'Destination {0} is only used by local or propagated routes, '
+                'which this module does not replace'.format(dest))
+
+    for dest, routes in routes_by_dest.items():
+        if dest not in wanted and [r for r in routes if is_managed(r)]:
+            changes.append(('delete', dest, None))
+
+    return changes
 
-        for route in routes_to_delete:
+
+def apply_route_change(vpc_conn, route_table_id, change, check_mode):
+    action, dest, route_spec = change
+    start = time.time()
+    try:
+        if action == 'create':
+            with_backoff(vpc_conn.create_route, route_table_id,
+                         dry_run=check_mode, **route_spec)
+        elif action == 'replace':
+            with_backoff(vpc_conn.replace_route, route_table_id,
+                         dry_run=check_mode, **route_spec)
+        else:
+            with_backoff(vpc_conn.delete_route, route_table_id, dest,
+                         dry_run=check_mode)
+    except EC2ResponseError as e:
+        if e.error_code != 'DryRunOperation':
+            raise
+    return {'dest': dest, 'action': action, 'seconds': time.time() - start}
+
+
+def apply_route_changes(vpc_conn, route_table_id, changes, check_mode,
+                        workers=1, connect=None):
+    """
+    Applies changes, running up to workers calls at the same time. Every
+    worker thread uses its own connection from connect(). Returns the
+    timing of every change, in the order of changes.
+    """
+    if workers <= 1 or len(changes) < 2 or connect is None:
+        return [apply_route_change(vpc_conn, route_table_id, change, check_mode)
+                for change in changes]
+
+    timings = [None] * len(changes)
+    errors = []
+    pending = list(enumerate(changes))
+    lock = threading.Lock()
+
+    def worker():
+        try:
+            conn = connect()
+        except Exception as e:
+            errors.append(e)
+            return
+        while not errors:
+            lock.acquire()
             try:
-                vpc_conn.delete_route(route_table.id,
-                                      route.destination_cidr_block,
-                                      dry_run=check_mode)
-            except EC2ResponseError as e:
-                if e.error_code == 'DryRunOperation':
-                    pass
+                if not pending:
+                    return
+                index, change = pending.pop(0)
+            finally:
+                lock.release()
+            try:
+                timings[index] = apply_route_change(conn, route_table_id,
+                                                    change, check_mode)
+            except Exception as e:
+                errors.append(e)
 
-    return {'changed': bool(changed)}
+    threads = []
+    for i in range(min(workers, len(changes))):
+        thread = threading.Thread(target=worker)
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+    return timings
+
+
+def ensure_routes(vpc_conn, route_table, route_specs, propagating_vgw_ids,
+                  check_mode, workers=1, connect=None):
+    changes = plan_route_changes(route_table, route_specs,
+                                 propagating_vgw_ids or [])
+    timings = apply_route_changes(vpc_conn, route_table.id, changes,
+                                  check_mode, workers, connect)
+    return {'changed': bool(changes), 'route_changes': timings}
 
 
 def ensure_subnet_association(vpc_conn, vpc_id, route_table_id, subnet_id,
@@ -474,7 +579,7 @@ def create_route_spec(connection, routes, vpc_id):
 
     return routes
 
-def ensure_route_table_present(connection, module):
+def ensure_route_table_present(connection, module, connect=None):
 
     lookup = module.params.get('lookup')
     propagating_vgw_ids = module.params.get('propagating_vgw_ids')
@@ -482,6 +587,7 @@ def ensure_route_table_present(connection, module):
     subnets = module.params.get('subnets')
     tags = module.params.get('tags')
     vpc_id = module.params.get('vpc_id')
+    workers = module.params.get('workers')
     try:
         routes = create_route_spec(connection, module.params.get('routes'), vpc_id)
     except AnsibleIgwSearchException as e:
@@ -489,6 +595,7 @@ def ensure_route_table_present(connection, module):
 
     changed = False
     tags_valid = False
+    route_changes = []
 
     if lookup == 'tag':
         if tags is not None:
@@ -519,8 +626,10 @@ def ensure_route_table_present(connection, module):
 
     if routes is not None:
         try:
-            result = ensure_routes(connection, route_table, routes, propagating_vgw_ids, module.check_mode)
+            result = ensure_routes(connection, route_table, routes, propagating_vgw_ids, module.check_mode,
+                                   workers=workers, connect=connect)
             changed = changed or result['changed']
+            route_changes = result['route_changes']
         except EC2ResponseError as e:
             module.fail_json(msg=e.message)
 
@@ -554,7 +663,8 @@ def ensure_route_table_present(connection, module):
                 .format(route_table, e)
             )
 
-    module.exit_json(changed=changed, route_table=get_route_table_info(route_table))
+    module.exit_json(changed=changed, route_table=get_route_table_info(route_table),
+                     route_changes=route_changes)
 
 
 def main():
@@ -568,7 +678,8 @@ def main():
             state = dict(default='present', choices=['present', 'absent']),
             subnets = dict(default=None, required=False, type='list'),
             tags = dict(default=None, required=False, type='dict', aliases=['resource_tags']),
-            vpc_id = dict(default=None, required=True)
+            vpc_id = dict(default=None, required=True),
+            workers = dict(default=1, required=False, type='int'),
         )
     )
 
@@ -579,9 +690,14 @@ def main():
 
     region, ec2_url, aws_connect_params = get_aws_connection_info(module)
 
+    # boto connections are not shared between threads, every worker
+    # gets its own
+    def connect():
+        return connect_to_aws(boto.vpc, region, **aws_connect_params)
+
     if region:
         try:
-            connection = connect_to_aws(boto.vpc, region, **aws_connect_params)
+            connection = connect()
         except (boto.exception.NoAuthHandlerFound, AnsibleAWSError), e:
             module.fail_json(msg=str(e))
     else:
@@ -596,7 +712,7 @@ def main():
 
     try:
         if state == 'present':
-            result = ensure_route_table_present(connection, module)
+            result = ensure_route_table_present(connection, module, connect)
         elif state == 'absent':
             result = ensure_route_table_absent(connection, module)
     except AnsibleRouteTableException as e:
@@ -67,14 +67,30 @@ options:
         required: false
     delay:
         description:
-          - The time to wait before checking that the service is available
+          - The longest time to wait between two checks of the service state. Checks start one
+            second apart and back off exponentially up to this value.
         required: false
         default: 10
     repeat:
         description:
-          - The number of times to check that the service is available
+          - The number of times to check that the service is deleted when C(state=deleting) and
+            I(wait_timeout) is not set; the overall deadline is I(delay) times I(repeat) seconds.
         required: false
         default: 10
+    wait:
+        description:
+          - Whether to wait for the service to settle. With C(state=present) this waits until the
+            running count equals the desired count and only one deployment is left; with
+            C(state=absent) until the service is inactive. C(state=deleting) always waits.
+        required: false
+        default: no
+        version_added: "2.3"
+    wait_timeout:
+        description:
+          - How many seconds to wait at most. Defaults to I(delay) times I(repeat) for C(state=deleting).
+        required: false
+        default: 300
+        version_added: "2.3"
 extends_documentation_fragment:
     - aws
     - ec2
@@ -100,6 +116,16 @@ EXAMPLES = '''
     name: default
     state: absent
     cluster: new_cluster
+
+# Deploy a new task definition and wait until the deployment is done
+- ecs_service:
+    name: default
+    state: present
+    cluster: new_cluster
+    task_definition: new_cluster-task:2
+    desired_count: 3
+    wait: yes
+    wait_timeout: 600
 '''
 
 RETURN = '''
@@ -175,6 +201,9 @@ ansible_facts:
             returned: when service existed and was deleted
             type: complex
 '''
+import random
+import time
+
 try:
     import boto
     import botocore
@@ -188,6 +217,58 @@ try:
 except ImportError:
     HAS_BOTO3 = False
 
+class EcsServiceWaiter:
+    """Waits for ECS services to reach a state"""
+
+    # describe_services accepts at most 10 services per call
+    batch_size = 10
+
+    def __init__(self, ecs, timeout=300, max_delay=10, delay=1):
+        self.ecs = ecs
+        self.timeout = timeout
+        self.max_delay = max(delay, max_delay)
+        self.delay = delay
+
+    @staticmethod
+    def is_inactive(service):
+        return service is None or service['status'] == 'INACTIVE'
+
+    @staticmethod
+    def is_stable(service):
+        return (service is not None and service['status'] == 'ACTIVE'
+            and service['runningCount'] == service['desiredCount']
+            and len(service.get('deployments', [])) == 1)
+
+    def describe(self, cluster, services):
+        """Describes services, returning a dict of service name to description or None if missing"""
+        found = {}
+        for i in range(0, len(services), self.batch_size):
+            batch = services[i:i + self.batch_size]
+            response = self.ecs.describe_services(cluster=cluster, services=batch)
+            for name in batch:
+                found[name] = None
+                for c in response['services']:
+                    if c['serviceName'] == name or c['serviceArn'].endswith(name):
+                        found[name] = c
+        return found
+
+    def wait(self, cluster, services, condition):
+        """Polls all services with one describe_services call per batch until condition
+        holds for each of them, backing off exponentially with jitter up to the deadline.
+        Returns the names of the services that did not get there and the last descriptions."""
+        deadline = time.time() + self.timeout
+        pending = list(services)
+        descriptions = {}
+        delay = self.delay
+        while True:
+            descriptions.update(self.describe(cluster, pending))
+            pending = [name for name in pending if not condition(descriptions[name])]
+            remaining = deadline - time.time()
+            if not pending or remaining <= 0:
+                return pending, descriptions
+            time.sleep(min(remaining, random.uniform(delay / 2.0, delay)))
+            delay = min(delay * 2, self.max_delay)
+
 class EcsServiceManager:
     """Handles ECS Services"""
 
@@ -301,7 +382,9 @@ def main():
         client_token=dict(required=False, type='str' ),
         role=dict(required=False, type='str' ),
         delay=dict(required=False, type='int', default=10),
-        repeat=dict(required=False, type='int', default=10)
+        repeat=dict(required=False, type='int', default=10),
+        wait=dict(required=False, type='bool', default=False),
+        wait_timeout=dict(required=False, type='int')
     ))
 
     module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
@@ -318,6 +401,10 @@ def main():
         if not 'desired_count' in module.params and module.params['desired_count'] is None:
             module.fail_json(msg="To use create a service, a desired_count must be specified")
 
+    wait_timeout = module.params['wait_timeout']
+    if wait_timeout is None:
+        wait_timeout = 300
+
     service_mgr = EcsServiceManager(module)
     try:
         existing = service_mgr.describe_service(module.params['cluster'], module.params['name'])
@@ -374,6 +461,13 @@ def main():
 
             results['changed'] = True
 
+        if module.params['wait'] and not module.check_mode:
+            waiter = EcsServiceWaiter(service_mgr.ecs, wait_timeout, module.params['delay'])
+            pending, descriptions = waiter.wait(module.params['cluster'], [module.params['name']], waiter.is_stable)
+            if pending:
+                module.fail_json(msg="Service '"+module.params['name']+"' not stable after "+str(wait_timeout)+" seconds.")
+            results['service'] = service_mgr.jsonize(descriptions[module.params['name']])
+
     elif module.params['state'] == 'absent':
         if not existing:
             pass
@@ -394,6 +488,11 @@ def main():
                         )
                     except botocore.exceptions.ClientError, e:
                         module.fail_json(msg=e.message)
+                    if module.params['wait']:
+                        waiter = EcsServiceWaiter(service_mgr.ecs, wait_timeout, module.params['delay'])
+                        pending, descriptions = waiter.wait(module.params['cluster'], [module.params['name']], waiter.is_inactive)
+                        if pending:
+                            module.fail_json(msg="Service '"+module.params['name']+"' not deleted after "+str(wait_timeout)+" seconds.")
                 results['changed'] = True
 
     elif module.params['state'] == 'deleting':
@@ -404,17 +503,15 @@ def main():
         # return info about the cluster deleted
         delay = module.params['delay']
         repeat = module.params['repeat']
-        time.sleep(delay)
-        for i in range(repeat):
-            existing = service_mgr.describe_service(module.params['cluster'], module.params['name'])
-            status = existing['status']
-            if status == "INACTIVE":
-                results['changed'] = True
-                break
-            time.sleep(delay)
-        if i is repeat-1:
-            module.fail_json(msg="Service still not deleted after "+str(repeat)+" tries of "+str(delay)+" seconds each.")
+        timeout = module.params['wait_timeout']
+        if timeout is None:
+            timeout = delay * repeat
+        waiter = EcsServiceWaiter(service_mgr.ecs, timeout, delay)
+        pending, descriptions = waiter.wait(module.params['cluster'], [module.params['name']], waiter.is_inactive)
+        if pending:
+            module.fail_json(msg="Service still not deleted after "+str(timeout)+" seconds.")
             return
+        results['changed'] = True
 
     module.exit_json(**results)
 
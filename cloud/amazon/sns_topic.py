@@ -66,6 +66,30 @@ options:
         Blame Amazon."
     required: False
     default: True
+  account_id:
+    description:
+      - ID of the AWS account owning the topic. When set, the topic ARN is built
+        from the account, region and name instead of listing all topics of the
+        account to find it.
+    required: False
+    default: None
+    version_added: "2.3"
+  topic_cache_ttl:
+    description:
+      - Number of seconds the name to ARN index of the topics of the account is
+        cached in I(topic_cache_path), so that later tasks do not need to list
+        all topics again. Cached ARNs are checked before use and the cache is
+        updated when this module creates or deletes a topic. C(0) disables the
+        cache.
+    required: False
+    default: 0
+    version_added: "2.3"
+  topic_cache_path:
+    description:
+      - File the topic index is cached in.
+    required: False
+    default: "~/.ansible/tmp/sns_topics.json"
+    version_added: "2.3"
 extends_documentation_fragment: aws
 requirements: [ "boto" ]
 """
@@ -94,6 +118,12 @@ EXAMPLES = """
       - endpoint: "my_mobile_number"
         protocol: "sms"
 
+- name: Converge a topic without listing every topic of the account
+  sns_topic:
+    name: "alarms"
+    account_id: "123456789012"
+    display_name: "alarm SNS topic"
+
 """
 
 RETURN = '''
@@ -125,7 +155,10 @@ sns_topic:
 import sys
 import time
 import json
+import hashlib
+import os
 import re
+import tempfile
 
 try:
     import boto.sns
@@ -149,6 +182,9 @@ class SnsTopicManager(object):
                  purge_subscriptions,
                  check_mode,
                  region,
+                 account_id=None,
+                 cache_ttl=0,
+                 cache_path=None,
                  **aws_connect_params):
 
         self.region = region
@@ -171,6 +207,14 @@ class SnsTopicManager(object):
         self.topic_deleted = False
         self.arn_topic = None
         self.attributes_set = []
+        self.account_id = account_id
+        self.cache_ttl = cache_ttl
+        self.cache_path = os.path.expanduser(cache_path or '~/.ansible/tmp/sns_topics.json')
+        self.arn_given = None
+        if name.startswith('arn:'):
+            # topic names cannot have colons, the name is the last field
+            self.arn_given = name
+            self.name = name.split(':')[-1]
 
     def _get_boto_connection(self):
         try:
@@ -186,7 +230,7 @@ class SnsTopicManager(object):
             try:
                 response = self.connection.get_all_topics(next_token)
             except BotoServerError, err:
-                module.fail_json(msg=err.message)
+                self.module.fail_json(msg=err.message)
             topics.extend(response['ListTopicsResponse']['ListTopicsResult']['Topics'])
             next_token = response['ListTopicsResponse']['ListTopicsResult']['NextToken']
             if not next_token:
@@ -194,24 +238,111 @@ class SnsTopicManager(object):
         return [t['TopicArn'] for t in topics]
 
 
+    def _cache_key(self):
+        # one index per region and account, or per credentials when the
+        # account is not known
+        if self.account_id:
+            owner = self.account_id
+        else:
+            owner = '%s/%s' % (self.aws_connect_params.get('aws_access_key_id'),
+                               self.aws_connect_params.get('profile_name'))
+        return hashlib.sha1(('%s/%s' % (self.region, owner)).encode('utf-8')).hexdigest()
+
+    def _load_cache(self):
+        try:
+            f = open(self.cache_path)
+            try:
+                return json.load(f)
+            finally:
+                f.close()
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def _save_cache(self, index, created=None):
+        cache = self._load_cache()
+        cache[self._cache_key()] = {'created': created or time.time(), 'topics': index}
+        cache_dir = os.path.dirname(self.cache_path)
+        try:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir, 0o700)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir)
+            f = os.fdopen(fd, 'w')
+            try:
+                json.dump(cache, f)
+            finally:
+                f.close()
+            os.rename(tmp_path, self.cache_path)
+        except (IOError, OSError):
+            # the cache is only an optimization
+            pass
+
+    def _cached_index(self):
+        entry = self._load_cache().get(self._cache_key())
+        if entry and time.time() - entry['created'] <= self.cache_ttl:
+            return entry['topics']
+        return None
+
+    def _update_cache(self, arn_topic=None):
+        # keep a fresh cached index in line with topics created or deleted
+        # by this module
+        if self.cache_ttl <= 0:
+            return
+        entry = self._load_cache().get(self._cache_key())
+        if not entry or time.time() - entry['created'] > self.cache_ttl:
+            return
+        if arn_topic:
+            entry['topics'][self.name] = arn_topic
+        else:
+            entry['topics'].pop(self.name, None)
+        self._save_cache(entry['topics'], entry['created'])
+
+    def _topic_exists(self, arn_topic):
+        try:
+            self.connection.get_topic_attributes(arn_topic)
+        except BotoServerError, err:
+            if err.error_code == 'NotFound':
+                return False
+            raise
+        return True
+
+    def _build_arn(self):
+        if self.region.startswith('cn-'):
+            partition = 'aws-cn'
+        elif self.region.startswith('us-gov-'):
+            partition = 'aws-us-gov'
+        else:
+            partition = 'aws'
+        return 'arn:%s:sns:%s:%s:%s' % (partition, self.region, self.account_id, self.name)
+
     def _arn_topic_lookup(self):
+        if self.arn_given or self.account_id:
+            arn_topic = self.arn_given or self._build_arn()
+            if self._topic_exists(arn_topic):
+                return arn_topic
+            return None
+
+        if self.cache_ttl > 0:
+            index = self._cached_index()
+            if index is not None:
+                arn_topic = index.get(self.name)
+                if arn_topic is None or self._topic_exists(arn_topic):
+                    return arn_topic
+
         # topic names cannot have colons, so this captures the full topic name
         all_topics = self._get_all_topics()
-        lookup_topic = ':%s' % self.name
-        for topic in all_topics:
-            if topic.endswith(lookup_topic):
-                return topic
+        index = dict((topic.split(':')[-1], topic) for topic in all_topics)
+        if self.cache_ttl > 0:
+            self._save_cache(index)
+        return index.get(self.name)
 
 
     def _create_topic(self):
         self.changed = True
         self.topic_created = True
         if not self.check_mode:
-            self.connection.create_topic(self.name)
-            self.arn_topic = self._arn_topic_lookup()
-            while not self.arn_topic:
-                time.sleep(3)
-                self.arn_topic = self._arn_topic_lookup()
+            response = self.connection.create_topic(self.name)
+            self.arn_topic = response['CreateTopicResponse']['CreateTopicResult']['TopicArn']
+            self._update_cache(self.arn_topic)
 
 
     def _set_topic_attrs(self):
@@ -300,14 +431,18 @@ class SnsTopicManager(object):
         self.changed = True
         if not self.check_mode:
             self.connection.delete_topic(self.arn_topic)
+            self._update_cache()
 
 
     def ensure_ok(self):
         self.arn_topic = self._arn_topic_lookup()
         if not self.arn_topic:
             self._create_topic()
-        self._set_topic_attrs()
-        self._get_topic_subs()
+        if self.arn_topic:
+            self._set_topic_attrs()
+        # without purging, only the desired subscriptions need checking
+        if self.arn_topic and (self.subscriptions or self.purge_subscriptions):
+            self._get_topic_subs()
         self._set_topic_subs()
 
     def ensure_gone(self):
@@ -353,6 +488,9 @@ def main():
             delivery_policy=dict(type='dict', required=False),
             subscriptions=dict(default=[], type='list', required=False),
             purge_subscriptions=dict(type='bool', default=True),
+            account_id=dict(type='str', required=False),
+            topic_cache_ttl=dict(type='int', default=0),
+            topic_cache_path=dict(type='str', default='~/.ansible/tmp/sns_topics.json'),
         )
     )
 
@@ -385,6 +523,9 @@ def main():
                                 purge_subscriptions,
                                 check_mode,
                                 region,
+                                account_id=module.params.get('account_id'),
+                                cache_ttl=module.params.get('topic_cache_ttl'),
+                                cache_path=module.params.get('topic_cache_path'),
                                 **aws_connect_params)
 
     if state == 'present':
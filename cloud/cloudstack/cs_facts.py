@@ -41,6 +41,28 @@ options:
       - cloudstack_local_ipv4
       - cloudstack_instance_id
       - cloudstack_user_data
+  timeout:
+    description:
+      - Timeout in seconds of each request to the metadata API, the requests are made at the same time.
+    required: false
+    default: 3
+    version_added: '2.3'
+  cache_ttl:
+    description:
+      - Number of seconds the IP of the metadata API and the facts not changing during the life of an
+        instance (C(cloudstack_instance_id) and C(cloudstack_availability_zone)) are kept in C(cache_path)
+        and reused.
+      - 0 disables the cache.
+      - Do not enable the cache on instances used to create templates, a new instance would use the cached facts.
+    required: false
+    default: 0
+    version_added: '2.3'
+  cache_path:
+    description:
+      - Path of the cache file.
+    required: false
+    default: '~/.ansible/tmp/cs_facts.json'
+    version_added: '2.3'
 requirements: [ 'yaml' ]
 '''
 
@@ -52,6 +74,10 @@ EXAMPLES = '''
 # Gather specific fact on instances
 - name: Gather cloudstack facts
   cs_facts: filter=cloudstack_instance_id
+
+# Reuse the instance id and zone for a day
+- name: Gather cloudstack facts
+  cs_facts: cache_ttl=86400
 '''
 
 RETURN = '''
@@ -98,7 +124,11 @@ cloudstack_user_data:
   sample: { "bla": "foo" }
 '''
 
+import json
 import os
+import tempfile
+import threading
+import time
 
 try:
     import yaml
@@ -109,10 +139,16 @@ except ImportError:
 CS_METADATA_BASE_URL = "http://%s/latest/meta-data"
 CS_USERDATA_BASE_URL = "http://%s/latest/user-data"
 
+# facts not changing during the life of an instance, these are kept in the cache
+CS_CACHED_FACTS = [
+    'cloudstack_instance_id',
+    'cloudstack_availability_zone',
+]
+
 class CloudStackFacts(object):
 
     def __init__(self):
-        self.facts = ansible_facts(module)
+        self.facts = None
         self.api_ip = None
         self.fact_paths = {
             'cloudstack_service_offering':  'service-offering',
@@ -125,43 +161,123 @@ class CloudStackFacts(object):
         }
 
     def run(self):
-        result = {}
         filter = module.params.get('filter')
-        if not filter:
-            for key,path in self.fact_paths.iteritems():
-                result[key] = self._fetch(CS_METADATA_BASE_URL + "/" + path)
-            result['cloudstack_user_data'] = self._get_user_data_json()
+        if filter:
+            keys = [filter]
         else:
-            if filter == 'cloudstack_user_data':
-                result['cloudstack_user_data'] = self._get_user_data_json()
-            elif filter in self.fact_paths:
-                result[filter] = self._fetch(CS_METADATA_BASE_URL + "/" + self.fact_paths[filter])
+            keys = self.fact_paths.keys() + ['cloudstack_user_data']
+
+        cache = self._load_cache()
+        result = {}
+        for key in keys:
+            if key in CS_CACHED_FACTS and key in cache.get('facts', {}):
+                result[key] = cache['facts'][key]
+        self.api_ip = cache.get('api_ip')
+
+        missing = [key for key in keys if key not in result]
+        if missing:
+            result.update(self._fetch_facts(missing))
+            if cache.get('api_ip') and all(result[key] is None for key in missing):
+                # the cached IP may be of a replaced router, look it up again
+                self.api_ip = None
+                result.update(self._fetch_facts(missing))
+            self._save_cache(cache, result)
+
+        if 'cloudstack_user_data' in result:
+            result['cloudstack_user_data'] = self._get_user_data_json(result['cloudstack_user_data'])
         return result
 
 
-    def _get_user_data_json(self):
+    def _get_user_data_json(self, data):
         try:
             # this data come form users, we try what we can to parse it...
-            return yaml.load(self._fetch(CS_USERDATA_BASE_URL))
+            return yaml.load(data)
         except:
             return None
 
 
-    def _fetch(self, path):
+    def _fetch_facts(self, keys):
+        """Fetch the facts of keys from the metadata API, all at the same time."""
+        result = dict((key, None) for key in keys)
         api_ip = self._get_api_ip()
         if not api_ip:
-            return None
-        api_url = path % api_ip
-        (response, info) = fetch_url(module, api_url, force=True)
+            return result
+
+        threads = []
+        for key in keys:
+            if key == 'cloudstack_user_data':
+                path = CS_USERDATA_BASE_URL
+            else:
+                path = CS_METADATA_BASE_URL + "/" + self.fact_paths[key]
+            thread = threading.Thread(target=self._fetch, args=(path % api_ip, key, result))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        return result
+
+
+    def _fetch(self, api_url, key, result):
+        (response, info) = fetch_url(module, api_url, force=True, timeout=module.params.get('timeout'))
         if response:
-            data = response.read()
-        else:
-            data = None
-        return data
+            result[key] = response.read()
+
+
+    def _load_cache(self):
+        """Return the cached API IP and facts if younger than cache_ttl."""
+        cache_ttl = module.params.get('cache_ttl')
+        if cache_ttl <= 0:
+            return {}
+        try:
+            f = open(os.path.expanduser(module.params.get('cache_path')))
+            try:
+                cache = json.load(f)
+            finally:
+                f.close()
+        except (IOError, OSError, ValueError):
+            return {}
+        if not isinstance(cache, dict) or time.time() - cache.get('time', 0) >= cache_ttl:
+            return {}
+        return cache
+
+
+    def _save_cache(self, cache, result):
+        if module.params.get('cache_ttl') <= 0:
+            return
+        facts = {}
+        for key in CS_CACHED_FACTS:
+            if result.get(key) is not None:
+                facts[key] = result[key]
+            elif key in cache.get('facts', {}):
+                facts[key] = cache['facts'][key]
+        cache = {
+            'time': cache.get('time', time.time()),
+            'api_ip': self.api_ip,
+            'facts': facts,
+        }
+        cache_path = os.path.expanduser(module.params.get('cache_path'))
+        try:
+            cache_dir = os.path.dirname(cache_path)
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir, 0o700)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir)
+            f = os.fdopen(fd, 'w')
+            try:
+                json.dump(cache, f)
+            finally:
+                f.close()
+            os.rename(tmp_path, cache_path)
+        except (IOError, OSError):
+            # the cache is only an optimization
+            pass
 
 
     def _get_dhcp_lease_file(self):
         """Return the path of the lease file."""
+        if self.facts is None:
+            # only needed to find the lease file, which is not looked up with a cached API IP
+            self.facts = ansible_facts(module)
         default_iface = self.facts['default_ipv4']['interface']
         dhcp_lease_file_locations = [
             '/var/lib/dhcp/dhclient.%s.leases' % default_iface, # debian / ubuntu
@@ -204,6 +320,9 @@ def main():
                 'cloudstack_instance_id',
                 'cloudstack_user_data',
             ]),
+            timeout = dict(type='int', default=3),
+            cache_ttl = dict(type='int', default=0),
+            cache_path = dict(default='~/.ansible/tmp/cs_facts.json'),
         ),
         supports_check_mode=False
     )
@@ -110,6 +110,31 @@ options:
       - Poll async jobs until job has finished.
     required: false
     default: true
+  poll_timeout:
+    description:
+      - Seconds to wait for the async jobs of C(rules) to finish when C(poll_async) is true.
+    required: false
+    default: 3600
+    version_added: "2.3"
+  rules:
+    description:
+      - List of rules of C(type) to manage in one task, dicts with the keys C(protocol), C(cidr),
+        C(start_port) (alias C(port)), C(end_port), C(icmp_type) and C(icmp_code), which default like
+        the options of the same name.
+      - The firewall rules of the IP address or network are listed once, the rules to add or remove
+        are then created or deleted with all jobs running at the same time.
+      - With C(state=present) missing rules are added, with C(state=absent) existing rules are removed.
+      - Mutually exclusive with the single rule options.
+    required: false
+    default: null
+    version_added: '2.3'
+  purge_rules:
+    description:
+      - Whether rules of C(type) not in C(rules) are removed from the IP address or network, used with C(state=present).
+      - Duplicates of a rule in C(rules) are removed as well, keeping one.
+    required: false
+    default: false
+    version_added: '2.3'
 extends_documentation_fragment: cloudstack
 '''
 
@@ -154,6 +179,17 @@ EXAMPLES = '''
     type: egress
     port: 80
     cidr: 10.101.1.20
+
+# Ensure the inbound rules of 4.3.2.1 are exactly these
+- local_action:
+    module: cs_firewall
+    ip_address: 4.3.2.1
+    purge_rules: yes
+    rules:
+      - { port: 80 }
+      - { port: 443 }
+      - { port: 22, cidr: 10.0.0.0/8 }
+      - { protocol: icmp, icmp_type: 8 }
 '''
 
 RETURN = '''
@@ -208,11 +244,30 @@ network:
   returned: success
   type: string
   sample: my_network
+rules_added:
+  description: Rules created, in the form of C(rules).
+  returned: success and rules is defined
+  type: list
+  sample: '[ { "protocol": "tcp", "start_port": 443, "end_port": 443, "cidr": "0.0.0.0/0" } ]'
+rules_removed:
+  description: Rules deleted, in the form of C(rules).
+  returned: success and rules is defined
+  type: list
+  sample: '[ { "protocol": "tcp", "start_port": 8080, "end_port": 8080, "cidr": "0.0.0.0/0" } ]'
 '''
 
+import time
+
 # import cloudstack common
 from ansible.module_utils.cloudstack import *
 
+# seconds between polls of pending async jobs, growing while no job finishes
+CS_POLL_INTERVAL_MIN = 0.5
+CS_POLL_INTERVAL_MAX = 8
+
+# fields of a rule, in the order of the rule keys
+RULE_FIELDS = ['protocol', 'start_port', 'end_port', 'icmp_type', 'icmp_code', 'cidr']
+
 
 class AnsibleCloudStackFirewall(AnsibleCloudStack):
 
@@ -250,22 +305,7 @@ class AnsibleCloudStackFirewall(AnsibleCloudStack):
             if protocol == 'all' and fw_type != 'egress':
                 self.module.fail_json(msg="protocol 'all' could only be used for type 'egress'" )
 
-            args                = {}
-            args['account']     = self.get_account('name')
-            args['domainid']    = self.get_domain('id')
-            args['projectid']   = self.get_project('id')
-
-            if fw_type == 'egress':
-                args['networkid'] = self.get_network(key='id')
-                if not args['networkid']:
-                    self.module.fail_json(msg="missing required argument for type egress: network")
-                firewall_rules = self.cs.listEgressFirewallRules(**args)
-            else:
-                args['ipaddressid'] = self.get_ip_address('id')
-                if not args['ipaddressid']:
-                    self.module.fail_json(msg="missing required argument for type ingress: ip_address")
-                firewall_rules = self.cs.listFirewallRules(**args)
-
+            firewall_rules = self._list_firewall_rules()
             if firewall_rules and 'firewallrule' in firewall_rules:
                 for rule in firewall_rules['firewallrule']:
                     type_match = self._type_cidr_match(rule, cidr)
@@ -280,6 +320,26 @@ class AnsibleCloudStackFirewall(AnsibleCloudStack):
         return self.firewall_rule
 
 
+    def _list_firewall_rules(self):
+        fw_type = self.module.params.get('type')
+
+        args                = {}
+        args['account']     = self.get_account('name')
+        args['domainid']    = self.get_domain('id')
+        args['projectid']   = self.get_project('id')
+
+        if fw_type == 'egress':
+            args['networkid'] = self.get_network(key='id')
+            if not args['networkid']:
+                self.module.fail_json(msg="missing required argument for type egress: network")
+            return self.cs.listEgressFirewallRules(**args)
+        else:
+            args['ipaddressid'] = self.get_ip_address('id')
+            if not args['ipaddressid']:
+                self.module.fail_json(msg="missing required argument for type ingress: ip_address")
+            return self.cs.listFirewallRules(**args)
+
+
     def _tcp_udp_match(self, rule, protocol, start_port, end_port):
         return protocol in ['tcp', 'udp'] \
             and protocol == rule['protocol'] \
@@ -359,6 +419,162 @@ class AnsibleCloudStackFirewall(AnsibleCloudStack):
         return firewall_rule
 
 
+    def _get_rule_key(self, protocol, start_port, end_port, icmp_type, icmp_code, cidr):
+        # rules are equal if their keys are, fields not considered for the protocol are None
+        protocol = protocol.lower()
+        cidr = ','.join(sorted(c.strip() for c in cidr.split(',')))
+        if protocol in ['tcp', 'udp']:
+            return (protocol, int(start_port), int(end_port), None, None, cidr)
+        if protocol == 'icmp':
+            # CloudStack reports an ICMP type or code left unset as -1
+            if icmp_type is None:
+                icmp_type = -1
+            if icmp_code is None:
+                icmp_code = -1
+            return (protocol, None, None, int(icmp_type), int(icmp_code), cidr)
+        return (protocol, None, None, None, None, cidr)
+
+
+    def _get_wanted_rule_keys(self):
+        fw_type = self.module.params.get('type')
+        keys = []
+        for rule in self.module.params.get('rules'):
+            if not isinstance(rule, dict) or set(rule) - set(RULE_FIELDS + ['port']):
+                self.module.fail_json(msg="rules must be dicts with the keys %s: %s" % (', '.join(RULE_FIELDS), rule))
+            protocol   = rule.get('protocol', 'tcp')
+            start_port = rule.get('start_port', rule.get('port'))
+            end_port   = rule.get('end_port', start_port)
+            icmp_type  = rule.get('icmp_type')
+
+            if protocol not in ['tcp', 'udp', 'icmp', 'all']:
+                self.module.fail_json(msg="unsupported protocol '%s' in rule: %s" % (protocol, rule))
+            if protocol in ['tcp', 'udp'] and (start_port is None or end_port is None):
+                self.module.fail_json(msg="missing required argument for protocol '%s' in rule: start_port or end_port: %s" % (protocol, rule))
+            if protocol == 'icmp' and icmp_type is None:
+                self.module.fail_json(msg="missing required argument for protocol 'icmp' in rule: icmp_type: %s" % rule)
+            if protocol == 'all' and fw_type != 'egress':
+                self.module.fail_json(msg="protocol 'all' could only be used for type 'egress': %s" % rule)
+
+            key = self._get_rule_key(protocol, start_port, end_port, icmp_type, rule.get('icmp_code'),
+                                     rule.get('cidr', '0.0.0.0/0'))
+            if key not in keys:
+                keys.append(key)
+        return keys
+
+
+    # copied in cs_instance, cs_firewall, cs_securitygroup_rule and cs_loadbalancer_rule_member
+    # as module_utils.cloudstack has no batch poll; keep the copies in sync
+    def poll_jobs(self, jobs):
+        # poll all pending jobs in turn for up to poll_timeout seconds,
+        # returns a dict of job id to the job result and the time the job was seen finished
+        results = {}
+        pending = list(jobs)
+        interval = CS_POLL_INTERVAL_MIN
+        deadline = time.time() + self.module.params.get('poll_timeout')
+        while pending:
+            finished = False
+            for job in list(pending):
+                res = self.cs.queryAsyncJobResult(jobid=job['jobid'])
+                if 'errortext' in res:
+                    self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
+                if res['jobstatus'] != 0 and 'jobresult' in res:
+                    pending.remove(job)
+                    finished = True
+                    results[job['jobid']] = (res['jobresult'], time.time())
+            if pending:
+                if time.time() >= deadline:
+                    self.module.fail_json(msg="Timed out waiting for async jobs: %s" % ", ".join([job['jobid'] for job in pending]))
+                # poll again soon while jobs are finishing, back off while they are not
+                if finished:
+                    interval = CS_POLL_INTERVAL_MIN
+                else:
+                    interval = min(interval * 2, CS_POLL_INTERVAL_MAX)
+                time.sleep(min(interval, max(deadline - time.time(), 0)))
+        return results
+
+
+    def ensure_rules(self):
+        fw_type = self.module.params.get('type')
+        state = self.module.params.get('state')
+
+        existing = {}
+        firewall_rules = self._list_firewall_rules()
+        if firewall_rules and 'firewallrule' in firewall_rules:
+            for rule in firewall_rules['firewallrule']:
+                key = self._get_rule_key(rule['protocol'], rule.get('startport'), rule.get('endport'),
+                                         rule.get('icmptype'), rule.get('icmpcode'), rule['cidrlist'])
+                existing.setdefault(key, []).append(rule)
+
+        wanted = self._get_wanted_rule_keys()
+        if state == 'absent':
+            to_add = []
+            to_remove = [(k, rule) for k in wanted for rule in existing.get(k, [])]
+        else:
+            to_add = [k for k in wanted if k not in existing]
+            to_remove = []
+            if self.module.params.get('purge_rules'):
+                # duplicates of a wanted rule are removed too, keeping one of them
+                for k, rules in existing.items():
+                    if k in wanted:
+                        rules = rules[1:]
+                    to_remove.extend([(k, rule) for rule in rules])
+
+        if to_add or to_remove:
+            self.result['changed'] = True
+        if not self.module.check_mode:
+            jobs = []
+            for key in to_add:
+                rule = dict(zip(RULE_FIELDS, key))
+                args                = {}
+                args['cidrlist']    = rule['cidr']
+                args['protocol']    = rule['protocol']
+                args['startport']   = rule['start_port']
+                args['endport']     = rule['end_port']
+                args['icmptype']    = rule['icmp_type']
+                args['icmpcode']    = rule['icmp_code']
+                if fw_type == 'egress':
+                    args['networkid'] = self.get_network(key='id')
+                    res = self.cs.createEgressFirewallRule(**args)
+                else:
+                    args['ipaddressid'] = self.get_ip_address('id')
+                    res = self.cs.createFirewallRule(**args)
+                if 'errortext' in res:
+                    self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
+                jobs.append(res)
+
+            for key, existing_rule in to_remove:
+                if fw_type == 'egress':
+                    res = self.cs.deleteEgressFirewallRule(id=existing_rule['id'])
+                else:
+                    res = self.cs.deleteFirewallRule(id=existing_rule['id'])
+                if 'errortext' in res:
+                    self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
+                jobs.append(res)
+
+            if self.module.params.get('poll_async'):
+                errors = []
+                job_results = self.poll_jobs(jobs)
+                for job in jobs:
+                    job_result = job_results[job['jobid']][0]
+                    if 'errortext' in job_result:
+                        errors.append(job_result['errortext'])
+                if errors:
+                    self.module.fail_json(msg="Failed: '%s'" % "', '".join(errors))
+
+        self.result['type'] = fw_type
+        if fw_type == 'egress':
+            self.result['network'] = self.get_network(key='displaytext')
+        else:
+            self.result['ip_address'] = self.module.params.get('ip_address')
+        self.result['rules_added'] = [self._get_rule_result(k) for k in to_add]
+        self.result['rules_removed'] = [self._get_rule_result(k) for k, rule in to_remove]
+        return self.result
+
+
+    def _get_rule_result(self, key):
+        return dict((field, value) for field, value in zip(RULE_FIELDS, key) if value is not None)
+
+
     def get_result(self, firewall_rule):
         super(AnsibleCloudStackFirewall, self).get_result(firewall_rule)
         if firewall_rule:
@@ -386,6 +602,9 @@ def main():
         account = dict(default=None),
         project = dict(default=None),
         poll_async = dict(type='bool', default=True),
+        poll_timeout = dict(type='int', default=3600),
+        rules = dict(type='list', default=None),
+        purge_rules = dict(type='bool', default=False),
     ))
 
     required_together = cs_required_together()
@@ -403,6 +622,12 @@ def main():
             ['icmp_type', 'start_port'],
             ['icmp_type', 'end_port'],
             ['ip_address', 'network'],
+            ['rules', 'protocol'],
+            ['rules', 'cidr'],
+            ['rules', 'start_port'],
+            ['rules', 'end_port'],
+            ['rules', 'icmp_type'],
+            ['rules', 'icmp_code'],
         ),
         supports_check_mode=True
     )
@@ -411,6 +636,10 @@ def main():
         acs_fw = AnsibleCloudStackFirewall(module)
 
         state = module.params.get('state')
+        if module.params.get('rules') is not None:
+            result = acs_fw.ensure_rules()
+            module.exit_json(**result)
+
         if state in ['absent']:
             fw_rule = acs_fw.remove_firewall_rule()
         else:
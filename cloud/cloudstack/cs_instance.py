@@ -209,6 +209,38 @@ options:
       - Poll async jobs until job has finished.
     required: false
     default: true
+  poll_timeout:
+    description:
+      - Seconds to wait for the async jobs of C(instances) to finish when C(poll_async) is true.
+    required: false
+    default: 3600
+    version_added: "2.3"
+  instances:
+    description:
+      - List of instances to deploy, start or stop in one task, either names or dicts with the keys
+        C(name), C(display_name), C(ip_address) and C(ip6_address).
+      - All other options apply to every instance.
+      - The async jobs of all instances are submitted first and then polled together.
+      - Only supported with C(state=present), C(state=deployed), C(state=started) and C(state=stopped).
+      - Settings of an existing instance needing a stop to be changed are applied one instance after the other.
+      - Mutually exclusive with C(name), C(display_name), C(ip_address) and C(ip6_address).
+    required: false
+    default: null
+    version_added: '2.3'
+  cache_ttl:
+    description:
+      - Number of seconds the offerings, templates and ISOs listed by previous tasks are reused.
+      - When greater than 0 all of them are listed once and looked up in the cached listing.
+      - 0 disables the cache, the lookups are then filtered by the API.
+    required: false
+    default: 0
+    version_added: '2.3'
+  cache_dir:
+    description:
+      - Directory holding the cache files, one per API endpoint and key.
+    required: false
+    default: '~/.ansible/tmp/cloudstack_cache'
+    version_added: '2.3'
 extends_documentation_fragment: cloudstack
 '''
 
@@ -265,6 +297,25 @@ EXAMPLES = '''
       - {'network': NetworkA, 'ip': '10.1.1.1'}
       - {'network': NetworkB, 'ip': '192.168.1.1'}
 
+# Reuse the listing of offerings and templates for an hour across tasks
+- local_action:
+    module: cs_instance
+    name: web-vm-2
+    template: Linux Debian 7 64-bit
+    service_offering: Tiny
+    cache_ttl: 3600
+
+# Deploy and start several instances, polling their jobs together
+- local_action:
+    module: cs_instance
+    instances:
+      - web-vm-3
+      - web-vm-4
+      - { name: web-vm-5, ip_address: 10.1.1.5 }
+    template: Linux Debian 7 64-bit
+    service_offering: Tiny
+    state: started
+
 # Ensure an instance is stopped
 - local_action: cs_instance name=web-vm-1 state=stopped
 
@@ -392,13 +443,35 @@ instance_name:
   returned: success
   type: string
   sample: i-44-3992-VM
+instances:
+  description: Result of each instance, with the same keys as a single instance plus C(changed) and
+    C(job_seconds), the time its async job took or C(null) if no job was needed.
+  returned: success, when instances is given
+  type: list
+  sample: '[ { "name": "web-vm-3", "state": "Running", "changed": true, "job_seconds": 42.1 } ]'
 '''
 
 import base64
+import copy
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
 
 # import cloudstack common
 from ansible.module_utils.cloudstack import *
 
+# number of items requested per page of a list API call
+CS_PAGE_SIZE = 500
+
+# seconds between polls of pending async jobs, growing while no job finishes
+CS_POLL_INTERVAL_MIN = 0.5
+CS_POLL_INTERVAL_MAX = 8
+
+UUID_RE = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
+
 
 class AnsibleCloudStackInstance(AnsibleCloudStack):
 
@@ -419,19 +492,151 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
         self.instance = None
         self.template = None
         self.iso = None
+        self._listings = {}
+        self._cached_listings = set()
+        self._lookups = {}
+        self._cache = None
+
+
+    # copied in cs_instance and cs_loadbalancer_rule_member; keep the copies in sync
+    def _list_all(self, command, key, args):
+        args = dict(args)
+        args['pagesize'] = CS_PAGE_SIZE
+        args['page'] = 1
+        items = []
+        while True:
+            res = getattr(self.cs, command)(**args)
+            if res and 'errortext' in res:
+                self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
+            page = (res or {}).get(key, [])
+            items.extend(page)
+            if len(page) < CS_PAGE_SIZE or len(items) >= res.get('count', len(items) + 1):
+                return items
+            args['page'] += 1
+
+
+    def _list_filtered(self, command, key, args, value):
+        # the keyword does not match ids, and an unknown id is an error for some list APIs
+        if UUID_RE.match(value):
+            try:
+                items = self._list_all(command, key, dict(args, id=value))
+            except CloudStackException:
+                items = []
+            if items:
+                return items
+        return self._list_all(command, key, dict(args, keyword=value))
+
+
+    def _get_cache_path(self):
+        cache_dir = self.module.params.get('cache_dir')
+        if self.module.params.get('cache_ttl') <= 0 or not cache_dir:
+            return None
+        key = hashlib.sha1(json.dumps([self.cs.endpoint, self.cs.key]).encode('utf-8')).hexdigest()
+        return os.path.join(os.path.expanduser(cache_dir), key + '.json')
+
+
+    def _load_cache(self):
+        self._cache = {}
+        cache_path = self._get_cache_path()
+        if cache_path is None:
+            return
+        try:
+            f = open(cache_path)
+            try:
+                cache = json.load(f)
+            finally:
+                f.close()
+        except (IOError, OSError, ValueError):
+            return
+        if isinstance(cache, dict):
+            self._cache = cache
+
+
+    def _save_cache(self):
+        cache_path = self._get_cache_path()
+        if cache_path is None:
+            return
+        try:
+            cache_dir = os.path.dirname(cache_path)
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir, 0o700)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir)
+            f = os.fdopen(fd, 'w')
+            try:
+                json.dump(self._cache, f)
+            finally:
+                f.close()
+            os.rename(tmp_path, cache_path)
+        except (IOError, OSError):
+            # the cache is only an optimization
+            pass
+
+
+    def _get_listing(self, command, key, args, fields, refresh=False):
+        # list once per run (and cache_ttl seconds on disk), indexed by the fields an item can be looked up by;
+        # refresh lists again if the listing came from the disk cache
+        listing_key = json.dumps([command, args], sort_keys=True)
+        if listing_key in self._listings and not (refresh and listing_key in self._cached_listings):
+            return self._listings[listing_key]
+
+        if self._cache is None:
+            self._load_cache()
+        cache_ttl = self.module.params.get('cache_ttl')
+        entry = self._cache.get(listing_key)
+        if entry and not refresh and time.time() - entry[1] < cache_ttl:
+            items = entry[0]
+            self._cached_listings.add(listing_key)
+        else:
+            self._cached_listings.discard(listing_key)
+            items = self._list_all(command, key, args)
+            if cache_ttl > 0:
+                self._cache[listing_key] = [items, time.time()]
+                self._save_cache()
+
+        index = {}
+        for item in items:
+            for field in fields:
+                if item.get(field) is not None:
+                    index.setdefault(item[field], item)
+        self._listings[listing_key] = (items, index)
+        return self._listings[listing_key]
+
+
+    def _lookup(self, command, key, args, fields, value):
+        lookup_key = json.dumps([command, args, value], sort_keys=True)
+        if lookup_key in self._lookups:
+            return self._lookups[lookup_key]
+
+        # with the cache enabled the full listing is used, otherwise the API filters by id or keyword
+        item = None
+        if self.module.params.get('cache_ttl') <= 0:
+            for i in self._list_filtered(command, key, args, value):
+                if value in [ i.get(field) for field in fields ]:
+                    item = i
+                    break
+        if item is None:
+            # not every API matches the keyword against all fields, e.g. the display text
+            items, index = self._get_listing(command, key, args, fields)
+            item = index.get(value)
+        if item is None and self.module.params.get('cache_ttl') > 0:
+            # the item may have been created after the cached listing was written
+            items, index = self._get_listing(command, key, args, fields, refresh=True)
+            item = index.get(value)
+        self._lookups[lookup_key] = item
+        return item
 
 
     def get_service_offering_id(self):
         service_offering = self.module.params.get('service_offering')
 
-        service_offerings = self.cs.listServiceOfferings()
-        if service_offerings:
-            if not service_offering:
-                return service_offerings['serviceoffering'][0]['id']
-
-            for s in service_offerings['serviceoffering']:
-                if service_offering in [ s['name'], s['id'] ]:
-                    return s['id']
+        if not service_offering:
+            service_offerings, index = self._get_listing('listServiceOfferings', 'serviceoffering', {}, ['name', 'id'])
+            if service_offerings:
+                return service_offerings[0]['id']
+        else:
+            s = self._lookup('listServiceOfferings', 'serviceoffering', {}, ['name', 'id'], service_offering)
+            if s:
+                return s['id']
         self.module.fail_json(msg="Service offering '%s' not found" % service_offering)
 
 
@@ -454,24 +659,20 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
                 return self._get_by_key(key, self.template)
 
             args['templatefilter'] = self.module.params.get('template_filter')
-            templates = self.cs.listTemplates(**args)
-            if templates:
-                for t in templates['template']:
-                    if template in [ t['displaytext'], t['name'], t['id'] ]:
-                        self.template = t
-                        return self._get_by_key(key, self.template)
+            t = self._lookup('listTemplates', 'template', args, ['displaytext', 'name', 'id'], template)
+            if t:
+                self.template = t
+                return self._get_by_key(key, self.template)
             self.module.fail_json(msg="Template '%s' not found" % template)
 
         elif iso:
             if self.iso:
                 return self._get_by_key(key, self.iso)
             args['isofilter'] = self.module.params.get('template_filter')
-            isos = self.cs.listIsos(**args)
-            if isos:
-                for i in isos['iso']:
-                    if iso in [ i['displaytext'], i['name'], i['id'] ]:
-                        self.iso = i
-                        return self._get_by_key(key, self.iso)
+            i = self._lookup('listIsos', 'iso', args, ['displaytext', 'name', 'id'], iso)
+            if i:
+                self.iso = i
+                return self._get_by_key(key, self.iso)
             self.module.fail_json(msg="ISO '%s' not found" % iso)
 
 
@@ -481,11 +682,9 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
         if not disk_offering:
             return None
 
-        disk_offerings = self.cs.listDiskOfferings()
-        if disk_offerings:
-            for d in disk_offerings['diskoffering']:
-                if disk_offering in [ d['displaytext'], d['name'], d['id'] ]:
-                    return d['id']
+        d = self._lookup('listDiskOfferings', 'diskoffering', {}, ['displaytext', 'name', 'id'], disk_offering)
+        if d:
+            return d['id']
         self.module.fail_json(msg="Disk offering '%s' not found" % disk_offering)
 
 
@@ -499,12 +698,12 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
             args['domainid']    = self.get_domain(key='id')
             args['projectid']   = self.get_project(key='id')
             # Do not pass zoneid, as the instance name must be unique across zones.
-            instances = self.cs.listVirtualMachines(**args)
-            if instances:
-                for v in instances['virtualmachine']:
-                    if instance_name.lower() in [ v['name'].lower(), v['displayname'].lower(), v['id'] ]:
-                        self.instance = v
-                        break
+            # The API filters by id or by a substring of the name and display name.
+            instances = self._list_filtered('listVirtualMachines', 'virtualmachine', args, instance_name)
+            for v in instances:
+                if instance_name.lower() in [ v['name'].lower(), v['displayname'].lower(), v['id'] ]:
+                    self.instance = v
+                    break
         return self.instance
 
 
@@ -883,6 +1082,105 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
         return instance
 
 
+    # copied in cs_instance, cs_firewall, cs_securitygroup_rule and cs_loadbalancer_rule_member
+    # as module_utils.cloudstack has no batch poll; keep the copies in sync
+    def poll_jobs(self, jobs):
+        # poll all pending jobs in turn for up to poll_timeout seconds,
+        # returns a dict of job id to the job result and the time the job was seen finished
+        results = {}
+        pending = list(jobs)
+        interval = CS_POLL_INTERVAL_MIN
+        deadline = time.time() + self.module.params.get('poll_timeout')
+        while pending:
+            finished = False
+            for job in list(pending):
+                res = self.cs.queryAsyncJobResult(jobid=job['jobid'])
+                if 'errortext' in res:
+                    self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
+                if res['jobstatus'] != 0 and 'jobresult' in res:
+                    pending.remove(job)
+                    finished = True
+                    results[job['jobid']] = (res['jobresult'], time.time())
+            if pending:
+                if time.time() >= deadline:
+                    self.module.fail_json(msg="Timed out waiting for async jobs: %s" % ", ".join([job['jobid'] for job in pending]))
+                # poll again soon while jobs are finishing, back off while they are not
+                if finished:
+                    interval = CS_POLL_INTERVAL_MIN
+                else:
+                    interval = min(interval * 2, CS_POLL_INTERVAL_MAX)
+                time.sleep(min(interval, max(deadline - time.time(), 0)))
+        return results
+
+
+    def _submit_instance(self, state):
+        instance = self.get_instance()
+        if not instance:
+            return self.deploy_instance(start_vm=state != 'stopped')
+
+        instance_state = instance['state'].lower()
+        instance = self.recover_instance(instance=instance)
+        self.instance = self.update_instance(instance=instance, start_vm=False)
+        if state == 'stopped':
+            return self.stop_instance()
+        if state == 'started' or instance_state == 'running':
+            return self.start_instance()
+        return self.instance
+
+
+    def present_instances(self, state):
+        params = self.module.params
+        initial_result = self.result
+        instances = []
+        try:
+            # submit the jobs of all instances, without waiting for them
+            for spec in params.get('instances'):
+                if not isinstance(spec, dict):
+                    spec = {'name': spec}
+                self.module.params = dict(params, poll_async=False, **spec)
+                self.instance = None
+                self.result = copy.deepcopy(initial_result)
+                submitted = time.time()
+                instance = self._submit_instance(state)
+                instances.append((dict(self.module.params), instance, self.result['changed'], submitted))
+
+            jobs = [i[1] for i in instances if i[1] and 'jobid' in i[1]]
+            job_results = {}
+            if jobs and params.get('poll_async'):
+                job_results = self.poll_jobs(jobs)
+
+            errors = []
+            results = []
+            for instance_params, instance, changed, submitted in instances:
+                self.module.params = instance_params
+                self.result = copy.deepcopy(initial_result)
+                self.result['changed'] = changed
+                job_seconds = None
+                if instance and instance.get('jobid') in job_results:
+                    instance, finished = job_results[instance['jobid']]
+                    instance = instance.get('virtualmachine', instance)
+                    job_seconds = round(finished - submitted, 1)
+                    if 'errortext' in instance:
+                        errors.append("%s: %s" % (self.get_or_fallback('name', 'display_name'), instance['errortext']))
+                        continue
+                if instance and 'state' in instance:
+                    instance = self.ensure_tags(resource=instance, resource_type='UserVm')
+                    if instance['state'].lower() == 'error':
+                        errors.append("%s: instance in error state" % self.get_or_fallback('name', 'display_name'))
+                result = self.get_result(instance)
+                result['job_seconds'] = job_seconds
+                results.append(result)
+        finally:
+            self.module.params = params
+
+        self.result = copy.deepcopy(initial_result)
+        self.result['changed'] = any(i[2] for i in instances)
+        self.result['instances'] = results
+        if errors:
+            self.module.fail_json(msg="Failed: '%s'" % "', '".join(errors), **self.result)
+        return self.result
+
+
     def get_result(self, instance):
         super(AnsibleCloudStackInstance, self).get_result(instance)
         if instance:
@@ -937,6 +1235,10 @@ def main():
         force = dict(type='bool', default=False),
         tags = dict(type='list', aliases=[ 'tag' ], default=None),
         poll_async = dict(type='bool', default=True),
+        poll_timeout = dict(type='int', default=3600),
+        instances = dict(type='list', default=None),
+        cache_ttl = dict(type='int', default=0),
+        cache_dir = dict(default='~/.ansible/tmp/cloudstack_cache'),
     ))
 
     required_together = cs_required_together()
@@ -948,10 +1250,14 @@ def main():
         argument_spec=argument_spec,
         required_together=required_together,
         required_one_of = (
-            ['display_name', 'name'],
+            ['display_name', 'name', 'instances'],
         ),
         mutually_exclusive = (
             ['template', 'iso'],
+            ['instances', 'name'],
+            ['instances', 'display_name'],
+            ['instances', 'ip_address'],
+            ['instances', 'ip6_address'],
         ),
         supports_check_mode=True
     )
@@ -961,6 +1267,15 @@ def main():
 
         state = module.params.get('state')
 
+        if module.params.get('instances') is not None:
+            if state not in ['present', 'deployed', 'started', 'stopped']:
+                module.fail_json(msg="instances is not supported with state=%s" % state)
+            for spec in module.params.get('instances'):
+                if isinstance(spec, dict) and (not spec.get('name') or set(spec) - set(['name', 'display_name', 'ip_address', 'ip6_address'])):
+                    module.fail_json(msg="instances must be names or dicts with a name and optionally display_name, ip_address and ip6_address: %s" % spec)
+            result = acs_instance.present_instances(state)
+            module.exit_json(**result)
+
         if state in ['absent', 'destroyed']:
             instance = acs_instance.absent_instance()
 
@@ -33,7 +33,9 @@ options:
   name:
     description:
       - The name of the load balancer rule.
-    required: true
+      - Required unless C(rules) is given.
+    required: false
+    default: null
   ip_address:
     description:
       - Public IP address from where the network traffic will be load balanced from.
@@ -44,9 +46,20 @@ options:
   vms:
     description:
       - List of VMs to assign to or remove from the rule.
-    required: true
+      - Required unless C(rules) is given.
+    required: false
+    default: null
     type: list
     aliases: [ 'vm' ]
+  rules:
+    description:
+      - List of rules to assign VMs to or remove VMs from in one task, dicts with the keys C(name), C(vms)
+        and optionally C(ip_address), like the options of the same name.
+      - The rules and VMs are listed once for all rules and the assign or remove jobs of all rules run at the same time.
+      - Mutually exclusive with C(name), C(vms) and C(ip_address).
+    required: false
+    default: null
+    version_added: '2.3'
   state:
     description:
       - Should the VMs be present or absent from the rule.
@@ -74,6 +87,17 @@ options:
       - If not set, default zone is used.
     required: false
     default: null
+  poll_async:
+    description:
+      - Poll async jobs until job has finished.
+    required: false
+    default: true
+  poll_timeout:
+    description:
+      - Seconds to wait for the async jobs of C(rules) to finish when C(poll_async) is true.
+    required: false
+    default: 3600
+    version_added: "2.3"
 extends_documentation_fragment: cloudstack
 '''
 
@@ -95,6 +119,18 @@ EXAMPLES = '''
       - web02
     state: absent
 
+# Add VMs to several load balancers in one task
+- local_action:
+    module: cs_loadbalancer_rule_member
+    rules:
+      - name: balance_http
+        vms: [ web01, web02, web03 ]
+      - name: balance_https
+        vms: [ web01, web02, web03 ]
+      - name: balance_api
+        ip_address: 1.2.3.4
+        vms: [ api01, api02 ]
+
 # Rolling upgrade of hosts
 - hosts: webservers
   serial: 1
@@ -184,7 +220,9 @@ public_ip:
   type: string
   sample: "1.2.3.4"
 vms:
-  description: Rule members.
+  description:
+    - Rule members.
+    - Changes are only included once their job has finished, with C(poll_async=false) these are the members before the task.
   returned: success
   type: list
   sample: '[ "web01", "web02" ]'
@@ -198,11 +236,28 @@ state:
   returned: success
   type: string
   sample: "Add"
+rules:
+  description: Rules changed, each with its C(id), C(name), C(public_ip), the C(vms) being its members and
+    the C(changed_vms) assigned or removed. Like the C(vms) of a single rule, C(vms) only includes changes
+    whose job has finished.
+  returned: success and rules is defined
+  type: list
+  sample: '[ { "id": "a6f7a5fc-43f8-11e5-a151-feff819cdc9f", "name": "balance_http", "public_ip": "1.2.3.4",
+    "vms": [ "web01", "web02" ], "changed_vms": [ "web02" ] } ]'
 '''
 
+import time
+
 # import cloudstack common
 from ansible.module_utils.cloudstack import *
 
+# number of items requested per page of a list API call
+CS_PAGE_SIZE = 500
+
+# seconds between polls of pending async jobs, growing while no job finishes
+CS_POLL_INTERVAL_MIN = 0.5
+CS_POLL_INTERVAL_MAX = 8
+
 class AnsibleCloudStackLBRuleMember(AnsibleCloudStack):
 
     def __init__(self, module):
@@ -218,6 +273,25 @@ class AnsibleCloudStackLBRuleMember(AnsibleCloudStack):
             'publicport': 'public_port',
             'privateport': 'private_port',
         }
+        self.members = {}
+        self.vm_ids = None
+
+
+    # copied in cs_instance and cs_loadbalancer_rule_member; keep the copies in sync
+    def _list_all(self, command, key, args):
+        args = dict(args)
+        args['pagesize'] = CS_PAGE_SIZE
+        args['page'] = 1
+        items = []
+        while True:
+            res = getattr(self.cs, command)(**args)
+            if res and 'errortext' in res:
+                self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
+            page = (res or {}).get(key, [])
+            items.extend(page)
+            if len(page) < CS_PAGE_SIZE or len(items) >= res.get('count', len(items) + 1):
+                return items
+            args['page'] += 1
 
 
     def get_rule(self):
@@ -243,10 +317,59 @@ class AnsibleCloudStackLBRuleMember(AnsibleCloudStack):
 
 
     def _get_members_of_rule(self, rule):
-        res = self.cs.listLoadBalancerRuleInstances(id=rule['id'])
+        # the member names are listed once and kept up to date with the changes
+        # confirmed by a finished job
+        if rule['id'] not in self.members:
+            res = self.cs.listLoadBalancerRuleInstances(id=rule['id'])
+            if 'errortext' in res:
+                self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
+            self.members[rule['id']] = [vm['name'] for vm in res.get('loadbalancerruleinstance', [])]
+        return self.members[rule['id']]
+
+
+    def _get_vm_ids(self, names):
+        # one listing of the VMs indexed by name, shared by all rules
+        if self.vm_ids is None:
+            self.vm_ids = {}
+            for vm in self._list_all('listVirtualMachines', 'virtualmachine', self._get_common_args()):
+                self.vm_ids.setdefault(vm['name'], vm['id'])
+        vm_ids = []
+        for name in names:
+            if name not in self.vm_ids:
+                self.module.fail_json(msg="Unknown VM: %s" % name)
+            vm_ids.append(self.vm_ids[name])
+        return vm_ids
+
+
+    def _get_member_changes(self, rule, wanted_names, operation):
+        existing = set(self._get_members_of_rule(rule=rule))
+        to_change = []
+        for name in wanted_names:
+            if (name in existing) == (operation == 'remove') and name not in to_change:
+                to_change.append(name)
+        return to_change
+
+
+    def _submit_member_changes(self, rule, names, operation):
+        if operation == 'add':
+            cs_func = self.cs.assignToLoadBalancerRule
+        else:
+            cs_func = self.cs.removeFromLoadBalancerRule
+        res = cs_func(
+            id = rule['id'],
+            virtualmachineids = self._get_vm_ids(names),
+        )
         if 'errortext' in res:
             self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
-        return res.get('loadbalancerruleinstance', [])
+        return res
+
+
+    def _update_members(self, rule, names, operation):
+        members = self.members[rule['id']]
+        if operation == 'add':
+            members.extend(names)
+        else:
+            self.members[rule['id']] = [name for name in members if name not in names]
 
 
     def _ensure_members(self, operation):
@@ -257,50 +380,109 @@ class AnsibleCloudStackLBRuleMember(AnsibleCloudStack):
         if not rule:
             self.module.fail_json(msg="Unknown rule: %s" % self.module.params.get('name'))
 
-        existing = {}
-        for vm in self._get_members_of_rule(rule=rule):
-            existing[vm['name']] = vm['id']
-
-        wanted_names = self.module.params.get('vms')
-
-        if operation =='add':
-            cs_func = self.cs.assignToLoadBalancerRule
-            to_change = set(wanted_names) - set(existing.keys())
-        else:
-            cs_func = self.cs.removeFromLoadBalancerRule
-            to_change = set(wanted_names) & set(existing.keys())
-
+        to_change = self._get_member_changes(rule, self.module.params.get('vms'), operation)
         if not to_change:
             return rule
 
-        args = self._get_common_args()
-        vms = self.cs.listVirtualMachines(**args)
-        to_change_ids = []
-        for name in to_change:
-            for vm in vms.get('virtualmachine', []):
-                if vm['name'] == name:
-                    to_change_ids.append(vm['id'])
-                    break
-            else:
-                self.module.fail_json(msg="Unknown VM: %s" % name)
-
+        to_change_ids = self._get_vm_ids(to_change)
         if to_change_ids:
             self.result['changed'] = True
 
         if to_change_ids and not self.module.check_mode:
-            res = cs_func(
-                id = rule['id'],
-                virtualmachineids = to_change_ids,
-            )
-            if 'errortext' in res:
-                self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
+            res = self._submit_member_changes(rule, to_change, operation)
             poll_async = self.module.params.get('poll_async')
             if poll_async:
                 self.poll_job(res)
-                rule = self.get_rule()
+                self._update_members(rule, to_change, operation)
         return rule
 
 
+    # copied in cs_instance, cs_firewall, cs_securitygroup_rule and cs_loadbalancer_rule_member
+    # as module_utils.cloudstack has no batch poll; keep the copies in sync
+    def poll_jobs(self, jobs):
+        # poll all pending jobs in turn for up to poll_timeout seconds,
+        # returns a dict of job id to the job result and the time the job was seen finished
+        results = {}
+        pending = list(jobs)
+        interval = CS_POLL_INTERVAL_MIN
+        deadline = time.time() + self.module.params.get('poll_timeout')
+        while pending:
+            finished = False
+            for job in list(pending):
+                res = self.cs.queryAsyncJobResult(jobid=job['jobid'])
+                if 'errortext' in res:
+                    self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
+                if res['jobstatus'] != 0 and 'jobresult' in res:
+                    pending.remove(job)
+                    finished = True
+                    results[job['jobid']] = (res['jobresult'], time.time())
+            if pending:
+                if time.time() >= deadline:
+                    self.module.fail_json(msg="Timed out waiting for async jobs: %s" % ", ".join([job['jobid'] for job in pending]))
+                # poll again soon while jobs are finishing, back off while they are not
+                if finished:
+                    interval = CS_POLL_INTERVAL_MIN
+                else:
+                    interval = min(interval * 2, CS_POLL_INTERVAL_MAX)
+                time.sleep(min(interval, max(deadline - time.time(), 0)))
+        return results
+
+
+    def ensure_rules_members(self, operation):
+        # the rules of the zone are listed once and looked up by name and public IP
+        args = self._get_common_args()
+        args['zoneid'] = self.get_zone(key='id')
+        rules_by_name = {}
+        for rule in self._list_all('listLoadBalancerRules', 'loadbalancerrule', args):
+            rules_by_name.setdefault(rule['name'], []).append(rule)
+
+        changes = []
+        for spec in self.module.params.get('rules'):
+            rules = rules_by_name.get(spec['name'], [])
+            if spec.get('ip_address'):
+                rules = [r for r in rules if r.get('publicip') == spec['ip_address']]
+            if not rules:
+                self.module.fail_json(msg="Unknown rule: %s" % spec['name'])
+            if len(rules) > 1:
+                self.module.fail_json(msg="More than one rule having name %s. Please pass 'ip_address' as well." % spec['name'])
+            rule = rules[0]
+            to_change = self._get_member_changes(rule, spec['vms'], operation)
+            if to_change:
+                # fail on unknown VMs before any job is submitted
+                self._get_vm_ids(to_change)
+                self.result['changed'] = True
+            changes.append((rule, to_change))
+
+        if not self.module.check_mode:
+            jobs = []
+            for rule, to_change in changes:
+                if to_change:
+                    jobs.append((rule, to_change, self._submit_member_changes(rule, to_change, operation)))
+
+            if self.module.params.get('poll_async'):
+                job_results = self.poll_jobs([job[2] for job in jobs])
+                errors = []
+                for rule, to_change, res in jobs:
+                    job_result = job_results[res['jobid']][0]
+                    if 'errortext' in job_result:
+                        errors.append("%s: %s" % (rule['name'], job_result['errortext']))
+                    else:
+                        self._update_members(rule, to_change, operation)
+                if errors:
+                    self.module.fail_json(msg="Failed: '%s'" % "', '".join(errors))
+
+        self.result['rules'] = []
+        for rule, to_change in changes:
+            self.result['rules'].append({
+                'id': rule['id'],
+                'name': rule['name'],
+                'public_ip': rule.get('publicip'),
+                'vms': list(self.members[rule['id']]),
+                'changed_vms': to_change,
+            })
+        return self.result
+
+
     def add_members(self):
         return self._ensure_members('add')
 
@@ -312,29 +494,42 @@ class AnsibleCloudStackLBRuleMember(AnsibleCloudStack):
     def get_result(self, rule):
         super(AnsibleCloudStackLBRuleMember, self).get_result(rule)
         if rule:
-            self.result['vms'] = []
-            for vm in self._get_members_of_rule(rule=rule):
-                self.result['vms'].append(vm['name'])
+            self.result['vms'] = list(self._get_members_of_rule(rule=rule))
         return self.result
 
 
 def main():
     argument_spec = cs_argument_spec()
     argument_spec.update(dict(
-        name = dict(required=True),
+        name = dict(default=None),
         ip_address = dict(default=None, aliases=['public_ip']),
-        vms = dict(required=True, aliases=['vm'], type='list'),
+        vms = dict(default=None, aliases=['vm'], type='list'),
+        rules = dict(default=None, type='list'),
         state = dict(choices=['present', 'absent'], default='present'),
         zone = dict(default=None),
         domain = dict(default=None),
         project = dict(default=None),
         account = dict(default=None),
         poll_async = dict(type='bool', default=True),
+        poll_timeout = dict(type='int', default=3600),
     ))
 
+    required_together = cs_required_together()
+    required_together.extend([
+        ['name', 'vms'],
+    ])
+
     module = AnsibleModule(
         argument_spec=argument_spec,
-        required_together=cs_required_together(),
+        required_together=required_together,
+        required_one_of = (
+            ['name', 'rules'],
+        ),
+        mutually_exclusive = (
+            ['rules', 'name'],
+            ['rules', 'vms'],
+            ['rules', 'ip_address'],
+        ),
         supports_check_mode=True
     )
 
@@ -342,6 +537,17 @@ def main():
         acs_lb_rule_member = AnsibleCloudStackLBRuleMember(module)
 
         state = module.params.get('state')
+        if module.params.get('rules') is not None:
+            for spec in module.params.get('rules'):
+                if not isinstance(spec, dict) or not spec.get('name') or not isinstance(spec.get('vms'), list) \
+                        or set(spec) - set(['name', 'vms', 'ip_address']):
+                    module.fail_json(msg="rules must be dicts with a name, a list of vms and optionally an ip_address: %s" % spec)
+            if state in ['absent']:
+                result = acs_lb_rule_member.ensure_rules_members('remove')
+            else:
+                result = acs_lb_rule_member.ensure_rules_members('add')
+            module.exit_json(**result)
+
         if state in ['absent']:
             rule = acs_lb_rule_member.remove_members()
         else:
@@ -90,6 +90,31 @@ options:
       - Poll async jobs until job has finished.
     required: false
     default: true
+  poll_timeout:
+    description:
+      - Seconds to wait for the async jobs of C(rules) to finish when C(poll_async) is true.
+    required: false
+    default: 3600
+    version_added: "2.3"
+  rules:
+    description:
+      - List of rules of C(type) to manage in one task, dicts with the keys C(protocol), C(cidr),
+        C(user_security_group), C(start_port) (alias C(port)), C(end_port), C(icmp_type) and C(icmp_code),
+        which default like the options of the same name.
+      - The rules of the security group are listed once, the rules to add or remove are then
+        authorized or revoked with all jobs running at the same time.
+      - With C(state=present) missing rules are added, with C(state=absent) existing rules are removed.
+      - Mutually exclusive with the single rule options.
+    required: false
+    default: null
+    version_added: '2.3'
+  purge_rules:
+    description:
+      - Whether rules of C(type) not in C(rules) are removed from the security group, used with C(state=present).
+      - Duplicates of a rule in C(rules) are removed as well, keeping one.
+    required: false
+    default: false
+    version_added: '2.3'
 extends_documentation_fragment: cloudstack
 '''
 
@@ -135,6 +160,18 @@ EXAMPLES = '''
     security_group: default
     port: 80
     user_security_group: web
+
+# Ensure the inbound rules of security group 'web' are exactly these
+- local_action:
+    module: cs_securitygroup_rule
+    security_group: web
+    purge_rules: yes
+    rules:
+      - { port: 80 }
+      - { port: 443 }
+      - { port: 22, cidr: 10.0.0.0/8 }
+      - { protocol: icmp, icmp_type: -1, icmp_code: -1 }
+      - { start_port: 1, end_port: 65535, user_security_group: web }
 '''
 
 RETURN = '''
@@ -179,11 +216,30 @@ end_port:
   returned: success
   type: int
   sample: 80
+rules_added:
+  description: rules authorized, in the form of C(rules).
+  returned: success and rules is defined
+  type: list
+  sample: '[ { "protocol": "tcp", "start_port": 443, "end_port": 443, "cidr": "0.0.0.0/0" } ]'
+rules_removed:
+  description: rules revoked, in the form of C(rules).
+  returned: success and rules is defined
+  type: list
+  sample: '[ { "protocol": "tcp", "start_port": 8080, "end_port": 8080, "cidr": "0.0.0.0/0" } ]'
 '''
 
+import time
+
 # import cloudstack common
 from ansible.module_utils.cloudstack import *
 
+# seconds between polls of pending async jobs, growing while no job finishes
+CS_POLL_INTERVAL_MIN = 0.5
+CS_POLL_INTERVAL_MAX = 8
+
+# fields of a rule, in the order of the rule keys
+RULE_FIELDS = ['protocol', 'start_port', 'end_port', 'icmp_type', 'icmp_code', 'cidr', 'user_security_group']
+
 
 class AnsibleCloudStackSecurityGroupRule(AnsibleCloudStack):
 
@@ -358,6 +414,165 @@ class AnsibleCloudStackSecurityGroupRule(AnsibleCloudStack):
         return rule
 
 
+    def _get_rule_key(self, protocol, start_port, end_port, icmp_type, icmp_code, cidr, user_security_group):
+        # rules are equal if their keys are, fields not considered for the protocol or type are None
+        protocol = protocol.lower()
+        if protocol in ['tcp', 'udp']:
+            ports = (int(start_port), int(end_port), None, None)
+        elif protocol == 'icmp':
+            ports = (None, None, int(icmp_type), int(icmp_code))
+        else:
+            ports = (None, None, None, None)
+        if user_security_group:
+            return (protocol,) + ports + (None, user_security_group)
+        return (protocol,) + ports + (cidr, None)
+
+
+    def _get_wanted_rule_keys(self):
+        keys = []
+        for rule in self.module.params.get('rules'):
+            if not isinstance(rule, dict) or set(rule) - set(RULE_FIELDS + ['port']):
+                self.module.fail_json(msg="rules must be dicts with the keys %s: %s" % (', '.join(RULE_FIELDS), rule))
+            protocol   = rule.get('protocol', 'tcp')
+            start_port = rule.get('start_port', rule.get('port'))
+            end_port   = rule.get('end_port', start_port)
+            icmp_type  = rule.get('icmp_type')
+            icmp_code  = rule.get('icmp_code')
+
+            if protocol not in ['tcp', 'udp', 'icmp', 'ah', 'esp', 'gre']:
+                self.module.fail_json(msg="unsupported protocol '%s' in rule: %s" % (protocol, rule))
+            if protocol in ['tcp', 'udp'] and (start_port is None or end_port is None):
+                self.module.fail_json(msg="no start_port or end_port set for protocol '%s' in rule: %s" % (protocol, rule))
+            if protocol == 'icmp' and (icmp_type is None or icmp_code is None):
+                self.module.fail_json(msg="no icmp_type or icmp_code set for protocol 'icmp' in rule: %s" % rule)
+
+            key = self._get_rule_key(protocol, start_port, end_port, icmp_type, icmp_code,
+                                     rule.get('cidr', '0.0.0.0/0'), rule.get('user_security_group'))
+            if key not in keys:
+                keys.append(key)
+        return keys
+
+
+    # copied in cs_instance, cs_firewall, cs_securitygroup_rule and cs_loadbalancer_rule_member
+    # as module_utils.cloudstack has no batch poll; keep the copies in sync
+    def poll_jobs(self, jobs):
+        # poll all pending jobs in turn for up to poll_timeout seconds,
+        # returns a dict of job id to the job result and the time the job was seen finished
+        results = {}
+        pending = list(jobs)
+        interval = CS_POLL_INTERVAL_MIN
+        deadline = time.time() + self.module.params.get('poll_timeout')
+        while pending:
+            finished = False
+            for job in list(pending):
+                res = self.cs.queryAsyncJobResult(jobid=job['jobid'])
+                if 'errortext' in res:
+                    self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
+                if res['jobstatus'] != 0 and 'jobresult' in res:
+                    pending.remove(job)
+                    finished = True
+                    results[job['jobid']] = (res['jobresult'], time.time())
+            if pending:
+                if time.time() >= deadline:
+                    self.module.fail_json(msg="Timed out waiting for async jobs: %s" % ", ".join([job['jobid'] for job in pending]))
+                # poll again soon while jobs are finishing, back off while they are not
+                if finished:
+                    interval = CS_POLL_INTERVAL_MIN
+                else:
+                    interval = min(interval * 2, CS_POLL_INTERVAL_MAX)
+                time.sleep(min(interval, max(deadline - time.time(), 0)))
+        return results
+
+
+    def ensure_rules(self):
+        security_group = self.get_security_group()
+        sg_type = self.module.params.get('type')
+        state = self.module.params.get('state')
+
+        existing = {}
+        for rule in security_group.get(sg_type + 'rule', []):
+            key = self._get_rule_key(rule['protocol'], rule.get('startport'), rule.get('endport'),
+                                     rule.get('icmptype'), rule.get('icmpcode'), rule.get('cidr'),
+                                     rule.get('securitygroupname'))
+            existing.setdefault(key, []).append(rule)
+
+        wanted = self._get_wanted_rule_keys()
+        if state == 'absent':
+            to_add = []
+            to_remove = [(k, rule) for k in wanted for rule in existing.get(k, [])]
+        else:
+            to_add = [k for k in wanted if k not in existing]
+            to_remove = []
+            if self.module.params.get('purge_rules'):
+                # duplicates of a wanted rule are removed too, keeping one of them
+                for k, rules in existing.items():
+                    if k in wanted:
+                        rules = rules[1:]
+                    to_remove.extend([(k, rule) for rule in rules])
+
+        if to_add or to_remove:
+            self.result['changed'] = True
+        if not self.module.check_mode:
+            jobs = []
+            user_security_groups = {}
+            for key in to_add:
+                rule = dict(zip(RULE_FIELDS, key))
+                args = {}
+                if rule['user_security_group']:
+                    if rule['user_security_group'] not in user_security_groups:
+                        user_security_groups[rule['user_security_group']] = self.get_security_group(rule['user_security_group'])
+                    user_security_group = user_security_groups[rule['user_security_group']]
+                    args['usersecuritygrouplist'] = [{
+                        'group': user_security_group['name'],
+                        'account': user_security_group['account'],
+                    }]
+                else:
+                    args['cidrlist'] = rule['cidr']
+                args['protocol']        = rule['protocol']
+                args['startport']       = rule['start_port']
+                args['endport']         = rule['end_port']
+                args['icmptype']        = rule['icmp_type']
+                args['icmpcode']        = rule['icmp_code']
+                args['projectid']       = self.get_project('id')
+                args['securitygroupid'] = security_group['id']
+                if sg_type == 'ingress':
+                    res = self.cs.authorizeSecurityGroupIngress(**args)
+                else:
+                    res = self.cs.authorizeSecurityGroupEgress(**args)
+                if 'errortext' in res:
+                    self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
+                jobs.append(res)
+
+            for key, existing_rule in to_remove:
+                if sg_type == 'ingress':
+                    res = self.cs.revokeSecurityGroupIngress(id=existing_rule['ruleid'])
+                else:
+                    res = self.cs.revokeSecurityGroupEgress(id=existing_rule['ruleid'])
+                if 'errortext' in res:
+                    self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
+                jobs.append(res)
+
+            if self.module.params.get('poll_async'):
+                errors = []
+                job_results = self.poll_jobs(jobs)
+                for job in jobs:
+                    job_result = job_results[job['jobid']][0]
+                    if 'errortext' in job_result:
+                        errors.append(job_result['errortext'])
+                if errors:
+                    self.module.fail_json(msg="Failed: '%s'" % "', '".join(errors))
+
+        self.result['type'] = sg_type
+        self.result['security_group'] = self.module.params.get('security_group')
+        self.result['rules_added'] = [self._get_rule_result(k) for k in to_add]
+        self.result['rules_removed'] = [self._get_rule_result(k) for k, rule in to_remove]
+        return self.result
+
+
+    def _get_rule_result(self, key):
+        return dict((field, value) for field, value in zip(RULE_FIELDS, key) if value is not None)
+
+
     def get_result(self, security_group_rule):
         super(AnsibleCloudStackSecurityGroupRule, self).get_result(security_group_rule)
         self.result['type'] = self.module.params.get('type')
@@ -381,6 +596,9 @@ def main():
         state = dict(choices=['present', 'absent'], default='present'),
         project = dict(default=None),
         poll_async = dict(type='bool', default=True),
+        poll_timeout = dict(type='int', default=3600),
+        rules = dict(type='list', default=None),
+        purge_rules = dict(type='bool', default=False),
     ))
     required_together = cs_required_together()
     required_together.extend([
@@ -395,6 +613,13 @@ def main():
             ['icmp_type', 'end_port'],
             ['icmp_code', 'start_port'],
             ['icmp_code', 'end_port'],
+            ['rules', 'protocol'],
+            ['rules', 'cidr'],
+            ['rules', 'user_security_group'],
+            ['rules', 'start_port'],
+            ['rules', 'end_port'],
+            ['rules', 'icmp_type'],
+            ['rules', 'icmp_code'],
         ),
         supports_check_mode=True
     )
@@ -403,6 +628,10 @@ def main():
         acs_sg_rule = AnsibleCloudStackSecurityGroupRule(module)
 
         state = module.params.get('state')
+        if module.params.get('rules') is not None:
+            result = acs_sg_rule.ensure_rules()
+            module.exit_json(**result)
+
         if state in ['absent']:
             sg_rule = acs_sg_rule.remove_rule()
         else:
@@ -149,11 +149,36 @@ options:
         choices:
           - gzip
           - bzip2
+          - xz
+          - zstd
           - none
         description:
           - Type of compression to use when creating an archive of a running
             container.
+          - C(xz) and C(zstd) were added in 2.3.
         default: gzip
+    archive_mode:
+        choices:
+          - copy
+          - stream
+        description:
+          - How the archive is created. C(copy) syncs the container into a
+            temporary directory with rsync and archives the copy. C(stream)
+            archives the container directory and the LVM snapshot or overlay
+            mount directly through a multi-threaded compressor (pigz, pbzip2,
+            C(xz -T) or C(zstd -T)) when one is available, without a staging
+            copy.
+          - When streaming a directory backed container it is kept frozen or
+            stopped while the archive is created, an LVM backed container is
+            restored as soon as its snapshot is mounted.
+        default: copy
+        version_added: "2.3"
+    archive_threads:
+        description:
+          - Number of threads given to the compressor in C(stream) mode,
+            C(0) uses one thread per CPU.
+        default: 0
+        version_added: "2.3"
     state:
         choices:
           - started
@@ -333,6 +358,18 @@ EXAMPLES = """
     archive_compression: gzip
   register: clone_container_info
 
+# Stream an lvm container straight from its snapshot into a multi-threaded
+# compressor, the container is unfrozen as soon as the snapshot is mounted.
+- name: Stream an archive of an lvm container
+  lxc_container:
+    name: test-container-lvm
+    archive: true
+    archive_path: /opt/archives
+    archive_mode: stream
+    archive_compression: zstd
+    archive_threads: 4
+  register: lvm_stream_info
+
 - name: debug info on container "test-container"
   debug: var=clone_container_info
 
@@ -417,6 +454,17 @@ lxc_container:
             returned: success, when archive is true
             type: string
             sample: "/tmp/test-container-config.tar"
+        archive_stats:
+            description: size and throughput of the archive
+            returned: success, when archive is true and archive_mode is stream
+            type: dict
+            sample: {
+                "compressor": "pigz -c -p8",
+                "bytes_read": 524288000,
+                "bytes_written": 183500800,
+                "seconds": 4.512,
+                "throughput_mb_per_sec": 110.82
+            }
         clone:
             description: if the container was cloned
             returned: success, when clone_name is specified
@@ -424,7 +472,9 @@ lxc_container:
             sample: True
 """
 
+import multiprocessing
 import re
+import subprocess
 
 try:
     import lxc
@@ -436,18 +486,33 @@ else:
 
 # LXC_COMPRESSION_MAP is a map of available compression types when creating
 # an archive of a container.
+# The compressors are used by the "stream" archive mode, the first one found
+# is used, with its argument setting the number of threads.
 LXC_COMPRESSION_MAP = {
     'gzip': {
         'extension': 'tar.tgz',
-        'argument': '-czf'
+        'argument': '-czf',
+        'compressors': [('pigz', '-p%d'), ('gzip', None)]
     },
     'bzip2': {
         'extension': 'tar.bz2',
-        'argument': '-cjf'
+        'argument': '-cjf',
+        'compressors': [('pbzip2', '-p%d'), ('bzip2', None)]
+    },
+    'xz': {
+        'extension': 'tar.xz',
+        'argument': '-cJf',
+        'compressors': [('xz', '-T%d')]
+    },
+    'zstd': {
+        'extension': 'tar.zst',
+        'argument': '--use-compress-program=zstd -cf',
+        'compressors': [('zstd', '-T%d')]
     },
     'none': {
         'extension': 'tar',
-        'argument': '-cf'
+        'argument': '-cf',
+        'compressors': []
     }
 }
 
@@ -606,6 +671,7 @@ class LxcContainerManagement(object):
         self.container_name = self.module.params['name']
         self.container = self.get_container_bind()
         self.archive_info = None
+        self.archive_stats = None
         self.clone_info = None
 
     def get_container_bind(self):
@@ -1000,6 +1066,8 @@ class LxcContainerManagement(object):
             self.archive_info = {
                 'archive': self._container_create_tar()
             }
+            if self.archive_stats:
+                self.archive_info['archive_stats'] = self.archive_stats
 
     def _check_clone(self):
         """Create a compressed archive of a container.
@@ -1373,21 +1441,9 @@ class LxcContainerManagement(object):
 
         old_umask = os.umask(int('0077',8))
 
-        archive_path = self.module.params.get('archive_path')
-        if not os.path.isdir(archive_path):
-            os.makedirs(archive_path)
-
         archive_compression = self.module.params.get('archive_compression')
         compression_type = LXC_COMPRESSION_MAP[archive_compression]
-
-        # remove trailing / if present.
-        archive_name = '%s.%s' % (
-            os.path.join(
-                archive_path,
-                self.container_name
-            ),
-            compression_type['extension']
-        )
+        archive_name = self._archive_name(compression_type)
 
         build_command = [
             self.module.get_bin_path('tar', True),
@@ -1416,6 +1472,157 @@ class LxcContainerManagement(object):
 
         return archive_name
 
+    def _archive_name(self, compression_type):
+        """Return the path of the archive, creating archive_path if needed.
+
+        :param compression_type: Entry of ``LXC_COMPRESSION_MAP`` in use.
+        :type compression_type: ``dict``
+        """
+
+        archive_path = self.module.params.get('archive_path')
+        if not os.path.isdir(archive_path):
+            os.makedirs(archive_path)
+
+        # remove trailing / if present.
+        return '%s.%s' % (
+            os.path.join(
+                archive_path,
+                self.container_name
+            ),
+            compression_type['extension']
+        )
+
+    def _stream_tar(self, sources):
+        """Stream a tar archive of ``sources`` through a compressor.
+
+        tar writes straight into the compressor which writes the archive,
+        nothing is staged on disk. Multi-threaded compressors (pigz, pbzip2,
+        ``xz -T``, ``zstd -T``) are used when they are available.
+
+        :param sources: ``(directory, members)`` pairs to archive.
+        :type sources: ``list``
+        :returns: The archive name and the throughput of the archive.
+        :rtype: ``tuple``
+        """
+
+        archive_compression = self.module.params.get('archive_compression')
+        compression_type = LXC_COMPRESSION_MAP[archive_compression]
+        threads = (self.module.params.get('archive_threads') or
+                   multiprocessing.cpu_count())
+
+        compress_command = None
+        for binary, thread_argument in compression_type['compressors']:
+            binary_path = self.module.get_bin_path(binary)
+            if binary_path:
+                compress_command = [binary_path, '-c']
+                if thread_argument:
+                    compress_command.append(thread_argument % threads)
+                break
+        else:
+            if compression_type['compressors']:
+                self.failure(
+                    rc=1,
+                    msg='No compressor found for [ %s ], tried [ %s ]' % (
+                        archive_compression,
+                        ', '.join(i[0] for i in compression_type['compressors'])
+                    )
+                )
+
+        build_command = [
+            self.module.get_bin_path('tar', True),
+            '--totals',
+            '-cf',
+            '-'
+        ]
+        for directory, members in sources:
+            build_command.append('--directory=%s' % directory)
+            build_command.extend(members)
+
+        old_umask = os.umask(int('0077', 8))
+        archive_name = self._archive_name(compression_type)
+        # stderr goes to files so that a chatty tar can't block on a pipe
+        tar_err = tempfile.TemporaryFile()
+        compress_err = tempfile.TemporaryFile()
+        start = time.time()
+        archive = open(archive_name, 'wb')
+        try:
+            if compress_command:
+                tar = subprocess.Popen(
+                    build_command,
+                    stdout=subprocess.PIPE,
+                    stderr=tar_err
+                )
+                compressor = subprocess.Popen(
+                    compress_command,
+                    stdin=tar.stdout,
+                    stdout=archive,
+                    stderr=compress_err
+                )
+                # the compressor is the only reader of the pipe now.
+                tar.stdout.close()
+                compress_rc = compressor.wait()
+            else:
+                tar = subprocess.Popen(
+                    build_command,
+                    stdout=archive,
+                    stderr=tar_err
+                )
+                compress_rc = 0
+            tar_rc = tar.wait()
+        finally:
+            archive.close()
+            os.umask(old_umask)
+        elapsed = time.time() - start
+
+        tar_err.seek(0)
+        compress_err.seek(0)
+        tar_stderr = tar_err.read()
+        compress_stderr = compress_err.read()
+        tar_err.close()
+        compress_err.close()
+
+        if tar_rc != 0 or compress_rc != 0:
+            command = ' '.join(build_command)
+            if compress_command:
+                command = '%s | %s' % (command, ' '.join(compress_command))
+            self.failure(
+                err='%s%s' % (tar_stderr, compress_stderr),
+                rc=tar_rc or compress_rc,
+                msg='failed to create tar archive',
+                command=command
+            )
+
+        totals = re.search(r'Total bytes written: (\d+)', tar_stderr)
+        bytes_read = int(totals.group(1)) if totals else None
+        stats = {
+            'compressor': ' '.join(
+                [os.path.basename(compress_command[0])] + compress_command[1:]
+            ) if compress_command else None,
+            'bytes_read': bytes_read,
+            'bytes_written': os.path.getsize(archive_name),
+            'seconds': round(elapsed, 3),
+            'throughput_mb_per_sec': None
+        }
+        if bytes_read is not None and elapsed > 0:
+            stats['throughput_mb_per_sec'] = round(
+                bytes_read / elapsed / (1024 * 1024), 2
+            )
+
+        return archive_name, stats
+
+    def _restore_state(self, container_state):
+        """Restore the state a container was in before it was archived.
+
+        :param container_state: State of the container before archiving.
+        :type container_state: ``str``
+        """
+
+        if container_state == 'running':
+            if self._get_state() == 'frozen':
+                self.container.unfreeze()
+            else:
+                self.container.start()
+
     def _lvm_lv_remove(self, lv_name):
         """Remove an LV.
 
@@ -1535,8 +1742,15 @@ class LxcContainerManagement(object):
             * Restore the state of the container
             * Create tar of tmpdir
             * Clean up
+
+        With ``archive_mode`` set to ``stream`` nothing is copied, the
+        container directory and the mounted snapshot or overlay are streamed
+        into the compressor and an LVM backed container is restored as soon
+        as its snapshot is mounted.
         """
 
+        stream = self.module.params.get('archive_mode') == 'stream'
+
         # Create a temp dir
         temp_dir = tempfile.mkdtemp()
 
@@ -1552,12 +1766,16 @@ class LxcContainerManagement(object):
         # Test if the container is using overlayfs
         overlayfs_backed = lxc_rootfs.startswith('overlayfs')
 
-        mount_point = os.path.join(work_dir, 'rootfs')
+        if stream:
+            mount_point = os.path.join(temp_dir, 'rootfs')
+        else:
+            mount_point = os.path.join(work_dir, 'rootfs')
 
         # Set the snapshot name if needed
         snapshot_name = '%s_lxc_snapshot' % self.container_name
 
         container_state = self._get_state()
+        state_restored = False
         try:
             # Ensure the original container is stopped or frozen
             if container_state not in ['stopped', 'frozen']:
@@ -1567,7 +1785,8 @@ class LxcContainerManagement(object):
                     self.container.stop()
 
             # Sync the container data from the container_path to work_dir
-            self._rsync_data(lxc_rootfs, temp_dir)
+            if not stream:
+                self._rsync_data(lxc_rootfs, temp_dir)
 
             if block_backed:
                 if snapshot_name not in self._lvm_lv_list():
@@ -1589,6 +1808,12 @@ class LxcContainerManagement(object):
                         lv_name=snapshot_name,
                         mount_point=mount_point
                     )
+
+                    # The snapshot holds the data now, the container does
+                    # not have to wait for the archive.
+                    if stream:
+                        self._restore_state(container_state)
+                        state_restored = True
                 else:
                     self.failure(
                         err='snapshot [ %s ] already exists' % snapshot_name,
@@ -1599,6 +1824,8 @@ class LxcContainerManagement(object):
                     )
             elif overlayfs_backed:
                 lowerdir, upperdir = lxc_rootfs.split(':')[1:]
+                if not os.path.exists(mount_point):
+                    os.makedirs(mount_point)
                 self._overlayfs_mount(
                     lowerdir=lowerdir,
                     upperdir=upperdir,
@@ -1607,7 +1834,27 @@ class LxcContainerManagement(object):
 
             # Set the state as changed and set a new fact
             self.state_change = True
-            return self._create_tar(source_dir=work_dir)
+            if not stream:
+                return self._create_tar(source_dir=work_dir)
+
+            if block_backed or overlayfs_backed:
+                # Everything but the rootfs comes from the container
+                # directory, the rootfs from the snapshot or overlay mount.
+                container_dir = os.path.dirname(
+                    self.container.config_file_name
+                )
+                members = [
+                    './%s' % i for i in sorted(os.listdir(container_dir))
+                    if i != 'rootfs'
+                ]
+                sources = [(temp_dir, ['./rootfs'])]
+                if members:
+                    sources.insert(0, (container_dir, members))
+            else:
+                sources = [(os.path.dirname(lxc_rootfs), ['.'])]
+
+            archive_name, self.archive_stats = self._stream_tar(sources)
+            return archive_name
         finally:
             if block_backed or overlayfs_backed:
                 # unmount snapshot
@@ -1618,11 +1865,8 @@ class LxcContainerManagement(object):
                 self._lvm_lv_remove(snapshot_name)
 
             # Restore original state of container
-            if container_state == 'running':
-                if self._get_state() == 'frozen':
-                    self.container.unfreeze()
-                else:
-                    self.container.start()
+            if not state_restored:
+                self._restore_state(container_state)
 
             # Remove tmpdir
             shutil.rmtree(temp_dir)
@@ -1753,6 +1997,14 @@ def main():
             archive_compression=dict(
                 choices=LXC_COMPRESSION_MAP.keys(),
                 default='gzip'
+            ),
+            archive_mode=dict(
+                choices=['copy', 'stream'],
+                default='copy'
+            ),
+            archive_threads=dict(
+                type='int',
+                default=0
             )
         ),
         supports_check_mode=False,
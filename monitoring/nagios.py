@@ -21,7 +21,7 @@ module: nagios
 short_description: Perform common tasks in Nagios related to downtime and notifications.
 description:
   - "The M(nagios) module has two basic functions: scheduling downtime and toggling alerts for services or hosts."
-  - All actions require the I(host) parameter to be given explicitly. In playbooks you can use the C({{inventory_hostname}}) variable to refer to the host the playbook is currently running on.
+  - All actions require the I(host) parameter to be given explicitly, or a list of I(hosts). In playbooks you can use the C({{inventory_hostname}}) variable to refer to the host the playbook is currently running on.
   - You can specify multiple services at once by separating them with commas, .e.g., C(services=httpd,nfs,puppet).
   - When specifying what service to handle there is a special service value, I(host), which will handle alerts/downtime for the I(host itself), e.g., C(service=host). This keyword may not be given with other services at the same time. I(Setting alerts/downtime for a host does not affect alerts/downtime for any of the services running on it.) To schedule downtime for all services on particular host use keyword "all", e.g., C(service=all).
   - When using the M(nagios) module you will need to specify your Nagios server using the C(delegate_to) parameter.
@@ -31,7 +31,8 @@ options:
     description:
       - Action to take.
       - servicegroup options were added in 2.0.
-    required: true
+      - Required unless I(actions) is given.
+    required: false
     choices: [ "downtime", "enable_alerts", "disable_alerts", "silence", "unsilence",
                "silence_nagios", "unsilence_nagios", "command", "servicegroup_service_downtime",
                "servicegroup_host_downtime" ]
@@ -40,12 +41,36 @@ options:
       - Host to operate on in Nagios.
     required: false
     default: null
+  hosts:
+    version_added: "2.3"
+    description:
+      - List of hosts to perform I(action) on, instead of a single I(host).
+      - The commands for all hosts are written to the command file at once.
+    required: false
+    default: null
+  actions:
+    version_added: "2.3"
+    description:
+      - List of actions to perform, each a dict with an C(action) and the options it needs
+        (C(host), C(services), C(servicegroup), C(minutes), C(command), C(author) and C(comment)).
+      - Options missing from an item default to the module options of the same name.
+      - The commands for all actions are written to the command file at once.
+    required: false
+    default: null
   cmdfile:
     description:
       - Path to the nagios I(command file) (FIFO pipe).
         Only required if auto-detection fails.
+      - Auto-detection follows the include_file, include_dir, cfg_file and cfg_dir directives of the main
+        config file, and remembers its result in C(~/.ansible/tmp/nagios_cmdfile.json) until one of the files read changes.
     required: false
     default: auto-detected
+  cmdfile_timeout:
+    version_added: "2.3"
+    description:
+      - Seconds to wait for Nagios to accept the commands, when opening and when writing to the I(command file).
+    required: false
+    default: 10
   author:
     description:
      - Author to leave downtime comments as.
@@ -132,16 +157,69 @@ EXAMPLES = '''
 
 # command something
 - nagios: action=command command='DISABLE_FAILURE_PREDICTION'
+
+# schedule an hour of downtime for all services of many hosts at once
+- nagios:
+    action: downtime
+    minutes: 60
+    service: all
+    hosts: "{{ groups['webservers'] }}"
+
+# mix several actions in one task
+- nagios:
+    actions:
+      - action: downtime
+        host: db01
+        service: host
+        minutes: 120
+      - action: disable_alerts
+        host: web01
+        services: httpd,nfs
+      - action: silence
+        host: web02
+'''
+
+RETURN = '''
+nagios_commands:
+    description: The commands written to the Nagios command file.
+    returned: success
+    type: list
+    sample: ["[1478000000] DISABLE_HOST_SVC_NOTIFICATIONS;web01", "[1478000000] DISABLE_HOST_NOTIFICATIONS;web01"]
+nagios_command_latency:
+    description: Seconds between queueing each command and writing it to the command file, in the order of nagios_commands.
+    returned: success
+    type: list
+    sample: [0.000412, 0.000412]
+    version_added: "2.3"
+nagios_hosts:
+    description: The commands written for each host.
+    returned: success
+    type: dict
+    sample: {"web01": ["[1478000000] DISABLE_HOST_SVC_NOTIFICATIONS;web01", "[1478000000] DISABLE_HOST_NOTIFICATIONS;web01"]}
+    version_added: "2.3"
 '''
 
 import ConfigParser
 import types
 import time
+import os
 import os.path
+import errno
+try:
+    import json
+except ImportError:
+    import simplejson as json
+import select
+import tempfile
 
 ######################################################################
 
 
+# where the command file found in each nagios.cfg is remembered, together
+# with the mtime of every file and directory it was looked up in
+CMDFILE_CACHE = '~/.ansible/tmp/nagios_cmdfile.json'
+
+
 def which_cmdfile():
     locations = [
         # rhel
@@ -167,14 +245,121 @@ def which_cmdfile():
         '/usr/local/icinga/etc/icinga.cfg',
         ]
 
+    cache = _load_cmdfile_cache()
+    cache_changed = False
+    cmdfile = None
+
     for path in locations:
         if os.path.exists(path):
-            for line in open(path):
-                if line.startswith('command_file'):
-                    return line.split('=')[1].strip()
+            entry = cache.get(path)
+            if not entry or not _mtimes_unchanged(entry.get('mtimes')):
+                mtimes = {}
+                entry = dict(cmdfile=_find_cmdfile(path, mtimes), mtimes=mtimes)
+                cache[path] = entry
+                cache_changed = True
+            if entry['cmdfile']:
+                cmdfile = entry['cmdfile']
+                break
+
+    if cache_changed:
+        _save_cmdfile_cache(cache)
+
+    return cmdfile
+
+
+def _find_cmdfile(path, mtimes):
+    """
+    Look for the command_file directive in the config file path, then in
+    the files it pulls in with include_file/include_dir and
+    cfg_file/cfg_dir. Relative paths are relative to the including file.
+    The mtime of every file and directory read is added to mtimes.
+    """
+
+    try:
+        mtimes[path] = os.stat(path).st_mtime
+        fp = open(path)
+    except (IOError, OSError):
+        return None
+
+    included = []
+    try:
+        for line in fp:
+            line = line.strip()
+            if not line or line[0] in '#;' or '=' not in line:
+                continue
+            key, value = [part.strip() for part in line.split('=', 1)]
+            if key == 'command_file':
+                return value
+            if key in ('include_file', 'include_dir', 'cfg_file', 'cfg_dir'):
+                included.append(os.path.join(os.path.dirname(path), value))
+    finally:
+        fp.close()
+
+    # only look into the included files when the file itself doesn't set
+    # the command file, cfg_dir trees of object definitions can be large
+    for include in included:
+        if include in mtimes:
+            continue
+        if os.path.isdir(include):
+            for root, dirs, files in os.walk(include):
+                dirs.sort()
+                mtimes[root] = os.stat(root).st_mtime
+                for name in sorted(files):
+                    if name.endswith('.cfg'):
+                        cmdfile = _find_cmdfile(os.path.join(root, name), mtimes)
+                        if cmdfile:
+                            return cmdfile
+        else:
+            cmdfile = _find_cmdfile(include, mtimes)
+            if cmdfile:
+                return cmdfile
 
     return None
 
+
+def _mtimes_unchanged(mtimes):
+    if not mtimes:
+        return False
+    for path, mtime in mtimes.items():
+        try:
+            if os.stat(path).st_mtime != mtime:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def _load_cmdfile_cache():
+    try:
+        fp = open(os.path.expanduser(CMDFILE_CACHE))
+        try:
+            cache = json.load(fp)
+        finally:
+            fp.close()
+    except (IOError, OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict):
+        return {}
+    return cache
+
+
+def _save_cmdfile_cache(cache):
+    path = os.path.expanduser(CMDFILE_CACHE)
+    try:
+        cache_dir = os.path.dirname(path)
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir, int('0700', 8))
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir)
+        fp = os.fdopen(fd, 'w')
+        try:
+            json.dump(cache, fp)
+        finally:
+            fp.close()
+        os.rename(tmp_path, path)
+    except (IOError, OSError):
+        # the cache is only an optimization
+        pass
+
 ######################################################################
 
 
@@ -192,78 +377,114 @@ def main():
         'servicegroup_service_downtime',
         ]
 
+    # the keys of an action record, see the 'actions' option
+    ACTION_RECORD_KEYS = ['action', 'author', 'comment', 'host', 'servicegroup',
+                          'minutes', 'services', 'command']
 
     module = AnsibleModule(
         argument_spec=dict(
-            action=dict(required=True, default=None, choices=ACTION_CHOICES),
+            action=dict(required=False, default=None, choices=ACTION_CHOICES),
             author=dict(default='Ansible'),
             comment=dict(default='Scheduling downtime'),
             host=dict(required=False, default=None),
+            hosts=dict(required=False, default=None, type='list'),
+            actions=dict(required=False, default=None, type='list'),
             servicegroup=dict(required=False, default=None),
             minutes=dict(default=30),
-            cmdfile=dict(default=which_cmdfile()),
+            cmdfile=dict(default=None),
+            cmdfile_timeout=dict(default=10, type='int'),
             services=dict(default=None, aliases=['service']),
             command=dict(required=False, default=None),
-            )
+            ),
+        mutually_exclusive=[['host', 'hosts', 'actions']],
         )
 
-    action = module.params['action']
-    host = module.params['host']
-    servicegroup = module.params['servicegroup']
-    minutes = module.params['minutes']
-    services = module.params['services']
     cmdfile = module.params['cmdfile']
-    command = module.params['command']
-
-    ##################################################################
-    # Required args per action:
-    # downtime = (minutes, service, host)
-    # (un)silence = (host)
-    # (enable/disable)_alerts = (service, host)
-    # command = command
-    #
-    # AnsibleModule will verify most stuff, we need to verify
-    # 'minutes' and 'service' manually.
-
-    ##################################################################
-    if action not in ['command', 'silence_nagios', 'unsilence_nagios']:
-        if not host:
-            module.fail_json(msg='no host specified for action requiring one')
-    ######################################################################
-    if action == 'downtime':
-        # Make sure there's an actual service selected
-        if not services:
-            module.fail_json(msg='no service selected to set downtime for')
-        # Make sure minutes is a number
-        try:
-            m = int(minutes)
-            if not isinstance(m, types.IntType):
-                module.fail_json(msg='minutes must be a number')
-        except Exception:
-            module.fail_json(msg='invalid entry for minutes')
-
-    ######################################################################
-
-    if action in ['servicegroup_service_downtime', 'servicegroup_host_downtime']:
-        # Make sure there's an actual servicegroup selected
-        if not servicegroup:
-            module.fail_json(msg='no servicegroup selected to set downtime for')
-        # Make sure minutes is a number
-        try:
-            m = int(minutes)
-            if not isinstance(m, types.IntType):
-                module.fail_json(msg='minutes must be a number')
-        except Exception:
-            module.fail_json(msg='invalid entry for minutes')
+    if not cmdfile:
+        cmdfile = module.params['cmdfile'] = which_cmdfile()
 
     ##################################################################
-    if action in ['enable_alerts', 'disable_alerts']:
-        if not services:
-            module.fail_json(msg='a service is required when setting alerts')
-
-    if action in ['command']:
-        if not command:
-            module.fail_json(msg='no command passed for command action')
+    # Every host of 'hosts' and every item of 'actions' is an action
+    # record; the options of the module are the defaults of each record.
+    defaults = dict((key, module.params[key]) for key in ACTION_RECORD_KEYS)
+    if module.params['actions']:
+        records = []
+        for item in module.params['actions']:
+            if not isinstance(item, dict):
+                module.fail_json(msg='each item of actions must be a dict: %s' % item)
+            record = dict(defaults)
+            for key, value in item.items():
+                if key == 'service':
+                    key = 'services'
+                if key not in ACTION_RECORD_KEYS:
+                    module.fail_json(msg="unsupported key '%s' in actions item: %s" % (key, item))
+                record[key] = value
+            records.append(record)
+    elif module.params['hosts']:
+        records = [dict(defaults, host=host) for host in module.params['hosts']]
+    else:
+        records = [defaults]
+
+    for record in records:
+        action = record['action']
+        host = record['host']
+        servicegroup = record['servicegroup']
+        minutes = record['minutes']
+        services = record['services']
+        command = record['command']
+
+        ##############################################################
+        # Required args per action:
+        # downtime = (minutes, service, host)
+        # (un)silence = (host)
+        # (enable/disable)_alerts = (service, host)
+        # command = command
+        #
+        # AnsibleModule will verify most stuff, we need to verify
+        # 'action', 'minutes' and 'service' manually.
+
+        ##############################################################
+        if action not in ACTION_CHOICES:
+            module.fail_json(msg='invalid or missing action: %s' % action)
+        ##############################################################
+        if action not in ['command', 'silence_nagios', 'unsilence_nagios']:
+            if not host:
+                module.fail_json(msg='no host specified for action requiring one')
+        ##################################################################
+        if action == 'downtime':
+            # Make sure there's an actual service selected
+            if not services:
+                module.fail_json(msg='no service selected to set downtime for')
+            # Make sure minutes is a number
+            try:
+                m = int(minutes)
+                if not isinstance(m, types.IntType):
+                    module.fail_json(msg='minutes must be a number')
+            except Exception:
+                module.fail_json(msg='invalid entry for minutes')
+
+        ##################################################################
+
+        if action in ['servicegroup_service_downtime', 'servicegroup_host_downtime']:
+            # Make sure there's an actual servicegroup selected
+            if not servicegroup:
+                module.fail_json(msg='no servicegroup selected to set downtime for')
+            # Make sure minutes is a number
+            try:
+                m = int(minutes)
+                if not isinstance(m, types.IntType):
+                    module.fail_json(msg='minutes must be a number')
+            except Exception:
+                module.fail_json(msg='invalid entry for minutes')
+
+        ##############################################################
+        if action in ['enable_alerts', 'disable_alerts']:
+            if not services:
+                module.fail_json(msg='a service is required when setting alerts')
+
+        if action in ['command']:
+            if not command:
+                module.fail_json(msg='no command passed for command action')
     ##################################################################
     if not cmdfile:
         module.fail_json(msg='unable to locate nagios.cfg')
@@ -273,7 +494,7 @@ def main():
     if module.check_mode:
         module.exit_json(changed=True)
     else:
-        ansible_nagios.act()
+        ansible_nagios.act(records)
     ##################################################################
 
 
@@ -296,20 +517,34 @@ class Nagios(object):
     def __init__(self, module, **kwargs):
         self.module = module
         self.action = kwargs['action']
-        self.author = kwargs['author']
-        self.comment = kwargs['comment']
+        self.author = self.default_author = kwargs['author']
+        self.comment = self.default_comment = kwargs['comment']
         self.host = kwargs['host']
         self.servicegroup = kwargs['servicegroup']
         self.minutes = int(kwargs['minutes'])
         self.cmdfile = kwargs['cmdfile']
+        self.cmdfile_timeout = kwargs['cmdfile_timeout']
         self.command = kwargs['command']
 
-        if (kwargs['services'] is None) or (kwargs['services'] == 'host') or (kwargs['services'] == 'all'):
-            self.services = kwargs['services']
-        else:
-            self.services = kwargs['services'].split(',')
+        self.services = self._parse_services(kwargs['services'])
 
         self.command_results = []
+        self.command_latency = []
+        self.host_results = {}
+        self._pending_commands = []
+        self._current_host = None
+
+    def _parse_services(self, services):
+        """
+        Split a comma separated list of services, leaving the special
+        'host' and 'all' values alone
+        """
+
+        if (services is None) or (services == 'host') or (services == 'all'):
+            return services
+        if isinstance(services, list):
+            return services
+        return services.split(',')
 
     def _now(self):
         """
@@ -320,18 +555,88 @@ class Nagios(object):
 
     def _write_command(self, cmd):
         """
-        Write the given command to the Nagios command file
+        Queue the given command for the Nagios command file. The queued
+        commands are written all at once by _flush_commands.
+        """
+
+        self._pending_commands.append((cmd, time.time(), self._current_host))
+        return True
+
+    def _wait_cmdfile(self, deadline):
+        """
+        Wait until the command file can be written to without blocking,
+        or fail once deadline has passed.
+        """
+
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise IOError(errno.ETIMEDOUT, 'timed out after %s seconds' % self.cmdfile_timeout)
+        time.sleep(min(0.1, remaining))
+
+    def _flush_commands(self):
+        """
+        Write all the queued commands to the Nagios command file.
+
+        The file is opened once, without blocking forever when Nagios
+        is not reading the FIFO. The commands are joined into writes of at
+        most PIPE_BUF bytes, which the kernel writes to a FIFO atomically, so
+        that they don't interleave with commands sent by other processes.
         """
 
+        if not self._pending_commands:
+            return
+
+        pipe_buf = getattr(select, 'PIPE_BUF', 512)
+        chunks = []
+        for pending in self._pending_commands:
+            cmd = pending[0]
+            if chunks and len(chunks[-1][0]) + len(cmd) <= pipe_buf:
+                chunks[-1][0] += cmd
+                chunks[-1][1].append(pending)
+            else:
+                chunks.append([cmd, [pending]])
+        self._pending_commands = []
+
+        deadline = time.time() + self.cmdfile_timeout
+        fd = None
         try:
-            fp = open(self.cmdfile, 'w')
-            fp.write(cmd)
-            fp.flush()
-            fp.close()
-            self.command_results.append(cmd.strip())
-        except IOError:
-            self.module.fail_json(msg='unable to write to nagios command file',
-                                  cmdfile=self.cmdfile)
+            try:
+                while fd is None:
+                    try:
+                        fd = os.open(self.cmdfile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_NONBLOCK)
+                    except OSError:
+                        e = get_exception()
+                        # ENXIO: nothing has the FIFO open for reading yet
+                        if e.errno != errno.ENXIO:
+                            raise
+                        self._wait_cmdfile(deadline)
+
+                for data, commands in chunks:
+                    deadline = time.time() + self.cmdfile_timeout
+                    while data:
+                        try:
+                            data = data[os.write(fd, data):]
+                        except OSError:
+                            e = get_exception()
+                            # EAGAIN: the FIFO is full, Nagios is busy
+                            if e.errno != errno.EAGAIN:
+                                raise
+                            self._wait_cmdfile(deadline)
+                    written = time.time()
+                    for cmd, queued, host in commands:
+                        self.command_results.append(cmd.strip())
+                        self.command_latency.append(round(written - queued, 6))
+                        if host is not None:
+                            self.host_results.setdefault(host, []).append(cmd.strip())
+            except (IOError, OSError):
+                e = get_exception()
+                self.module.fail_json(msg='unable to write to nagios command file: %s' % e,
+                                      cmdfile=self.cmdfile,
+                                      nagios_commands=self.command_results,
+                                      nagios_hosts=self.host_results)
+        finally:
+            if fd is not None:
+                os.close(fd)
 
     def _fmt_dt_str(self, cmd, host, duration, author=None,
                     comment=None, start=None,
@@ -876,71 +1181,106 @@ class Nagios(object):
         cmdstr = '%s %s%s' % (pre, cmd, post)
         self._write_command(cmdstr)
 
-    def act(self):
+    def act(self, records=None):
         """
         Figure out what you want to do from ansible, and then do the
         needful (at the earliest).
+
+        records - List of dicts with the action and its arguments, see
+          act_on. Defaults to the single action the module was given.
+
+        All the commands are written to the command file at once.
+        """
+
+        if records is None:
+            records = [dict(action=self.action, host=self.host,
+                            services=self.services,
+                            servicegroup=self.servicegroup,
+                            minutes=self.minutes, command=self.command,
+                            author=self.author, comment=self.comment)]
+
+        for record in records:
+            self.act_on(**record)
+
+        self._flush_commands()
+        self.module.exit_json(nagios_commands=self.command_results,
+                              nagios_command_latency=self.command_latency,
+                              nagios_hosts=self.host_results,
+                              changed=True)
+
+    def act_on(self, action, host=None, services=None, servicegroup=None,
+               minutes=30, command=None, author=None, comment=None):
+        """
+        Queue the commands of a single action.
         """
+
+        services = self._parse_services(services)
+        minutes = int(minutes)
+        # every record starts again from the author and comment of the task
+        self.author = author or self.default_author
+        self.comment = comment or self.default_comment
+        self._current_host = host
+
         # host or service downtime?
-        if self.action == 'downtime':
-            if self.services == 'host':
-                self.schedule_host_downtime(self.host, self.minutes)
-            elif self.services == 'all':
-                self.schedule_host_svc_downtime(self.host, self.minutes)
+        if action == 'downtime':
+            if services == 'host':
+                self.schedule_host_downtime(host, minutes)
+            elif services == 'all':
+                self.schedule_host_svc_downtime(host, minutes)
             else:
-                self.schedule_svc_downtime(self.host,
-                                           services=self.services,
-                                           minutes=self.minutes)
-        elif self.action == "servicegroup_host_downtime":
-            if self.servicegroup:
-                self.schedule_servicegroup_host_downtime(servicegroup = self.servicegroup, minutes = self.minutes)
-        elif self.action == "servicegroup_service_downtime":
-            if self.servicegroup:
-                self.schedule_servicegroup_svc_downtime(servicegroup = self.servicegroup, minutes = self.minutes)
+                self.schedule_svc_downtime(host,
+                                           services=services,
+                                           minutes=minutes)
+        elif action == "servicegroup_host_downtime":
+            if servicegroup:
+                self.schedule_servicegroup_host_downtime(servicegroup = servicegroup, minutes = minutes)
+        elif action == "servicegroup_service_downtime":
+            if servicegroup:
+                self.schedule_servicegroup_svc_downtime(servicegroup = servicegroup, minutes = minutes)
 
         # toggle the host AND service alerts
-        elif self.action == 'silence':
-            self.silence_host(self.host)
+        elif action == 'silence':
+            self.silence_host(host)
 
-        elif self.action == 'unsilence':
-            self.unsilence_host(self.host)
+        elif action == 'unsilence':
+            self.unsilence_host(host)
 
         # toggle host/svc alerts
-        elif self.action == 'enable_alerts':
-            if self.services == 'host':
-                self.enable_host_notifications(self.host)
-            elif self.services == 'all':
-                self.enable_host_svc_notifications(self.host)
+        elif action == 'enable_alerts':
+            if services == 'host':
+                self.enable_host_notifications(host)
+            elif services == 'all':
+                self.enable_host_svc_notifications(host)
             else:
-                self.enable_svc_notifications(self.host,
-                                              services=self.services)
-
-        elif self.action == 'disable_alerts':
-            if self.services == 'host':
-                self.disable_host_notifications(self.host)
-            elif self.services == 'all':
-                self.disable_host_svc_notifications(self.host)
+                self.enable_svc_notifications(host,
+                                              services=services)
+
+        elif action == 'disable_alerts':
+            if services == 'host':
+                self.disable_host_notifications(host)
+            elif services == 'all':
+                self.disable_host_svc_notifications(host)
             else:
-                self.disable_svc_notifications(self.host,
-                                               services=self.services)
-        elif self.action == 'silence_nagios':
+                self.disable_svc_notifications(host,
+                                               services=services)
+        elif action == 'silence_nagios':
             self.silence_nagios()
 
-        elif self.action == 'unsilence_nagios':
+        elif action == 'unsilence_nagios':
             self.unsilence_nagios()
 
-        elif self.action == 'command':
-            self.nagios_cmd(self.command)
+        elif action == 'command':
+            self.nagios_cmd(command)
 
         # wtf?
         else:
             self.module.fail_json(msg="unknown action specified: '%s'" % \
-                                      self.action)
+                                      action)
 
-        self.module.exit_json(nagios_commands=self.command_results,
-                              changed=True)
+        self._current_host = None
 
 ######################################################################
 # import module snippets
 from ansible.module_utils.basic import *
+from ansible.module_utils.pycompat24 import get_exception
 main()
@@ -63,7 +63,8 @@ options:
         description:
             - Name of the host in Zabbix.
             - host_name is the unique identifier used and cannot be updated using this module.
-        required: true
+            - Required unless I(hosts) is given.
+        required: false
     host_groups:
         description:
             - List of host groups the host is part of.
@@ -98,6 +99,20 @@ options:
         description:
             - The timeout of API request (seconds).
         default: 10
+    cache_ttl:
+        description:
+            - Number of seconds the host group, template and proxy IDs looked up by previous tasks are reused.
+            - An ID refused by the API, or finding nothing, is looked up again and the request retried once.
+            - 0 disables the cache.
+        required: false
+        default: 0
+        version_added: "2.3"
+    cache_dir:
+        description:
+            - Directory holding the cache files, one per server and user.
+        required: false
+        default: "~/.ansible/tmp/zabbix_cache"
+        version_added: "2.3"
     proxy:
         description:
             - The name of the Zabbix Proxy to be used
@@ -117,6 +132,17 @@ options:
         default: "yes"
         choices: [ "yes", "no" ]
         version_added: "2.0"
+    hosts:
+        description:
+            - List of hosts to create, update or delete in bulk, instead of a single I(host_name).
+            - 'Each item is a dict with a C(host_name) and optionally C(host_groups), C(link_templates), C(inventory_mode),
+              C(status), C(state), C(interfaces) and C(proxy), which default to the module options of the same name.'
+            - Group, template and proxy names are resolved with one query each, the existing hosts are fetched with a single
+              host.get, and the changes are sent as batched host.create, host.update and host.massupdate calls.
+            - The result contains a C(hosts) dict mapping every host name to C(created), C(updated), C(deleted) or C(unchanged).
+        required: false
+        default: None
+        version_added: "2.3"
 '''
 
 EXAMPLES = '''
@@ -150,19 +176,60 @@ EXAMPLES = '''
         dns: ""
         port: 12345
     proxy: a.zabbix.proxy
+
+- name: Register many hosts sharing their groups and templates
+  local_action:
+    module: zabbix_host
+    server_url: http://monitor.example.com
+    login_user: username
+    login_password: password
+    host_groups:
+      - Example group1
+    link_templates:
+      - Example template1
+    hosts:
+      - host_name: web01
+        interfaces:
+          - type: 1
+            main: 1
+            useip: 1
+            ip: 10.0.0.11
+            dns: ""
+            port: 10050
+      - host_name: web02
+        interfaces:
+          - type: 1
+            main: 1
+            useip: 1
+            ip: 10.0.0.12
+            dns: ""
+            port: 10050
+      - host_name: web03
+        state: absent
 '''
 
 import logging
 import copy
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
 
 try:
     from zabbix_api import ZabbixAPI, ZabbixAPISubClass
+    from zabbix_api import ZabbixAPIException
 
     HAS_ZABBIX_API = True
 except ImportError:
+    ZabbixAPI = object
     HAS_ZABBIX_API = False
 
 
+INVENTORY_MODES = {'automatic': 1, 'manual': 0, 'disabled': -1}
+
+
 # Extend the ZabbixAPI
 # Since the zabbix-api python module too old (version 1.0, no higher version so far),
 # it does not support the 'hostinterface' api calls,
@@ -170,9 +237,147 @@ except ImportError:
 class ZabbixAPIExtends(ZabbixAPI):
     hostinterface = None
 
-    def __init__(self, server, timeout, user, passwd, **kwargs):
+    # the cache code below is copied in the zabbix modules using it; keep the copies in sync
+
+    # request parameters holding ids that get_cached_ids() looks up, to their id field
+    cached_id_params = {
+        'groupid': 'groupid', 'groupids': 'groupid',
+        'templateid': 'templateid', 'templateids': 'templateid',
+        'proxyid': 'proxyid', 'proxyids': 'proxyid', 'proxy_hostid': 'proxyid',
+    }
+
+    def __init__(self, server, timeout, user, passwd, cache_ttl=0, cache_dir=None, **kwargs):
         ZabbixAPI.__init__(self, server, timeout=timeout, user=user, passwd=passwd)
         self.hostinterface = ZabbixAPISubClass(self, dict({"prefix": "hostinterface"}, **kwargs))
+        self.cache_ttl = cache_ttl
+        self.cache_dir = cache_dir
+        self._cache_path = None
+        self._cache = {}
+        # (id field, id) served from the cache in this run, to the prefix, name field and name
+        self._served_ids = {}
+
+    def login(self, user='', password='', save=True):
+        ZabbixAPI.login(self, user, password, save)
+        if self.cache_ttl > 0 and self.cache_dir:
+            # one file per server and user; neither the password nor the session is stored
+            key = hashlib.sha1(json.dumps([self.server, self.httpuser, user]).encode('utf-8')).hexdigest()
+            self._cache_path = os.path.join(os.path.expanduser(self.cache_dir), key + '.json')
+            self._load_cache()
+
+    # an id served from the cache may belong to an object deleted or recreated since,
+    # then the request fails or a get finds nothing; look those ids up again and retry once
+    def do_request(self, json_obj):
+        request = json.loads(json_obj)
+        found = []
+        self._map_ids(request.get('params'), lambda id_field, value: found.append((id_field, str(value))) or value)
+        served = [key for key in set(found) if key in self._served_ids]
+        if not served:
+            return ZabbixAPI.do_request(self, json_obj)
+
+        error = None
+        try:
+            response = ZabbixAPI.do_request(self, json_obj)
+            if response.get('result') or not request['method'].endswith('.get'):
+                return response
+        except ZabbixAPIException:
+            error = get_exception()
+            if not re.search(r'No permissions|does not exist', str(error)):
+                raise
+        new_ids = {}
+        for id_field, old_id in served:
+            prefix, name_field, name = self._served_ids.pop((id_field, old_id))
+            ids = self.get_cached_ids(prefix, name_field, id_field, [name], fresh=True)
+            if name in ids and str(ids[name]) != old_id:
+                new_ids[(id_field, old_id)] = ids[name]
+        if not new_ids:
+            if error is not None:
+                raise error
+            return response
+        request['params'] = self._map_ids(request['params'],
+                                          lambda id_field, value: new_ids.get((id_field, str(value)), value))
+        return ZabbixAPI.do_request(self, json.dumps(request))
+
+    # returns params with every id of a cached kind replaced by visit(id field, id)
+    def _map_ids(self, params, visit):
+        if isinstance(params, list):
+            return [self._map_ids(p, visit) for p in params]
+        if not isinstance(params, dict):
+            return params
+        mapped = {}
+        for key, value in params.items():
+            id_field = self.cached_id_params.get(key)
+            if id_field is None:
+                mapped[key] = self._map_ids(value, visit)
+            elif isinstance(value, list):
+                mapped[key] = [visit(id_field, v) for v in value]
+            else:
+                mapped[key] = visit(id_field, value)
+        return mapped
+
+    # resolve names to ids with one query, reusing the lookups cached less than
+    # cache_ttl seconds ago unless fresh is set
+    def get_cached_ids(self, prefix, name_field, id_field, names, fresh=False):
+        ids = {}
+        missing = []
+        now = time.time()
+        cached = self._cache.setdefault(prefix, {})
+        for name in names:
+            entry = cached.get(name)
+            if not fresh and self._cache_path is not None and entry and now - entry[1] < self.cache_ttl:
+                ids[name] = entry[0]
+                self._served_ids[(id_field, str(entry[0]))] = (prefix, name_field, name)
+            elif name not in missing:
+                missing.append(name)
+                cached.pop(name, None)
+        if missing:
+            for item in getattr(self, prefix).get({'output': [id_field, name_field], 'filter': {name_field: missing}}):
+                ids[item[name_field]] = item[id_field]
+                cached[item[name_field]] = [item[id_field], now]
+            self._save_cache()
+        return ids
+
+    def forget_cached_ids(self, prefix, names):
+        for name in names:
+            self._cache.setdefault(prefix, {}).pop(name, None)
+        self._save_cache()
+
+    def _load_cache(self):
+        try:
+            f = open(self._cache_path)
+            try:
+                cache = json.load(f)
+            finally:
+                f.close()
+        except (IOError, OSError, ValueError):
+            return
+        # ignore a file not holding {prefix: {name: [id, time]}}
+        if not isinstance(cache, dict):
+            return
+        for entries in cache.values():
+            if not isinstance(entries, dict):
+                return
+            for entry in entries.values():
+                if not isinstance(entry, list) or len(entry) != 2 or not isinstance(entry[1], (int, float)):
+                    return
+        self._cache = cache
+
+    def _save_cache(self):
+        if self._cache_path is None:
+            return
+        try:
+            cache_dir = os.path.dirname(self._cache_path)
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir, int('0700', 8))
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir)
+            f = os.fdopen(fd, 'w')
+            try:
+                json.dump(self._cache, f)
+            finally:
+                f.close()
+            os.rename(tmp_path, self._cache_path)
+        except (IOError, OSError):
+            # the cache is only an optimization
+            pass
 
 
 class Host(object):
@@ -185,25 +390,13 @@ class Host(object):
         result = self._zapi.host.get({'filter': {'host': host_name}})
         return result
 
-    # check if host group exists
-    def check_host_group_exist(self, group_names):
-        for group_name in group_names:
-            result = self._zapi.hostgroup.get({'filter': {'name': group_name}})
-            if not result:
-                self._module.fail_json(msg="Hostgroup not found: %s" % group_name)
-        return True
-
     def get_template_ids(self, template_list):
         template_ids = []
         if template_list is None or len(template_list) == 0:
             return template_ids
+        template_id_map = self.get_ids_by_names('template', template_list, 'host', 'templateid', 'Template')
         for template in template_list:
-            template_list = self._zapi.template.get({'output': 'extend', 'filter': {'host': template}})
-            if len(template_list) < 1:
-                self._module.fail_json(msg="Template not found: %s" % template)
-            else:
-                template_id = template_list[0]['templateid']
-                template_ids.append(template_id)
+            template_ids.append(template_id_map[template])
         return template_ids
 
     def add_host(self, host_name, group_ids, status, interfaces, proxy_id):
@@ -274,20 +467,14 @@ class Host(object):
 
     # get proxyid by proxy name
     def get_proxyid_by_proxy_name(self, proxy_name):
-        proxy_list = self._zapi.proxy.get({'output': 'extend', 'filter': {'host': [proxy_name]}})
-        if len(proxy_list) < 1:
-            self._module.fail_json(msg="Proxy not found: %s" % proxy_name)
-        else:
-            return proxy_list[0]['proxyid']
+        return self.get_ids_by_names('proxy', [proxy_name], 'host', 'proxyid', 'Proxy')[proxy_name]
 
     # get group ids by group names
     def get_group_ids_by_group_names(self, group_names):
         group_ids = []
-        if self.check_host_group_exist(group_names):
-            group_list = self._zapi.hostgroup.get({'output': 'extend', 'filter': {'name': group_names}})
-            for group in group_list:
-                group_id = group['groupid']
-                group_ids.append({'groupid': group_id})
+        group_id_map = self.get_ids_by_names('hostgroup', group_names, 'name', 'groupid', 'Hostgroup')
+        for group_id in set(group_id_map.values()):
+            group_ids.append({'groupid': group_id})
         return group_ids
 
     # get host templates by host id
@@ -395,12 +582,7 @@ class Host(object):
         if not inventory_mode:
             return
 
-        if inventory_mode == "automatic":
-            inventory_mode = int(1)
-        elif inventory_mode == "manual":
-            inventory_mode = int(0)
-        elif inventory_mode == "disabled":
-            inventory_mode = int(-1)
+        inventory_mode = INVENTORY_MODES[inventory_mode]
 
         # watch for - https://support.zabbix.com/browse/ZBX-6033
         request_str = {'hostid': host_id, 'inventory_mode': inventory_mode}
@@ -411,13 +593,202 @@ class Host(object):
         except Exception, e:
             self._module.fail_json(msg="Failed to set inventory_mode to host: %s" % e)
 
+    # resolve names to ids with a single query, or from the lookup cache
+    def get_ids_by_names(self, prefix, names, name_field, id_field, kind):
+        names = sorted(set(names))
+        if not names:
+            return {}
+        ids = self._zapi.get_cached_ids(prefix, name_field, id_field, names)
+        for name in names:
+            if name not in ids:
+                self._module.fail_json(msg="%s not found: %s" % (kind, name))
+        return ids
+
+    # get the hosts with their groups, templates and interfaces by host names
+    def get_hosts_by_host_names(self, host_names):
+        if not host_names:
+            return {}
+        host_list = self._zapi.host.get({'output': 'extend', 'filter': {'host': host_names},
+                                         'selectGroups': ['groupid', 'name'],
+                                         'selectParentTemplates': ['templateid'],
+                                         'selectInterfaces': 'extend',
+                                         'selectInventory': ['inventory_mode']})
+        return dict((host['host'], host) for host in host_list)
+
+    # get the inventory mode of a host returned by get_hosts_by_host_names
+    def get_inventory_mode_by_host(self, host):
+        if 'inventory_mode' in host:
+            return int(host['inventory_mode'])
+        # older servers give an empty list as the inventory of hosts with the inventory disabled
+        inventory = host.get('inventory')
+        if isinstance(inventory, dict) and 'inventory_mode' in inventory:
+            return int(inventory['inventory_mode'])
+        return INVENTORY_MODES['disabled']
+
+    # split the wanted interfaces into interfaces to update, create and delete
+    def get_interface_changes(self, host_id, interfaces, exist_interface_list):
+        update_interfaces = []
+        create_interfaces = []
+        remaining_interfaces = list(exist_interface_list)
+        for interface in interfaces:
+            interface = dict(interface)
+            for exist_interface in remaining_interfaces:
+                if int(interface['type']) == int(exist_interface['type']):
+                    remaining_interfaces.remove(exist_interface)
+                    if any(str(exist_interface.get(key)) != str(value) for key, value in interface.items()):
+                        interface['interfaceid'] = exist_interface['interfaceid']
+                        update_interfaces.append(interface)
+                    break
+            else:
+                interface['hostid'] = host_id
+                create_interfaces.append(interface)
+        remove_interface_ids = [interface['interfaceid'] for interface in remaining_interfaces]
+        return update_interfaces, create_interfaces, remove_interface_ids
+
+    # create, update or delete many hosts with batched API calls
+    def sync_hosts(self, host_specs, force):
+        group_ids = self.get_ids_by_names('hostgroup',
+                                          [g for spec in host_specs for g in spec['host_groups'] or []],
+                                          'name', 'groupid', 'Hostgroup')
+        template_ids = self.get_ids_by_names('template',
+                                             [t for spec in host_specs for t in spec['link_templates'] or []],
+                                             'host', 'templateid', 'Template')
+        proxy_ids = self.get_ids_by_names('proxy',
+                                          [spec['proxy'] for spec in host_specs if spec['proxy']],
+                                          'host', 'proxyid', 'Proxy')
+        exist_hosts = self.get_hosts_by_host_names([spec['host_name'] for spec in host_specs])
+
+        results = {}
+        create_hosts = []
+        update_hosts = []
+        delete_host_ids = []
+        update_interfaces = []
+        create_interfaces = []
+        remove_interface_ids = []
+
+        for spec in host_specs:
+            host_name = spec['host_name']
+            exist_host = exist_hosts.get(host_name)
+
+            if spec['state'] == 'absent':
+                if exist_host:
+                    delete_host_ids.append(exist_host['hostid'])
+                    results[host_name] = 'deleted'
+                else:
+                    results[host_name] = 'unchanged'
+                continue
+
+            host_groups = spec['host_groups'] or []
+            interfaces = spec['interfaces'] or []
+            host_group_ids = [{'groupid': group_ids[group_name]} for group_name in host_groups]
+            host_template_ids = [template_ids[template] for template in spec['link_templates'] or []]
+            status = 1 if spec['status'] == "disabled" else 0
+            inventory_mode = INVENTORY_MODES.get(spec['inventory_mode'])
+
+            if exist_host is None:
+                if not host_group_ids:
+                    self._module.fail_json(msg="Specify at least one group for creating host '%s'." % host_name)
+                if not interfaces:
+                    self._module.fail_json(msg="Specify at least one interface for creating host '%s'." % host_name)
+                parameters = {'host': host_name, 'interfaces': interfaces, 'groups': host_group_ids,
+                              'status': status,
+                              'templates': [{'templateid': template_id} for template_id in host_template_ids]}
+                if spec['proxy']:
+                    parameters['proxy_hostid'] = proxy_ids[spec['proxy']]
+                if inventory_mode is not None:
+                    parameters['inventory_mode'] = inventory_mode
+                create_hosts.append(parameters)
+                results[host_name] = 'created'
+                continue
+
+            if not host_group_ids:
+                self._module.fail_json(msg="Specify at least one group for updating host '%s'." % host_name)
+            if not force:
+                self._module.fail_json(changed=False, result="Host %s present, Can't update configuration without force" % host_name)
+
+            host_id = exist_host['hostid']
+            proxy_id = proxy_ids[spec['proxy']] if spec['proxy'] else None
+            exist_template_ids = set(t['templateid'] for t in exist_host['parentTemplates'])
+            if (set(host_groups) == set(g['name'] for g in exist_host['groups']) and
+                    int(status) == int(exist_host['status']) and
+                    not self.check_interface_properties(exist_host['interfaces'], interfaces) and
+                    set(host_template_ids) == exist_template_ids and
+                    (proxy_id is None or exist_host['proxy_hostid'] == proxy_id) and
+                    (inventory_mode is None or inventory_mode == self.get_inventory_mode_by_host(exist_host))):
+                results[host_name] = 'unchanged'
+                continue
+
+            parameters = {'hostid': host_id, 'groups': host_group_ids, 'status': status,
+                          'templates': [{'templateid': template_id} for template_id in set(host_template_ids)],
+                          'templates_clear': [{'templateid': template_id}
+                                              for template_id in exist_template_ids.difference(host_template_ids)]}
+            if proxy_id:
+                parameters['proxy_hostid'] = proxy_id
+            if inventory_mode is not None:
+                parameters['inventory_mode'] = inventory_mode
+            update_hosts.append(parameters)
+            if interfaces:
+                updates, creates, removes = self.get_interface_changes(host_id, interfaces, exist_host['interfaces'])
+                update_interfaces.extend(updates)
+                create_interfaces.extend(creates)
+                remove_interface_ids.extend(removes)
+            results[host_name] = 'updated'
+
+        changed = bool(create_hosts or update_hosts or delete_host_ids)
+        if self._module.check_mode or not changed:
+            return changed, results
+
+        try:
+            if create_hosts:
+                self._zapi.host.create(create_hosts)
+            if delete_host_ids:
+                self._zapi.host.delete(delete_host_ids)
+            if update_hosts:
+                self.update_hosts(update_hosts)
+            if update_interfaces:
+                self._zapi.hostinterface.update(update_interfaces)
+            if create_interfaces:
+                self._zapi.hostinterface.create(create_interfaces)
+            if remove_interface_ids:
+                self._zapi.hostinterface.delete(remove_interface_ids)
+        except Exception, e:
+            self._module.fail_json(msg="Failed to update hosts: %s" % e, hosts=results)
+        return changed, results
+
+    # hosts that get the same groups, templates, status, proxy and inventory
+    # mode, and have no templates to clear, are updated with one
+    # host.massupdate; the other hosts are updated with one host.update
+    def update_hosts(self, update_hosts):
+        mass_updates = {}
+        single_updates = []
+        for parameters in update_hosts:
+            if parameters['templates_clear']:
+                single_updates.append(parameters)
+                continue
+            key = (tuple(sorted(g['groupid'] for g in parameters['groups'])),
+                   tuple(sorted(t['templateid'] for t in parameters['templates'])),
+                   parameters['status'], parameters.get('proxy_hostid'), parameters.get('inventory_mode'))
+            mass_updates.setdefault(key, []).append(parameters)
+
+        for key, hosts in mass_updates.items():
+            if len(hosts) == 1:
+                single_updates.extend(hosts)
+                continue
+            parameters = dict((k, v) for k, v in hosts[0].items() if k not in ('hostid', 'templates_clear'))
+            parameters['hosts'] = [{'hostid': host['hostid']} for host in hosts]
+            self._zapi.host.massupdate(parameters)
+
+        if single_updates:
+            self._zapi.host.update(single_updates)
+
+
 def main():
     module = AnsibleModule(
         argument_spec=dict(
             server_url=dict(type='str', required=True, aliases=['url']),
             login_user=dict(rtype='str', equired=True),
             login_password=dict(type='str', required=True, no_log=True),
-            host_name=dict(type='str', required=True),
+            host_name=dict(type='str', required=False),
             http_login_user=dict(type='str', required=False, default=None),
             http_login_password=dict(type='str', required=False, default=None, no_log=True),
             host_groups=dict(type='list', required=False),
@@ -426,10 +797,15 @@ def main():
             state=dict(default="present", choices=['present', 'absent']),
             inventory_mode=dict(required=False, choices=['automatic', 'manual', 'disabled']),
             timeout=dict(type='int', default=10),
+            cache_ttl=dict(type='int', default=0),
+            cache_dir=dict(type='path', default='~/.ansible/tmp/zabbix_cache'),
             interfaces=dict(type='list', required=False),
             force=dict(type='bool', default=True),
-            proxy=dict(type='str', required=False)
+            proxy=dict(type='str', required=False),
+            hosts=dict(type='list', required=False)
         ),
+        required_one_of=[['host_name', 'hosts']],
+        mutually_exclusive=[['host_name', 'hosts']],
         supports_check_mode=True
     )
 
@@ -451,6 +827,7 @@ def main():
     interfaces = module.params['interfaces']
     force = module.params['force']
     proxy = module.params['proxy']
+    hosts = module.params['hosts']
 
     # convert enabled to 0; disabled to 1
     status = 1 if status == "disabled" else 0
@@ -458,13 +835,33 @@ def main():
     zbx = None
     # login to zabbix
     try:
-        zbx = ZabbixAPIExtends(server_url, timeout=timeout, user=http_login_user, passwd=http_login_password)
+        zbx = ZabbixAPIExtends(server_url, timeout=timeout, user=http_login_user, passwd=http_login_password,
+                               cache_ttl=module.params['cache_ttl'], cache_dir=module.params['cache_dir'])
         zbx.login(login_user, login_password)
     except Exception, e:
         module.fail_json(msg="Failed to connect to Zabbix server: %s" % e)
 
     host = Host(module, zbx)
 
+    if hosts:
+        # bulk mode, every option but the host name defaults to the module option
+        host_specs = []
+        for host_spec in hosts:
+            if not isinstance(host_spec, dict) or not host_spec.get('host_name'):
+                module.fail_json(msg="Each item in hosts must be a dict with at least a host_name: %s" % host_spec)
+            spec = dict(host_groups=host_groups, link_templates=link_templates, inventory_mode=inventory_mode,
+                        status=module.params['status'], state=state, interfaces=interfaces, proxy=proxy)
+            spec.update(host_spec)
+            if spec['state'] not in ('present', 'absent'):
+                module.fail_json(msg="Invalid state '%s' for host %s" % (spec['state'], spec['host_name']))
+            if spec['status'] not in ('enabled', 'disabled'):
+                module.fail_json(msg="Invalid status '%s' for host %s" % (spec['status'], spec['host_name']))
+            if spec['inventory_mode'] not in INVENTORY_MODES and spec['inventory_mode'] is not None:
+                module.fail_json(msg="Invalid inventory_mode '%s' for host %s" % (spec['inventory_mode'], spec['host_name']))
+            host_specs.append(spec)
+        changed, results = host.sync_hosts(host_specs, force)
+        module.exit_json(changed=changed, hosts=results)
+
     template_ids = []
     if link_templates:
         template_ids = host.get_template_ids(link_templates)
@@ -559,4 +956,5 @@ def main():
             host_name, ip, link_templates))
 
 from ansible.module_utils.basic import *
+from ansible.module_utils.pycompat24 import get_exception
 main()
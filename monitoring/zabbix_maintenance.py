@@ -109,6 +109,20 @@ options:
         default: 10
         version_added: "2.1"
         required: false
+    cache_ttl:
+        description:
+            - Number of seconds the host group IDs looked up by previous tasks are reused.
+            - An ID refused by the API, or finding nothing, is looked up again and the request retried once.
+            - 0 disables the cache.
+        required: false
+        default: 0
+        version_added: "2.3"
+    cache_dir:
+        description:
+            - Directory holding the cache files, one per server and user.
+        required: false
+        default: "~/.ansible/tmp/zabbix_cache"
+        version_added: "2.3"
 notes:
     - Useful for setting hosts in maintenance mode before big update,
       and removing maintenance window after update.
@@ -160,14 +174,165 @@ EXAMPLES = '''
 
 import datetime
 import time
+import hashlib
+import json
+import os
+import re
+import tempfile
 
 try:
     from zabbix_api import ZabbixAPI
+    from zabbix_api import ZabbixAPIException
     HAS_ZABBIX_API = True
 except ImportError:
+    ZabbixAPI = object
     HAS_ZABBIX_API = False
 
 
+# Extend the ZabbixAPI to keep name to ID lookups cached between tasks.
+class ZabbixAPIExtends(ZabbixAPI):
+    # the cache code below is copied in the zabbix modules using it; keep the copies in sync
+
+    # request parameters holding ids that get_cached_ids() looks up, to their id field
+    cached_id_params = {
+        'groupid': 'groupid', 'groupids': 'groupid',
+        'templateid': 'templateid', 'templateids': 'templateid',
+        'proxyid': 'proxyid', 'proxyids': 'proxyid', 'proxy_hostid': 'proxyid',
+    }
+
+    def __init__(self, server, timeout, user, passwd, cache_ttl=0, cache_dir=None, **kwargs):
+        ZabbixAPI.__init__(self, server, timeout=timeout, user=user, passwd=passwd)
+        self.cache_ttl = cache_ttl
+        self.cache_dir = cache_dir
+        self._cache_path = None
+        self._cache = {}
+        # (id field, id) served from the cache in this run, to the prefix, name field and name
+        self._served_ids = {}
+
+    def login(self, user='', password='', save=True):
+        ZabbixAPI.login(self, user, password, save)
+        if self.cache_ttl > 0 and self.cache_dir:
+            # one file per server and user; neither the password nor the session is stored
+            key = hashlib.sha1(json.dumps([self.server, self.httpuser, user]).encode('utf-8')).hexdigest()
+            self._cache_path = os.path.join(os.path.expanduser(self.cache_dir), key + '.json')
+            self._load_cache()
+
+    # an id served from the cache may belong to an object deleted or recreated since,
+    # then the request fails or a get finds nothing; look those ids up again and retry once
+    def do_request(self, json_obj):
+        request = json.loads(json_obj)
+        found = []
+        self._map_ids(request.get('params'), lambda id_field, value: found.append((id_field, str(value))) or value)
+        served = [key for key in set(found) if key in self._served_ids]
+        if not served:
+            return ZabbixAPI.do_request(self, json_obj)
+
+        error = None
+        try:
+            response = ZabbixAPI.do_request(self, json_obj)
+            if response.get('result') or not request['method'].endswith('.get'):
+                return response
+        except ZabbixAPIException:
+            error = get_exception()
+            if not re.search(r'No permissions|does not exist', str(error)):
+                raise
+        new_ids = {}
+        for id_field, old_id in served:
+            prefix, name_field, name = self._served_ids.pop((id_field, old_id))
+            ids = self.get_cached_ids(prefix, name_field, id_field, [name], fresh=True)
+            if name in ids and str(ids[name]) != old_id:
+                new_ids[(id_field, old_id)] = ids[name]
+        if not new_ids:
+            if error is not None:
+                raise error
+            return response
+        request['params'] = self._map_ids(request['params'],
+                                          lambda id_field, value: new_ids.get((id_field, str(value)), value))
+        return ZabbixAPI.do_request(self, json.dumps(request))
+
+    # returns params with every id of a cached kind replaced by visit(id field, id)
+    def _map_ids(self, params, visit):
+        if isinstance(params, list):
+            return [self._map_ids(p, visit) for p in params]
+        if not isinstance(params, dict):
+            return params
+        mapped = {}
+        for key, value in params.items():
+            id_field = self.cached_id_params.get(key)
+            if id_field is None:
+                mapped[key] = self._map_ids(value, visit)
+            elif isinstance(value, list):
+                mapped[key] = [visit(id_field, v) for v in value]
+            else:
+                mapped[key] = visit(id_field, value)
+        return mapped
+
+    # resolve names to ids with one query, reusing the lookups cached less than
+    # cache_ttl seconds ago unless fresh is set
+    def get_cached_ids(self, prefix, name_field, id_field, names, fresh=False):
+        ids = {}
+        missing = []
+        now = time.time()
+        cached = self._cache.setdefault(prefix, {})
+        for name in names:
+            entry = cached.get(name)
+            if not fresh and self._cache_path is not None and entry and now - entry[1] < self.cache_ttl:
+                ids[name] = entry[0]
+                self._served_ids[(id_field, str(entry[0]))] = (prefix, name_field, name)
+            elif name not in missing:
+                missing.append(name)
+                cached.pop(name, None)
+        if missing:
+            for item in getattr(self, prefix).get({'output': [id_field, name_field], 'filter': {name_field: missing}}):
+                ids[item[name_field]] = item[id_field]
+                cached[item[name_field]] = [item[id_field], now]
+            self._save_cache()
+        return ids
+
+    def forget_cached_ids(self, prefix, names):
+        for name in names:
+            self._cache.setdefault(prefix, {}).pop(name, None)
+        self._save_cache()
+
+    def _load_cache(self):
+        try:
+            f = open(self._cache_path)
+            try:
+                cache = json.load(f)
+            finally:
+                f.close()
+        except (IOError, OSError, ValueError):
+            return
+        # ignore a file not holding {prefix: {name: [id, time]}}
+        if not isinstance(cache, dict):
+            return
+        for entries in cache.values():
+            if not isinstance(entries, dict):
+                return
+            for entry in entries.values():
+                if not isinstance(entry, list) or len(entry) != 2 or not isinstance(entry[1], (int, float)):
+                    return
+        self._cache = cache
+
+    def _save_cache(self):
+        if self._cache_path is None:
+            return
+        try:
+            cache_dir = os.path.dirname(self._cache_path)
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir, int('0700', 8))
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir)
+            f = os.fdopen(fd, 'w')
+            try:
+                json.dump(self._cache, f)
+            finally:
+                f.close()
+            os.rename(tmp_path, self._cache_path)
+        except (IOError, OSError):
+            # the cache is only an optimization
+            pass
+
+
 def create_maintenance(zbx, group_ids, host_ids, start_time, maintenance_type, period, name, desc):
     end_time = start_time + period
     try:
@@ -221,27 +386,16 @@ def delete_maintenance(zbx, maintenance_id):
 
 
 def get_group_ids(zbx, host_groups):
-    group_ids = []
-    for group in host_groups:
-        try:
-            result = zbx.hostgroup.get(
-                {
-                    "output": "extend",
-                    "filter":
-                    {
-                        "name": group
-                    }
-                }
-            )
-        except BaseException as e:
-            return 1, None, str(e)
+    try:
+        group_ids = zbx.get_cached_ids('hostgroup', 'name', 'groupid', host_groups)
+    except BaseException as e:
+        return 1, None, str(e)
 
-        if not result:
+    for group in host_groups:
+        if group not in group_ids:
             return 1, None, "Group id for group %s not found" % group
 
-        group_ids.append(result[0]["groupid"])
-
-    return 0, group_ids, None
+    return 0, [group_ids[group] for group in host_groups], None
 
 
 def get_host_ids(zbx, host_names):
@@ -284,6 +438,8 @@ def main():
             desc=dict(type='str', required=False, default="Created by Ansible"),
             collect_data=dict(type='bool', required=False, default=True),
             timeout=dict(type='int', default=10),
+            cache_ttl=dict(type='int', default=0),
+            cache_dir=dict(type='path', default='~/.ansible/tmp/zabbix_cache'),
         ),
         supports_check_mode=True,
     )
@@ -311,7 +467,8 @@ def main():
         maintenance_type = 1
 
     try:
-        zbx = ZabbixAPI(server_url, timeout=timeout, user=http_login_user, passwd=http_login_password)
+        zbx = ZabbixAPIExtends(server_url, timeout=timeout, user=http_login_user, passwd=http_login_password,
+                               cache_ttl=module.params['cache_ttl'], cache_dir=module.params['cache_dir'])
         zbx.login(login_user, login_password)
     except BaseException as e:
         module.fail_json(msg="Failed to connect to Zabbix server: %s" % e)
@@ -374,4 +531,5 @@ def main():
     module.exit_json(changed=changed)
 
 from ansible.module_utils.basic import *
+from ansible.module_utils.pycompat24 import get_exception
 main()
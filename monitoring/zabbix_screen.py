@@ -64,6 +64,20 @@ options:
         description:
             - The timeout of API request (seconds).
         default: 10
+    cache_ttl:
+        description:
+            - Number of seconds the host group IDs looked up by previous tasks are reused.
+            - An ID refused by the API, or finding nothing, is looked up again and the request retried once.
+            - 0 disables the cache.
+        required: false
+        default: 0
+        version_added: "2.3"
+    cache_dir:
+        description:
+            - Directory holding the cache files, one per server and user.
+        required: false
+        default: "~/.ansible/tmp/zabbix_cache"
+        version_added: "2.3"
     screens:
         description:
             - List of screens to be created/updated/deleted(see example).
@@ -139,12 +153,20 @@ EXAMPLES = '''
   when: inventory_hostname==groups['group_name'][0]
 '''
 
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+
 try:
     from zabbix_api import ZabbixAPI, ZabbixAPISubClass
     from zabbix_api import ZabbixAPIException
     from zabbix_api import Already_Exists
     HAS_ZABBIX_API = True
 except ImportError:
+    ZabbixAPI = object
     HAS_ZABBIX_API = False
 
 
@@ -154,9 +176,147 @@ except ImportError:
 class ZabbixAPIExtends(ZabbixAPI):
     screenitem = None
 
-    def __init__(self, server, timeout, user, passwd, **kwargs):
+    # the cache code below is copied in the zabbix modules using it; keep the copies in sync
+
+    # request parameters holding ids that get_cached_ids() looks up, to their id field
+    cached_id_params = {
+        'groupid': 'groupid', 'groupids': 'groupid',
+        'templateid': 'templateid', 'templateids': 'templateid',
+        'proxyid': 'proxyid', 'proxyids': 'proxyid', 'proxy_hostid': 'proxyid',
+    }
+
+    def __init__(self, server, timeout, user, passwd, cache_ttl=0, cache_dir=None, **kwargs):
         ZabbixAPI.__init__(self, server, timeout=timeout, user=user, passwd=passwd)
         self.screenitem = ZabbixAPISubClass(self, dict({"prefix": "screenitem"}, **kwargs))
+        self.cache_ttl = cache_ttl
+        self.cache_dir = cache_dir
+        self._cache_path = None
+        self._cache = {}
+        # (id field, id) served from the cache in this run, to the prefix, name field and name
+        self._served_ids = {}
+
+    def login(self, user='', password='', save=True):
+        ZabbixAPI.login(self, user, password, save)
+        if self.cache_ttl > 0 and self.cache_dir:
+            # one file per server and user; neither the password nor the session is stored
+            key = hashlib.sha1(json.dumps([self.server, self.httpuser, user]).encode('utf-8')).hexdigest()
+            self._cache_path = os.path.join(os.path.expanduser(self.cache_dir), key + '.json')
+            self._load_cache()
+
+    # an id served from the cache may belong to an object deleted or recreated since,
+    # then the request fails or a get finds nothing; look those ids up again and retry once
+    def do_request(self, json_obj):
+        request = json.loads(json_obj)
+        found = []
+        self._map_ids(request.get('params'), lambda id_field, value: found.append((id_field, str(value))) or value)
+        served = [key for key in set(found) if key in self._served_ids]
+        if not served:
+            return ZabbixAPI.do_request(self, json_obj)
+
+        error = None
+        try:
+            response = ZabbixAPI.do_request(self, json_obj)
+            if response.get('result') or not request['method'].endswith('.get'):
+                return response
+        except ZabbixAPIException:
+            error = get_exception()
+            if not re.search(r'No permissions|does not exist', str(error)):
+                raise
+        new_ids = {}
+        for id_field, old_id in served:
+            prefix, name_field, name = self._served_ids.pop((id_field, old_id))
+            ids = self.get_cached_ids(prefix, name_field, id_field, [name], fresh=True)
+            if name in ids and str(ids[name]) != old_id:
+                new_ids[(id_field, old_id)] = ids[name]
+        if not new_ids:
+            if error is not None:
+                raise error
+            return response
+        request['params'] = self._map_ids(request['params'],
+                                          lambda id_field, value: new_ids.get((id_field, str(value)), value))
+        return ZabbixAPI.do_request(self, json.dumps(request))
+
+    # returns params with every id of a cached kind replaced by visit(id field, id)
+    def _map_ids(self, params, visit):
+        if isinstance(params, list):
+            return [self._map_ids(p, visit) for p in params]
+        if not isinstance(params, dict):
+            return params
+        mapped = {}
+        for key, value in params.items():
+            id_field = self.cached_id_params.get(key)
+            if id_field is None:
+                mapped[key] = self._map_ids(value, visit)
+            elif isinstance(value, list):
+                mapped[key] = [visit(id_field, v) for v in value]
+            else:
+                mapped[key] = visit(id_field, value)
+        return mapped
+
+    # resolve names to ids with one query, reusing the lookups cached less than
+    # cache_ttl seconds ago unless fresh is set
+    def get_cached_ids(self, prefix, name_field, id_field, names, fresh=False):
+        ids = {}
+        missing = []
+        now = time.time()
+        cached = self._cache.setdefault(prefix, {})
+        for name in names:
+            entry = cached.get(name)
+            if not fresh and self._cache_path is not None and entry and now - entry[1] < self.cache_ttl:
+                ids[name] = entry[0]
+                self._served_ids[(id_field, str(entry[0]))] = (prefix, name_field, name)
+            elif name not in missing:
+                missing.append(name)
+                cached.pop(name, None)
+        if missing:
+            for item in getattr(self, prefix).get({'output': [id_field, name_field], 'filter': {name_field: missing}}):
+                ids[item[name_field]] = item[id_field]
+                cached[item[name_field]] = [item[id_field], now]
+            self._save_cache()
+        return ids
+
+    def forget_cached_ids(self, prefix, names):
+        for name in names:
+            self._cache.setdefault(prefix, {}).pop(name, None)
+        self._save_cache()
+
+    def _load_cache(self):
+        try:
+            f = open(self._cache_path)
+            try:
+                cache = json.load(f)
+            finally:
+                f.close()
+        except (IOError, OSError, ValueError):
+            return
+        # ignore a file not holding {prefix: {name: [id, time]}}
+        if not isinstance(cache, dict):
+            return
+        for entries in cache.values():
+            if not isinstance(entries, dict):
+                return
+            for entry in entries.values():
+                if not isinstance(entry, list) or len(entry) != 2 or not isinstance(entry[1], (int, float)):
+                    return
+        self._cache = cache
+
+    def _save_cache(self):
+        if self._cache_path is None:
+            return
+        try:
+            cache_dir = os.path.dirname(self._cache_path)
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir, int('0700', 8))
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir)
+            f = os.fdopen(fd, 'w')
+            try:
+                json.dump(self._cache, f)
+            finally:
+                f.close()
+            os.rename(tmp_path, self._cache_path)
+        except (IOError, OSError):
+            # the cache is only an optimization
+            pass
 
 
 class Screen(object):
@@ -168,12 +328,11 @@ class Screen(object):
     def get_host_group_id(self, group_name):
         if group_name == "":
             self._module.fail_json(msg="group_name is required")
-        hostGroup_list = self._zapi.hostgroup.get({'output': 'extend', 'filter': {'name': group_name}})
-        if len(hostGroup_list) < 1:
+        hostGroup_ids = self._zapi.get_cached_ids('hostgroup', 'name', 'groupid', [group_name])
+        if group_name not in hostGroup_ids:
             self._module.fail_json(msg="Host group not found: %s" % group_name)
         else:
-            hostGroup_id = hostGroup_list[0]['groupid']
-            return hostGroup_id
+            return hostGroup_ids[group_name]
 
     # get monitored host_id by host_group_id
     def get_host_ids_by_group_id(self, group_id):
@@ -229,11 +388,11 @@ class Screen(object):
             self._module.fail_json(msg="Failed to delete screen %s: %s" % (screen_name, e))
 
     # get graph ids
-    def get_graph_ids(self, hosts, graph_name_list):
+    def get_graph_ids(self, hosts, host_graphs):
         graph_id_lists = []
         vsize = 1
         for host in hosts:
-            graph_id_list = self.get_graphs_by_host_id(graph_name_list, host)
+            graph_id_list = host_graphs.get(host, [])
             size = len(graph_id_list)
             if size > 0:
                 graph_id_lists.extend(graph_id_list)
@@ -241,19 +400,26 @@ class Screen(object):
                     vsize = size
         return graph_id_lists, vsize
 
-    #  getGraphs
-    def get_graphs_by_host_id(self, graph_name_list, host_id):
-        graph_ids = []
+    # get the graphs of all hosts with a single graph.get, grouped by host id
+    # and ordered by graph name as in graph_name_list
+    def get_graphs_by_host_ids(self, graph_name_list, host_ids):
+        host_graphs = dict((host_id, []) for host_id in host_ids)
+        if not graph_name_list or not host_ids:
+            return host_graphs
+        graphs_list = self._zapi.graph.get({'output': ['graphid', 'name'], 'hostids': host_ids,
+                                            'search': {'name': graph_name_list}, 'searchByAny': True,
+                                            'selectHosts': ['hostid'], 'sortfield': 'graphid'})
+        # the API search is a case insensitive substring match, so the
+        # graphs are matched against each name again to group them
         for graph_name in graph_name_list:
-            graphs_list = self._zapi.graph.get({'output': 'extend', 'search': {'name': graph_name}, 'hostids': host_id})
-            graph_id_list = []
-            if len(graphs_list) > 0:
-                for graph in graphs_list:
-                    graph_id = graph['graphid']
-                    graph_id_list.append(graph_id)
-            if len(graph_id_list) > 0:
-                graph_ids.extend(graph_id_list)
-        return graph_ids
+            graph_name = graph_name.lower()
+            for graph in graphs_list:
+                if graph_name not in graph['name'].lower():
+                    continue
+                for host in graph['hosts']:
+                    if host['hostid'] in host_graphs:
+                        host_graphs[host['hostid']].append(graph['graphid'])
+        return host_graphs
 
     # get screen items
     def get_screen_items(self, screen_id):
@@ -289,7 +455,7 @@ class Screen(object):
         return h_size, v_size
 
     # create screen_items
-    def create_screen_items(self, screen_id, hosts, graph_name_list, width, height, h_size):
+    def create_screen_items(self, screen_id, hosts, host_graphs, width, height, h_size):
         if len(hosts) < 4:
             if width is None or width < 0:
                 width = 500
@@ -299,31 +465,33 @@ class Screen(object):
         if height is None or height < 0:
             height = 100
 
-        try:
-            # when there're only one host, only one row is not good.
-            if len(hosts) == 1:
-                graph_id_list = self.get_graphs_by_host_id(graph_name_list, hosts[0])
-                for i, graph_id in enumerate(graph_id_list):
+        # compute the whole grid first, then create all the items with one call
+        cells = []
+        # when there're only one host, only one row is not good.
+        if len(hosts) == 1:
+            for i, graph_id in enumerate(host_graphs.get(hosts[0], [])):
+                if graph_id is not None:
+                    cells.append((graph_id, i % h_size, i // h_size))
+        else:
+            for i, host in enumerate(hosts):
+                for j, graph_id in enumerate(host_graphs.get(host, [])):
                     if graph_id is not None:
-                        self._zapi.screenitem.create({'screenid': screen_id, 'resourcetype': 0, 'resourceid': graph_id,
-                                                      'width': width, 'height': height,
-                                                      'x': i % h_size, 'y': i / h_size, 'colspan': 1, 'rowspan': 1,
-                                                      'elements': 0, 'valign': 0, 'halign': 0,
-                                                      'style': 0, 'dynamic': 0, 'sort_triggers': 0})
-            else:
-                for i, host in enumerate(hosts):
-                    graph_id_list = self.get_graphs_by_host_id(graph_name_list, host)
-                    for j, graph_id in enumerate(graph_id_list):
-                        if graph_id is not None:
-                            self._zapi.screenitem.create({'screenid': screen_id, 'resourcetype': 0, 'resourceid': graph_id,
-                                                          'width': width, 'height': height,
-                                                          'x': i, 'y': j, 'colspan': 1, 'rowspan': 1,
-                                                          'elements': 0, 'valign': 0, 'halign': 0,
-                                                          'style': 0, 'dynamic': 0, 'sort_triggers': 0})
+                        cells.append((graph_id, i, j))
+
+        screen_items = []
+        for graph_id, x, y in cells:
+            screen_items.append({'screenid': screen_id, 'resourcetype': 0, 'resourceid': graph_id,
+                                 'width': width, 'height': height,
+                                 'x': x, 'y': y, 'colspan': 1, 'rowspan': 1,
+                                 'elements': 0, 'valign': 0, 'halign': 0,
+                                 'style': 0, 'dynamic': 0, 'sort_triggers': 0})
+        if not screen_items:
+            return
+        try:
+            self._zapi.screenitem.create(screen_items)
         except Already_Exists:
             pass
 
-
 def main():
     module = AnsibleModule(
         argument_spec=dict(
@@ -333,6 +501,8 @@ def main():
             http_login_user=dict(type='str', required=False, default=None),
             http_login_password=dict(type='str', required=False, default=None, no_log=True),
             timeout=dict(type='int', default=10),
+            cache_ttl=dict(type='int', default=0),
+            cache_dir=dict(type='path', default='~/.ansible/tmp/zabbix_cache'),
             screens=dict(type='list', required=True)
         ),
         supports_check_mode=True
@@ -352,7 +522,8 @@ def main():
     zbx = None
     # login to zabbix
     try:
-        zbx = ZabbixAPIExtends(server_url, timeout=timeout, user=http_login_user, passwd=http_login_password)
+        zbx = ZabbixAPIExtends(server_url, timeout=timeout, user=http_login_user, passwd=http_login_password,
+                               cache_ttl=module.params['cache_ttl'], cache_dir=module.params['cache_dir'])
         zbx.login(login_user, login_password)
     except Exception, e:
         module.fail_json(msg="Failed to connect to Zabbix server: %s" % e)
@@ -393,13 +564,14 @@ def main():
             screen_item_id_list = []
             resource_id_list = []
 
-            graph_ids, v_size = screen.get_graph_ids(hosts, graph_names)
+            host_graphs = screen.get_graphs_by_host_ids(graph_names, hosts)
+            graph_ids, v_size = screen.get_graph_ids(hosts, host_graphs)
             h_size, v_size = screen.get_hsize_vsize(hosts, v_size)
 
             if not screen_id:
                 # create screen
                 screen_id = screen.create_screen(screen_name, h_size, v_size)
-                screen.create_screen_items(screen_id, hosts, graph_names, graph_width, graph_height, h_size)
+                screen.create_screen_items(screen_id, hosts, host_graphs, graph_width, graph_height, h_size)
                 created_screens.append(screen_name)
             else:
                 screen_item_list = screen.get_screen_items(screen_id)
@@ -415,7 +587,7 @@ def main():
                     deleted = screen.delete_screen_items(screen_id, screen_item_id_list)
                     if deleted:
                         screen.update_screen(screen_id, screen_name, h_size, v_size)
-                        screen.create_screen_items(screen_id, hosts, graph_names, graph_width, graph_height, h_size)
+                        screen.create_screen_items(screen_id, hosts, host_graphs, graph_width, graph_height, h_size)
                         changed_screens.append(screen_name)
 
     if created_screens and changed_screens:
@@ -430,6 +602,7 @@ def main():
         module.exit_json(changed=False)
 
 from ansible.module_utils.basic import *
+from ansible.module_utils.pycompat24 import get_exception
 
 if __name__ == '__main__':
     main()
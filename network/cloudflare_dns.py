@@ -26,8 +26,17 @@ except ImportError:
     except ImportError:
         # Let snippet from module_utils/basic.py return a proper error in this case
         pass
+import os
+import tempfile
+import threading
+import time
 import urllib
 
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
 DOCUMENTATION = '''
 ---
 module: cloudflare_dns
@@ -45,6 +54,14 @@ options:
     description:
       - "Account email."
     required: true
+  api_concurrency:
+    description:
+      - Maximum number of Cloudflare API requests sent at the same time, e.g. when
+        fetching the remaining pages of a large record listing. Rate limited
+        requests are retried after the delay requested by the API.
+    required: false
+    default: 4
+    version_added: "2.3"
   port:
     description: Service port. Required for C(type=SRV)
     required: false
@@ -58,6 +75,17 @@ options:
     required: false
     choices: [ 'tcp', 'udp' ]
     default: null
+  records:
+    description:
+      - List of records to converge in a single task. Every entry is a dictionary
+        taking the C(record), C(type), C(value), C(ttl), C(priority), C(port),
+        C(proto), C(service), C(weight), C(solo) and C(state) options; options left
+        out default to the ones of the task.
+      - The zone is listed only once and all needed changes are sent at the same
+        time, see I(api_concurrency).
+    required: false
+    default: null
+    version_added: "2.3"
   record:
     description:
       - Record to add. Required if C(state=present). Default is C(@) (e.g. the zone name)
@@ -102,6 +130,20 @@ options:
     required: false
     default: null
     aliases: [ "content" ]
+  zone_cache_ttl:
+    description:
+      - Number of seconds zone IDs are cached in I(zone_cache_path) and reused by
+        later tasks instead of looking the zone up again. A cached ID the API no
+        longer knows is looked up again automatically. C(0) disables the cache.
+    required: false
+    default: 0
+    version_added: "2.3"
+  zone_cache_path:
+    description:
+      - File the zone ID cache is stored in.
+    required: false
+    default: "~/.ansible/tmp/cloudflare_dns_zones.json"
+    version_added: "2.3"
   weight:
     description: Service weight. Required for C(type=SRV)
     required: false
@@ -174,9 +216,39 @@ EXAMPLES = '''
     weight: 20
     type: SRV
     value: fooserver.my.com
+
+# converge several records of a zone in one task
+- cloudflare_dns:
+    zone: my.com
+    account_email: test@example.com
+    account_api_token: dummyapitoken
+    records:
+      - record: www
+        type: A
+        value: 127.0.0.1
+      - record: mail
+        type: MX
+        value: mx.my.com
+        priority: 10
+      - record: old
+        type: A
+        value: 127.0.0.2
+        state: absent
 '''
 
 RETURN = '''
+records:
+    description: list of the changes made when C(records) is used
+    returned: success, if records is set
+    type: list
+    sample: [{ action: "created", record: { name: "www.my.com", type: "A", content: "127.0.0.1", ttl: 1 } }]
+    contains:
+        action:
+            description: one of C(created), C(updated), C(deleted) or C(unchanged)
+            type: string
+        record:
+            description: the record data, see C(record)
+            type: dictionary
 record:
     description: dictionary containing the record data
     returned: success, except on record deletion
@@ -267,15 +339,31 @@ record:
             sample: sample.com
 '''
 
+# options each record type requires, for the task and for every entry of records
+RECORD_TYPE_REQUIRED = {
+    'MX': ['priority','value'],
+    'SRV': ['port','priority','proto','service','value','weight'],
+    'A': ['value'],
+    'AAAA': ['value'],
+    'CNAME': ['value'],
+    'TXT': ['value'],
+    'NS': ['value'],
+    'SPF': ['value'],
+}
+
 class CloudflareAPI(object):
 
     cf_api_endpoint = 'https://api.cloudflare.com/client/v4'
+    cf_api_max_per_page = 50
+    cf_api_max_records_per_page = 100
+    rate_limit_retries = 5
     changed = False
 
     def __init__(self, module):
         self.module            = module
         self.account_api_token = module.params['account_api_token']
         self.account_email     = module.params['account_email']
+        self.api_concurrency   = max(1, module.params['api_concurrency'])
         self.port              = module.params['port']
         self.priority          = module.params['priority']
         self.proto             = module.params['proto']
@@ -290,22 +378,38 @@ class CloudflareAPI(object):
         self.weight            = module.params['weight']
         self.zone              = module.params['zone']
 
-        if self.record == '@':
-            self.record = self.zone
+        self.zone_cache_ttl    = module.params['zone_cache_ttl']
+        self.zone_cache_path   = os.path.expanduser(module.params['zone_cache_path'])
 
-        if (self.type in ['CNAME','NS','MX','SRV']) and (self.value is not None):
-            self.value = self.value.rstrip('.')
+        self._throttle_lock    = threading.Lock()
+        self._throttle_until   = 0
+        self._zone_ids         = {}
+        self._cached_zone_ids  = set()
 
-        if (self.type == 'SRV'):
-            if (self.proto is not None) and (not self.proto.startswith('_')):
-                self.proto = '_' + self.proto
-            if (self.service is not None) and (not self.service.startswith('_')):
-                self.service = '_' + self.service
+        params = self._normalize_params(dict(proto=self.proto,record=self.record,service=self.service,
+                                             type=self.type,value=self.value,zone=self.zone))
+        for param in ['proto','record','service','value']:
+            setattr(self,param,params[param])
 
-        if not self.record.endswith(self.zone):
-            self.record = self.record + '.' + self.zone
+    def _normalize_params(self,params):
+        if params['record'] == '@':
+            params['record'] = params['zone']
 
-    def _cf_simple_api_call(self,api_call,method='GET',payload=None):
+        if (params['type'] in ['CNAME','NS','MX','SRV']) and (params['value'] is not None):
+            params['value'] = params['value'].rstrip('.')
+
+        if (params['type'] == 'SRV'):
+            if (params['proto'] is not None) and (not params['proto'].startswith('_')):
+                params['proto'] = '_' + params['proto']
+            if (params['service'] is not None) and (not params['service'].startswith('_')):
+                params['service'] = '_' + params['service']
+
+        if not params['record'].endswith(params['zone']):
+            params['record'] = params['record'] + '.' + params['zone']
+
+        return params
+
+    def _cf_request(self,api_call,method='GET',payload=None):
         headers = { 'X-Auth-Email': self.account_email,
                     'X-Auth-Key': self.account_api_token,
                     'Content-Type': 'application/json' }
@@ -314,7 +418,7 @@ class CloudflareAPI(object):
             try:
                 data = json.dumps(payload)
             except Exception, e:
-                self.module.fail_json(msg="Failed to encode payload as JSON: {0}".format(e))
+                return None, None, "Failed to encode payload as JSON: {0}".format(e)
 
         resp, info = fetch_url(self.module,
                                self.cf_api_endpoint + api_call,
@@ -324,7 +428,7 @@ class CloudflareAPI(object):
                                timeout=self.timeout)
 
         if info['status'] not in [200,304,400,401,403,429,405,415]:
-            self.module.fail_json(msg="Failed API call {0}; got unexpected HTTP code {1}".format(api_call,info['status']))
+            return None, info, "Failed API call {0}; got unexpected HTTP code {1}".format(api_call,info['status'])
 
         error_msg = ''
         if info['status'] == 401:
@@ -347,6 +451,7 @@ class CloudflareAPI(object):
             error_msg = "API bad request; Status: {0}; Method: {1}: Call: {2}".format(info['status'],method,api_call)
 
         result = None
+        content = None
         try:
             content = resp.read()
         except AttributeError:
@@ -358,12 +463,12 @@ class CloudflareAPI(object):
         if content:
             try:
                 result = json.loads(content)
-            except json.JSONDecodeError:
+            except ValueError:
                 error_msg += "; Failed to parse API response: {0}".format(content)
 
         # received an error status but no data with details on what failed
         if  (info['status'] not in [200,304]) and (result is None):
-            self.module.fail_json(msg=error_msg)
+            return None, info, error_msg
 
         if not result['success']:
             error_msg += "; Error details: "
@@ -372,38 +477,171 @@ class CloudflareAPI(object):
                 if 'error_chain' in error:
                     for chain_error in error['error_chain']:
                         error_msg += "code: {0}, error: {1}; ".format(chain_error['code'],chain_error['message'])
-            self.module.fail_json(msg=error_msg)
+            return result, info, error_msg
+
+        return result, info, None
+
+    def _cf_throttled_request(self,api_call,method='GET',payload=None):
+        # all workers back off together once any of them is rate limited
+        for attempt in range(self.rate_limit_retries + 1):
+            delay = self._throttle_until - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            result, info, error_msg = self._cf_request(api_call,method,payload)
+            if (info is None) or (info['status'] != 429) or (attempt == self.rate_limit_retries):
+                break
+            try:
+                delay = int(info.get('retry-after'))
+            except (TypeError, ValueError):
+                delay = 2 ** attempt
+            self._throttle_lock.acquire()
+            try:
+                self._throttle_until = max(self._throttle_until, time.time() + delay)
+            finally:
+                self._throttle_lock.release()
+        return result, info, error_msg
 
+    def _cf_simple_api_call(self,api_call,method='GET',payload=None):
+        result, info, error_msg = self._cf_throttled_request(api_call,method,payload)
+        if (error_msg is not None) and (info is not None) and (info['status'] == 404):
+            # the zone of a cached zone ID may have been deleted and added
+            # again; look it up and retry once
+            new_api_call = self._refresh_cached_zone_id(api_call)
+            if new_api_call:
+                result, info, error_msg = self._cf_throttled_request(new_api_call,method,payload)
+        if error_msg is not None:
+            self.module.fail_json(msg=error_msg)
         return result, info['status']
 
+    def _cf_page_api_call(self,api_call,page,per_page):
+        # build every page call from the bare endpoint, dropping any
+        # paging parameters of the original call
+        if '?' in api_call:
+            raw_api_call,query = api_call.split('?',1)
+            parameters = [param for param in query.split('&')
+                          if param and param.split('=',1)[0] not in ['page','per_page']]
+        else:
+            raw_api_call = api_call
+            parameters = []
+        parameters += ['page={0}'.format(page), 'per_page={0}'.format(per_page)]
+        return raw_api_call + '?' + '&'.join(parameters)
+
+    def _cf_concurrent_api_calls(self,calls):
+        # calls is a list of (api_call, method, payload) tuples; the
+        # results are returned in the same order
+        results = {}
+        errors = []
+        pending = queue.Queue()
+        for index, call in enumerate(calls):
+            pending.put((index, call))
+
+        def worker():
+            while not errors:
+                try:
+                    index, call = pending.get_nowait()
+                except queue.Empty:
+                    return
+                result, info, error_msg = self._cf_throttled_request(*call)
+                if error_msg is not None:
+                    errors.append(error_msg)
+                else:
+                    results[index] = result['result']
+
+        threads = []
+        for i in range(min(self.api_concurrency, len(calls))):
+            thread = threading.Thread(target=worker)
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            self.module.fail_json(msg=errors[0])
+        return [results[index] for index in range(len(calls))]
+
+    def _cf_fetch_pages(self,api_call,pages,per_page):
+        return self._cf_concurrent_api_calls([(self._cf_page_api_call(api_call,page,per_page),'GET',None) for page in pages])
+
     def _cf_api_call(self,api_call,method='GET',payload=None):
-        result, status = self._cf_simple_api_call(api_call,method,payload)
+        if method != 'GET':
+            result, status = self._cf_simple_api_call(api_call,method,payload)
+            return result['result'], status
+
+        if api_call.split('?',1)[0].endswith('/dns_records'):
+            per_page = self.cf_api_max_records_per_page
+        else:
+            per_page = self.cf_api_max_per_page
+        result, status = self._cf_simple_api_call(self._cf_page_api_call(api_call,1,per_page))
 
         data = result['result']
 
         if 'result_info' in result:
             pagination = result['result_info']
             if pagination['total_pages'] > 1:
-                next_page = int(pagination['page']) + 1
-                parameters = ['page={0}'.format(next_page)]
-                # strip "page" parameter from call parameters (if there are any)
-                if '?' in api_call:
-                    raw_api_call,query = api_call.split('?',1)
-                    parameters += [param for param in query.split('&') if not param.startswith('page')]
-                else:
-                    raw_api_call = api_call
-                while next_page <= pagination['total_pages']:
-                    raw_api_call += '?' + '&'.join(parameters)
-                    result, status = self._cf_simple_api_call(raw_api_call,method,payload)
-                    data += result['result']
-                    next_page += 1
+                pages = range(int(pagination['page']) + 1, pagination['total_pages'] + 1)
+                for page_data in self._cf_fetch_pages(api_call,pages,per_page):
+                    data += page_data
 
         return data, status
 
+    def _load_zone_cache(self):
+        try:
+            f = open(self.zone_cache_path)
+            try:
+                return json.load(f)
+            finally:
+                f.close()
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def _save_zone_cache(self,zone,zone_id):
+        cache = self._load_zone_cache()
+        key = '{0}/{1}'.format(self.account_email,zone)
+        if zone_id is None:
+            cache.pop(key,None)
+        else:
+            cache[key] = {'id': zone_id, 'created': time.time()}
+        cache_dir = os.path.dirname(self.zone_cache_path)
+        try:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir,int('0700',8))
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir)
+            f = os.fdopen(fd,'w')
+            try:
+                json.dump(cache,f)
+            finally:
+                f.close()
+            os.rename(tmp_path,self.zone_cache_path)
+        except (IOError, OSError):
+            # the cache is only an optimization, the zone is looked up
+            # again next time
+            pass
+
+    def _refresh_cached_zone_id(self,api_call):
+        for zone, zone_id in list(self._zone_ids.items()):
+            prefix = '/zones/{0}'.format(zone_id)
+            if (zone_id in self._cached_zone_ids) and (api_call == prefix or api_call.startswith(prefix + '/') or api_call.startswith(prefix + '?')):
+                self._cached_zone_ids.discard(zone_id)
+                del self._zone_ids[zone]
+                self._save_zone_cache(zone,None)
+                return '/zones/{0}'.format(self._get_zone_id(zone)) + api_call[len(prefix):]
+        return None
+
     def _get_zone_id(self,zone=None):
         if not zone:
             zone = self.zone
 
+        if zone in self._zone_ids:
+            return self._zone_ids[zone]
+
+        if self.zone_cache_ttl > 0:
+            entry = self._load_zone_cache().get('{0}/{1}'.format(self.account_email,zone))
+            if entry and (time.time() - entry['created'] <= self.zone_cache_ttl):
+                self._zone_ids[zone] = entry['id']
+                self._cached_zone_ids.add(entry['id'])
+                return entry['id']
+
         zones = self.get_zones(zone)
         if len(zones) > 1:
             self.module.fail_json(msg="More than one zone matches {0}".format(zone))
@@ -411,6 +649,9 @@ class CloudflareAPI(object):
         if len(zones) < 1:
             self.module.fail_json(msg="No zone found with name {0}".format(zone))
 
+        self._zone_ids[zone] = zones[0]['id']
+        if self.zone_cache_ttl > 0:
+            self._save_zone_cache(zone,zones[0]['id'])
         return zones[0]['id']
 
     def get_zones(self,name=None):
@@ -482,14 +723,7 @@ class CloudflareAPI(object):
                     result, info = self._cf_api_call('/zones/{0}/dns_records/{1}'.format(rr['zone_id'],rr['id']),'DELETE')
         return self.changed
 
-    def ensure_dns_record(self,**kwargs):
-        params = {}
-        for param in ['port','priority','proto','service','ttl','type','record','value','weight','zone']:
-          if param in kwargs:
-              params[param] = kwargs[param]
-          else:
-              params[param] = getattr(self,param)
-
+    def _build_dns_record(self,params):
         search_value = params['value']
         search_record = params['record']
         new_record = None
@@ -543,8 +777,33 @@ class CloudflareAPI(object):
             search_value = str(params['weight']) + '\t' + str(params['port']) + '\t' + params['value']
             search_record = params['service'] + '.' + params['proto'] + '.' + params['record']
 
-        zone_id = self._get_zone_id(params['zone'])
+        return new_record, search_record, search_value
+
+    def _dns_record_needs_update(self,cur_record,new_record,params):
+        if (params['ttl'] is not None) and (cur_record['ttl'] != params['ttl'] ):
+            return True
+        if (params['priority'] is not None) and ('priority' in cur_record) and (cur_record['priority'] != params['priority']):
+            return True
+        if ('data' in new_record) and ('data' in cur_record):
+            if (cur_record['data'] > new_record['data']) - (cur_record['data'] < new_record['data']):
+                return True
+        if (params['type'] == 'CNAME') and (cur_record['content'] != new_record['content']):
+            return True
+        return False
+
+    def ensure_dns_record(self,**kwargs):
+        params = {}
+        for param in ['port','priority','proto','service','ttl','type','record','value','weight','zone']:
+          if param in kwargs:
+              params[param] = kwargs[param]
+          else:
+              params[param] = getattr(self,param)
+
+        new_record, search_record, search_value = self._build_dns_record(params)
+
         records = self.get_dns_records(params['zone'],params['type'],search_record,search_value)
+        # resolved after listing, so a refreshed cached zone ID is used
+        zone_id = self._get_zone_id(params['zone'])
         # in theory this should be impossible as cloudflare does not allow
         # the creation of duplicate records but lets cover it anyways
         if len(records) > 1:
@@ -552,33 +811,136 @@ class CloudflareAPI(object):
         # record already exists, check if it must be updated
         if len(records) == 1:
             cur_record = records[0]
-            do_update = False
-            if (params['ttl'] is not None) and (cur_record['ttl'] != params['ttl'] ):
-                do_update = True
-            if (params['priority'] is not None) and ('priority' in cur_record) and (cur_record['priority'] != params['priority']):
-                do_update = True
-            if ('data' in new_record) and ('data' in cur_record):
-                if (cur_record['data'] > new_record['data']) - (cur_record['data'] < new_record['data']):
-                    do_update = True
-            if (type == 'CNAME') and (cur_record['content'] != new_record['content']):
-                do_update = True
-            if do_update:
+            if self._dns_record_needs_update(cur_record,new_record,params):
+                result = cur_record
                 if not self.module.check_mode:
                     result, info = self._cf_api_call('/zones/{0}/dns_records/{1}'.format(zone_id,records[0]['id']),'PUT',new_record)
                 self.changed = True
                 return result,self.changed
             else:
                 return records,self.changed
+        result = new_record
         if not self.module.check_mode:
             result, info = self._cf_api_call('/zones/{0}/dns_records'.format(zone_id),'POST',new_record)
         self.changed = True
         return result,self.changed
 
+    def reconcile_dns_records(self,records):
+        """Converge a list of records, listing the zone only once.
+
+        Every entry takes the same options as a single record task. Returns
+        a list with the action taken and the record data for every entry.
+        """
+        existing, status = self._cf_api_call('/zones/{0}/dns_records'.format(self._get_zone_id()))
+        zone_id = self._get_zone_id()
+
+        by_content = {}
+        by_name = {}
+        for rr in existing:
+            by_content[(rr['type'],rr['name'],rr['content'])] = rr
+            by_name.setdefault((rr['type'],rr['name']),[]).append(rr)
+
+        calls = []
+        actions = []
+        deleted = set()
+        for entry in records:
+            params = {}
+            for param in ['port','priority','proto','service','ttl','weight']:
+                if entry.get(param) is not None:
+                    params[param] = entry[param]
+                else:
+                    params[param] = getattr(self,param)
+            for param in ['record','type','value']:
+                params[param] = entry.get(param)
+            params['solo'] = entry.get('solo', self.is_solo)
+            params['state'] = entry.get('state', self.state)
+            if params['record'] is None:
+                params['record'] = entry.get('name','@')
+            if params['value'] is None:
+                params['value'] = entry.get('content')
+            params['zone'] = self.zone
+            if params['solo'] and params['state'] == 'absent':
+                self.module.fail_json(msg="solo=true can only be used with state=present")
+            if params['type'] is None:
+                self.module.fail_json(msg="Every entry of records needs a type")
+            if params['type'] not in RECORD_TYPE_REQUIRED:
+                self.module.fail_json(msg="Unsupported type {0} in records entry: {1}".format(params['type'],entry))
+            missing = [param for param in RECORD_TYPE_REQUIRED[params['type']] if params[param] is None]
+            if missing:
+                self.module.fail_json(msg="type is {0} but the following are missing in records entry: {1}: {2}".format(params['type'],','.join(missing),entry))
+            params = self._normalize_params(params)
+
+            if params['state'] == 'absent':
+                search_record = params['record']
+                content = params['value']
+                if params['type'] == 'SRV':
+                    search_record = params['service'] + '.' + params['proto'] + '.' + params['record']
+                    content = str(params['weight']) + '\t' + str(params['port']) + '\t' + params['value']
+                if content:
+                    matches = [by_content.get((params['type'],search_record,content))]
+                else:
+                    matches = by_name.get((params['type'],search_record),[])
+                for rr in matches:
+                    if (rr is not None) and (rr['id'] not in deleted):
+                        deleted.add(rr['id'])
+                        calls.append(('/zones/{0}/dns_records/{1}'.format(zone_id,rr['id']),'DELETE',None))
+                        actions.append(('deleted',rr))
+                continue
+
+            new_record, search_record, search_value = self._build_dns_record(params)
+            if search_value is None:
+                matches = by_name.get((params['type'],search_record),[])
+            else:
+                matches = [rr for rr in [by_content.get((params['type'],search_record,search_value))] if rr is not None]
+            if len(matches) > 1:
+                self.module.fail_json(msg="More than one record already exists for the given attributes. That should be impossible, please open an issue!")
+
+            if params['solo']:
+                for rr in by_name.get((params['type'],search_record),[]):
+                    if (rr['content'] != search_value) and (rr['id'] not in deleted) and (rr not in matches):
+                        deleted.add(rr['id'])
+                        calls.append(('/zones/{0}/dns_records/{1}'.format(zone_id,rr['id']),'DELETE',None))
+                        actions.append(('deleted',rr))
+
+            if len(matches) == 1:
+                if self._dns_record_needs_update(matches[0],new_record,params):
+                    calls.append(('/zones/{0}/dns_records/{1}'.format(zone_id,matches[0]['id']),'PUT',new_record))
+                    actions.append(('updated',new_record))
+                else:
+                    actions.append(('unchanged',matches[0]))
+            else:
+                calls.append(('/zones/{0}/dns_records'.format(zone_id),'POST',new_record))
+                actions.append(('created',new_record))
+
+        results = [None] * len(calls)
+        if calls and not self.module.check_mode:
+            # the solo deletes must be done before the records replacing
+            # them are created, a CNAME can not coexist with other records
+            for methods in [['DELETE'],['POST','PUT']]:
+                indexes = [index for index, call in enumerate(calls) if call[1] in methods]
+                if indexes:
+                    phase_results = self._cf_concurrent_api_calls([calls[index] for index in indexes])
+                    for index, result in zip(indexes,phase_results):
+                        results[index] = result
+
+        changes = []
+        call_index = 0
+        for action, record in actions:
+            if action != 'unchanged':
+                self.changed = True
+                if (results[call_index] is not None) and (action != 'deleted'):
+                    record = results[call_index]
+                call_index += 1
+            changes.append({'action': action, 'record': record})
+        return changes,self.changed
+
 def main():
     module = AnsibleModule(
         argument_spec = dict(
             account_api_token = dict(required=True, no_log=True, type='str'),
             account_email     = dict(required=True, type='str'),
+            records           = dict(required=False, default=None, type='list'),
+            api_concurrency   = dict(required=False, default=4, type='int'),
             port              = dict(required=False, default=None, type='int'),
             priority          = dict(required=False, default=1, type='int'),
             proto             = dict(required=False, default=None, choices=[ 'tcp', 'udp' ], type='str'),
@@ -591,23 +953,20 @@ def main():
             type              = dict(required=False, default=None, choices=[ 'A', 'AAAA', 'CNAME', 'TXT', 'SRV', 'MX', 'NS', 'SPF' ], type='str'),
             value             = dict(required=False, default=None, aliases=['content'], type='str'),
             weight            = dict(required=False, default=1, type='int'),
+            zone_cache_ttl    = dict(required=False, default=0, type='int'),
+            zone_cache_path   = dict(required=False, default='~/.ansible/tmp/cloudflare_dns_zones.json', type='str'),
             zone              = dict(required=True, default=None, aliases=['domain'], type='str'),
         ),
         supports_check_mode = True,
         required_if = ([
-                ('state','present',['record','type']),
-                ('type','MX',['priority','value']),
-                ('type','SRV',['port','priority','proto','service','value','weight']),
-                ('type','A',['value']),
-                ('type','AAAA',['value']),
-                ('type','CNAME',['value']),
-                ('type','TXT',['value']),
-                ('type','NS',['value']),
-                ('type','SPF',['value'])
-            ]
+                ('state','present',['record']),
+            ] + [('type',record_type,RECORD_TYPE_REQUIRED[record_type]) for record_type in sorted(RECORD_TYPE_REQUIRED)]
        ),
        required_one_of = (
             [['record','value','type']]
+        ),
+       mutually_exclusive = (
+            [['records','type'],['records','value']]
         )
     )
 
@@ -617,6 +976,15 @@ def main():
     # sanity checks
     if cf_api.is_solo and cf_api.state == 'absent':
         module.fail_json(msg="solo=true can only be used with state=present")
+    # type is only optional for state=present when records is given, check
+    # it before solo deletes records of every type
+    if (module.params['records'] is None) and (cf_api.state == 'present') and (cf_api.type is None):
+        module.fail_json(msg="state is present but the following are missing: type")
+
+    # converge a whole list of records at once
+    if module.params['records'] is not None:
+        changes,changed = cf_api.reconcile_dns_records(module.params['records'])
+        module.exit_json(changed=changed,result={'records': changes})
 
     # perform add, delete or update (only the TTL can be updated) of one or
     # more records
@@ -99,6 +99,56 @@ options:
         default: null
         choices: []
         aliases: []
+    workers:
+        description:
+            - Maximum number of iControl field queries to run at the same
+              time for each fact category. Every worker uses its own
+              connection (and session, if enabled), opened once for the
+              task. The time spent on each category and field is returned
+              in C(timing).
+        required: false
+        default: 1
+        version_added: "2.3"
+    fields:
+        description:
+            - Dictionary mapping a fact category to the list of fields to
+              collect for it. Only the iControl queries for those fields are
+              sent, and only for the objects matching C(filter). Categories
+              not listed are collected in full. Not applicable for software,
+              certificate and key fact categories.
+        required: false
+        default: null
+        version_added: "2.3"
+    cache_ttl:
+        description:
+            - Number of seconds collected facts are cached on the local disk
+              and reused by later runs against the same server with the same
+              C(filter) and C(fields). Each fact category is cached
+              separately. C(0) disables the cache.
+        required: false
+        default: 0
+        version_added: "2.3"
+    cache_static_ttl:
+        description:
+            - Number of seconds the slow-changing certificate, key, software
+              and system_info categories are cached for. Defaults to
+              C(cache_ttl). Only used when C(cache_ttl) is enabled.
+        required: false
+        default: null
+        version_added: "2.3"
+    cache_dir:
+        description:
+            - Directory the fact cache is stored in.
+        required: false
+        default: "~/.ansible/tmp/bigip_facts"
+        version_added: "2.3"
+    cache_size:
+        description:
+            - Maximum number of cache entries kept in C(cache_dir). The least
+              recently used entries are removed first.
+        required: false
+        default: 256
+        version_added: "2.3"
 '''
 
 EXAMPLES = '''
@@ -118,6 +168,49 @@ EXAMPLES = '''
       password=mysecret
       include=interface,vlan
 
+  - name: Collect BIG-IP virtual server facts using 8 concurrent queries
+    local_action: >
+      bigip_facts
+      server=lb.mydomain.com
+      user=admin
+      password=mysecret
+      include=virtual_server
+      workers=8
+
+  - name: Collect only pool members and status for the web pools
+    bigip_facts:
+      server: lb.mydomain.com
+      user: admin
+      password: mysecret
+      include: pool
+      filter: "/Common/web_*"
+      fields:
+        pool: ['member', 'object_status']
+    delegate_to: localhost
+
+  - name: Collect facts, reusing results up to a minute old
+    local_action: >
+      bigip_facts
+      server=lb.mydomain.com
+      user=admin
+      password=mysecret
+      include=pool,certificate
+      cache_ttl=60
+      cache_static_ttl=3600
+
+'''
+
+RETURN = '''
+timing:
+    description: Seconds spent collecting each fact category, in total and per field
+    returned: success
+    type: dict
+    sample: {"VirtualServers": {"total": 1.92, "fields": {"destination": 0.31}}}
+cache_hits:
+    description: Fact categories answered from the local cache
+    returned: success
+    type: list
+    sample: ["pool", "certificate"]
 '''
 
 try:
@@ -128,10 +221,23 @@ except ImportError:
 else:
     bigsuds_found = True
 
+import copy
 import fnmatch
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
 import traceback
 import re
 
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
 # ===========================================
 # bigip_facts module specific support methods.
 #
@@ -175,6 +281,166 @@ class F5(object):
         return self.api.System.Session.get_active_folder()
 
 
+class FieldCollector(object):
+    """Batched iControl field collector.
+
+    Runs the get_* field queries of a fact class over a bounded pool of
+    worker threads, and records the time spent on each class and field.
+    suds clients are not thread-safe, so every worker thread queries through
+    its own iControl API instance, created by api_factory on first use and
+    kept for the following fact classes.
+
+    Attributes:
+        workers: Maximum number of concurrent field queries.
+        api_factory: Callable returning a new iControl API instance.
+        timing: Per-class dictionary of total and per-field timings.
+    """
+
+    def __init__(self, workers=1, api_factory=None):
+        self.workers = max(1, workers)
+        self.api_factory = api_factory
+        self.timing = {}
+        self._apis = []
+
+    def _query(self, api_obj, field):
+        start = time.time()
+        try:
+            response = getattr(api_obj, "get_" + field)()
+        except (MethodNotFound, WebFault):
+            supported = False
+            response = None
+        else:
+            supported = True
+        return (supported, response, time.time() - start)
+
+    def _worker(self, api, api_obj, pending, results, errors):
+        api_obj = copy.copy(api_obj)
+        api_obj.api = api
+        while not errors:
+            try:
+                field = pending.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                results[field] = self._query(api_obj, field)
+            except Exception:
+                errors.append(sys.exc_info())
+
+    def collect(self, api_obj, fields):
+        """Query each field of api_obj.
+
+        Returns a list of (field, response) tuples in the order of fields.
+        Fields the device does not support are left out.
+        """
+        start = time.time()
+        results = {}
+        errors = []
+        if self.workers == 1 or len(fields) < 2 or self.api_factory is None:
+            for field in fields:
+                results[field] = self._query(api_obj, field)
+        else:
+            pending = queue.Queue()
+            for field in fields:
+                pending.put(field)
+            count = min(self.workers, len(fields))
+            while len(self._apis) < count:
+                self._apis.append(self.api_factory())
+            threads = []
+            for api in self._apis[:count]:
+                thread = threading.Thread(target=self._worker,
+                                          args=(api, api_obj, pending, results, errors))
+                thread.daemon = True
+                thread.start()
+                threads.append(thread)
+            for thread in threads:
+                thread.join()
+            if errors:
+                exc_type, exc_value, exc_tb = errors[0]
+                raise exc_type, exc_value, exc_tb
+
+        timing = self.timing.setdefault(api_obj.__class__.__name__,
+                                        {'total': 0.0, 'fields': {}})
+        collected = []
+        for field in fields:
+            supported, response, elapsed = results[field]
+            timing['fields'][field] = elapsed
+            if supported:
+                collected.append((field, response))
+        timing['total'] += time.time() - start
+        return collected
+
+
+class FactsCache(object):
+    """Facts cache class.
+
+    On-disk cache of collected fact categories. Every entry is stored in its
+    own file, named after a hash of its key; file modification times track
+    the last use of each entry for LRU eviction.
+
+    Attributes:
+        path: Cache directory.
+        size: Maximum number of entries kept.
+    """
+
+    def __init__(self, path, size=256):
+        self.path = os.path.expanduser(path)
+        self.size = size
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path, 0o700)
+
+    def _entry_path(self, key):
+        digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+        return os.path.join(self.path, digest + '.json')
+
+    def get(self, key, ttl):
+        entry_path = self._entry_path(key)
+        try:
+            f = open(entry_path)
+            try:
+                entry = json.load(f)
+            finally:
+                f.close()
+        except (IOError, OSError, ValueError):
+            return None
+        # an entry of another layout is a miss, like an unreadable one
+        if not isinstance(entry, dict) or 'facts' not in entry:
+            return None
+        if entry.get('key') != key or time.time() - entry.get('created', 0) > ttl:
+            return None
+        try:
+            os.utime(entry_path, None)
+        except OSError:
+            pass
+        return entry['facts']
+
+    def set(self, key, facts):
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        f = os.fdopen(fd, 'w')
+        try:
+            json.dump(dict(key=key, created=time.time(), facts=facts), f)
+        finally:
+            f.close()
+        os.rename(tmp_path, self._entry_path(key))
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.path):
+            if not name.endswith('.json'):
+                continue
+            entry_path = os.path.join(self.path, name)
+            try:
+                entries.append((os.path.getmtime(entry_path), entry_path))
+            except OSError:
+                pass
+        entries.sort()
+        for mtime, entry_path in entries[:max(0, len(entries) - self.size)]:
+            try:
+                os.remove(entry_path)
+            except OSError:
+                pass
+
+
 class Interfaces(object):
     """Interfaces class.
 
@@ -1373,37 +1639,30 @@ class SystemInfo(object):
         return self.api.System.SystemInfo.get_uptime()
 
 
-def generate_dict(api_obj, fields):
-    result_dict = {}
-    lists = []
-    supported_fields = []
-    if api_obj.get_list():
-        for field in fields:
-            try:
-                api_response = getattr(api_obj, "get_" + field)()
-            except (MethodNotFound, WebFault):
-                pass
-            else:
-                lists.append(api_response)
-                supported_fields.append(field)
-        for i, j in enumerate(api_obj.get_list()):
-            temp = {}
-            temp.update([(item[0], item[1][i]) for item in zip(supported_fields, lists)])
-            result_dict[j] = temp
-    return result_dict
+def project_fields(fields, projection):
+    if not projection:
+        return fields
+    unknown = [x for x in projection if x not in fields]
+    if unknown:
+        raise ValueError("unsupported fields %s, must be one or more of: %s"
+                         % (",".join(unknown), ",".join(fields)))
+    return [x for x in fields if x in projection]
 
-def generate_simple_dict(api_obj, fields):
+def generate_dict(api_obj, fields, collector, projection=None):
+    fields = project_fields(fields, projection)
     result_dict = {}
-    for field in fields:
-        try:
-            api_response = getattr(api_obj, "get_" + field)()
-        except (MethodNotFound, WebFault):
-            pass
-        else:
-            result_dict[field] = api_response
+    names = api_obj.get_list()
+    if names:
+        columns = collector.collect(api_obj, fields)
+        for i, name in enumerate(names):
+            result_dict[name] = dict([(field, values[i]) for field, values in columns])
     return result_dict
 
-def generate_interface_dict(f5, regex):
+def generate_simple_dict(api_obj, fields, collector, projection=None):
+    fields = project_fields(fields, projection)
+    return dict(collector.collect(api_obj, fields))
+
+def generate_interface_dict(f5, regex, collector, projection=None):
     interfaces = Interfaces(f5.get_api(), regex)
     fields = ['active_media', 'actual_flow_control', 'bundle_state',
               'description', 'dual_media_state', 'enabled_state', 'if_index',
@@ -1415,26 +1674,26 @@ def generate_interface_dict(f5, regex):
               'sfp_media_state', 'stp_active_edge_port_state',
               'stp_enabled_state', 'stp_link_type',
               'stp_protocol_detection_reset_state']
-    return generate_dict(interfaces, fields)
+    return generate_dict(interfaces, fields, collector, projection)
 
-def generate_self_ip_dict(f5, regex):
+def generate_self_ip_dict(f5, regex, collector, projection=None):
     self_ips = SelfIPs(f5.get_api(), regex)
     fields = ['address', 'allow_access_list', 'description',
               'enforced_firewall_policy', 'floating_state', 'fw_rule',
               'netmask', 'staged_firewall_policy', 'traffic_group',
               'vlan', 'is_traffic_group_inherited']
-    return generate_dict(self_ips, fields)
+    return generate_dict(self_ips, fields, collector, projection)
 
-def generate_trunk_dict(f5, regex):
+def generate_trunk_dict(f5, regex, collector, projection=None):
     trunks = Trunks(f5.get_api(), regex)
     fields = ['active_lacp_state', 'configured_member_count', 'description',
               'distribution_hash_option', 'interface', 'lacp_enabled_state',
               'lacp_timeout_option', 'link_selection_policy', 'media_speed',
               'media_status', 'operational_member_count', 'stp_enabled_state',
               'stp_protocol_detection_reset_state']
-    return generate_dict(trunks, fields)
+    return generate_dict(trunks, fields, collector, projection)
 
-def generate_vlan_dict(f5, regex):
+def generate_vlan_dict(f5, regex, collector, projection=None):
     vlans = Vlans(f5.get_api(), regex)
     fields = ['auto_lasthop', 'cmp_hash_algorithm', 'description',
               'dynamic_forwarding', 'failsafe_action', 'failsafe_state',
@@ -1443,9 +1702,9 @@ def generate_vlan_dict(f5, regex):
               'sflow_poll_interval', 'sflow_poll_interval_global',
               'sflow_sampling_rate', 'sflow_sampling_rate_global',
               'source_check_state', 'true_mac_address', 'vlan_id']
-    return generate_dict(vlans, fields)
+    return generate_dict(vlans, fields, collector, projection)
 
-def generate_vs_dict(f5, regex):
+def generate_vs_dict(f5, regex, collector, projection=None):
     virtual_servers = VirtualServers(f5.get_api(), regex)
     fields = ['actual_hardware_acceleration', 'authentication_profile',
               'auto_lasthop', 'bw_controller_policy', 'clone_pool',
@@ -1463,9 +1722,9 @@ def generate_vs_dict(f5, regex):
               'source_address_translation_type', 'source_port_behavior',
               'staged_firewall_policy', 'translate_address_state',
               'translate_port_state', 'type', 'vlan', 'wildmask']
-    return generate_dict(virtual_servers, fields)
+    return generate_dict(virtual_servers, fields, collector, projection)
 
-def generate_pool_dict(f5, regex):
+def generate_pool_dict(f5, regex, collector, projection=None):
     pools = Pools(f5.get_api(), regex)
     fields = ['action_on_service_down', 'active_member_count',
               'aggregate_dynamic_ratio', 'allow_nat_state',
@@ -1479,9 +1738,9 @@ def generate_pool_dict(f5, regex):
               'queue_on_connection_limit_state', 'queue_time_limit',
               'reselect_tries', 'server_ip_tos', 'server_link_qos',
               'simple_timeout', 'slow_ramp_time']
-    return generate_dict(pools, fields)
+    return generate_dict(pools, fields, collector, projection)
 
-def generate_device_dict(f5, regex):
+def generate_device_dict(f5, regex, collector, projection=None):
     devices = Devices(f5.get_api(), regex)
     fields = ['active_modules', 'base_mac_address', 'blade_addresses',
               'build', 'chassis_id', 'chassis_type', 'comment',
@@ -1491,49 +1750,49 @@ def generate_device_dict(f5, regex):
               'optional_modules', 'platform_id', 'primary_mirror_address',
               'product', 'secondary_mirror_address', 'software_version',
               'timelimited_modules', 'timezone', 'unicast_addresses']
-    return generate_dict(devices, fields)
+    return generate_dict(devices, fields, collector, projection)
 
-def generate_device_group_dict(f5, regex):
+def generate_device_group_dict(f5, regex, collector, projection=None):
     device_groups = DeviceGroups(f5.get_api(), regex)
     fields = ['all_preferred_active', 'autosync_enabled_state','description',
               'device', 'full_load_on_sync_state',
               'incremental_config_sync_size_maximum',
               'network_failover_enabled_state', 'sync_status', 'type']
-    return generate_dict(device_groups, fields)
+    return generate_dict(device_groups, fields, collector, projection)
 
-def generate_traffic_group_dict(f5, regex):
+def generate_traffic_group_dict(f5, regex, collector, projection=None):
     traffic_groups = TrafficGroups(f5.get_api(), regex)
     fields = ['auto_failback_enabled_state', 'auto_failback_time',
               'default_device', 'description', 'ha_load_factor',
               'ha_order', 'is_floating', 'mac_masquerade_address',
               'unit_id']
-    return generate_dict(traffic_groups, fields)
+    return generate_dict(traffic_groups, fields, collector, projection)
 
-def generate_rule_dict(f5, regex):
+def generate_rule_dict(f5, regex, collector, projection=None):
     rules = Rules(f5.get_api(), regex)
     fields = ['definition', 'description', 'ignore_vertification',
               'verification_status']
-    return generate_dict(rules, fields)
+    return generate_dict(rules, fields, collector, projection)
 
-def generate_node_dict(f5, regex):
+def generate_node_dict(f5, regex, collector, projection=None):
     nodes = Nodes(f5.get_api(), regex)
     fields = ['address', 'connection_limit', 'description', 'dynamic_ratio',
               'monitor_instance', 'monitor_rule', 'monitor_status',
               'object_status', 'rate_limit', 'ratio', 'session_status']
-    return generate_dict(nodes, fields)
+    return generate_dict(nodes, fields, collector, projection)
 
-def generate_virtual_address_dict(f5, regex):
+def generate_virtual_address_dict(f5, regex, collector, projection=None):
     virtual_addresses = VirtualAddresses(f5.get_api(), regex)
     fields = ['address', 'arp_state', 'auto_delete_state', 'connection_limit',
               'description', 'enabled_state', 'icmp_echo_state',
               'is_floating_state', 'netmask', 'object_status',
               'route_advertisement_state', 'traffic_group']
-    return generate_dict(virtual_addresses, fields)
+    return generate_dict(virtual_addresses, fields, collector, projection)
 
-def generate_address_class_dict(f5, regex):
+def generate_address_class_dict(f5, regex, collector, projection=None):
     address_classes = AddressClasses(f5.get_api(), regex)
     fields = ['address_class', 'description']
-    return generate_dict(address_classes, fields)
+    return generate_dict(address_classes, fields, collector, projection)
 
 def generate_certificate_dict(f5, regex):
     certificates = Certificates(f5.get_api(), regex)
@@ -1543,7 +1802,7 @@ def generate_key_dict(f5, regex):
     keys = Keys(f5.get_api(), regex)
     return dict(zip(keys.get_list(), keys.get_key_list()))
 
-def generate_client_ssl_profile_dict(f5, regex):
+def generate_client_ssl_profile_dict(f5, regex, collector, projection=None):
     profiles = ProfileClientSSL(f5.get_api(), regex)
     fields = ['alert_timeout', 'allow_nonssl_state', 'authenticate_depth',
               'authenticate_once_state', 'ca_file', 'cache_size',
@@ -1564,9 +1823,9 @@ def generate_client_ssl_profile_dict(f5, regex):
               'server_name', 'session_ticket_state', 'sni_default_state',
               'sni_require_state', 'ssl_option', 'strict_resume_state',
               'unclean_shutdown_state', 'is_base_profile', 'is_system_profile']
-    return generate_dict(profiles, fields)
+    return generate_dict(profiles, fields, collector, projection)
 
-def generate_system_info_dict(f5):
+def generate_system_info_dict(f5, collector, projection=None):
     system_info = SystemInfo(f5.get_api())
     fields = ['base_mac_address',
               'blade_temperature', 'chassis_slot_information',
@@ -1576,7 +1835,7 @@ def generate_system_info_dict(f5):
               'product_information', 'pva_version', 'system_id',
               'system_information', 'time',
               'time_zone', 'uptime']
-    return generate_simple_dict(system_info, fields)
+    return generate_simple_dict(system_info, fields, collector, projection)
 
 def generate_software_list(f5):
     software = Software(f5.get_api())
@@ -1594,6 +1853,12 @@ def main():
             session = dict(type='bool', default=False),
             include = dict(type='list', required=True),
             filter = dict(type='str', required=False),
+            workers = dict(type='int', default=1),
+            fields = dict(type='dict', required=False),
+            cache_ttl = dict(type='int', default=0),
+            cache_static_ttl = dict(type='int', required=False),
+            cache_dir = dict(type='path', default='~/.ansible/tmp/bigip_facts'),
+            cache_size = dict(type='int', default=256),
         )
     )
 
@@ -1607,6 +1872,7 @@ def main():
     validate_certs = module.params['validate_certs']
     session = module.params['session']
     fact_filter = module.params['filter']
+    workers = module.params['workers']
 
     if validate_certs:
         import ssl
@@ -1627,10 +1893,60 @@ def main():
     if not all(include_test):
         module.fail_json(msg="value of include must be one or more of: %s, got: %s" % (",".join(valid_includes), ",".join(include)))
 
+    if workers < 1:
+        module.fail_json(msg="workers must be at least 1, got: %d" % workers)
+
+    projection = {}
+    for category, category_fields in (module.params['fields'] or {}).items():
+        if category not in valid_includes or category in ('certificate', 'key', 'software'):
+            module.fail_json(msg="fields can not be selected for fact category: %s" % category)
+        if isinstance(category_fields, basestring):
+            category_fields = category_fields.split(',')
+        projection[category] = [x.strip() for x in category_fields]
+
+    def new_api():
+        worker_f5 = F5(server, user, password, session, validate_certs, server_port)
+        worker_f5.set_active_folder("/")
+        worker_f5.enable_recursive_query_state()
+        return worker_f5.get_api()
+
+    collector = FieldCollector(workers, new_api)
+
+    cache = None
+    cache_ttl = module.params['cache_ttl']
+    cache_static_ttl = module.params['cache_static_ttl']
+    if cache_static_ttl is None:
+        cache_static_ttl = cache_ttl
+    if cache_ttl > 0:
+        try:
+            cache = FactsCache(module.params['cache_dir'], module.params['cache_size'])
+        except (IOError, OSError), e:
+            module.fail_json(msg="unable to use cache directory %s: %s" % (module.params['cache_dir'], e))
+
+    def cache_key(category):
+        return [server, server_port, user, category, fact_filter,
+                sorted(projection.get(category, []))]
+
     try:
         facts = {}
-
-        if len(include) > 0:
+        cache_hits = []
+        pending = include
+
+        if cache:
+            pending = []
+            for category in include:
+                if category in ('certificate', 'key', 'software', 'system_info'):
+                    ttl = cache_static_ttl
+                else:
+                    ttl = cache_ttl
+                cached = cache.get(cache_key(category), ttl)
+                if cached is None:
+                    pending.append(category)
+                else:
+                    facts[category] = cached
+                    cache_hits.append(category)
+
+        if len(pending) > 0:
             f5 = F5(server, user, password, session, validate_certs, server_port)
             saved_active_folder = f5.get_active_folder()
             saved_recursive_query_state = f5.get_recursive_query_state()
@@ -1639,42 +1955,42 @@ def main():
             if saved_recursive_query_state != "STATE_ENABLED":
                 f5.enable_recursive_query_state()
 
-            if 'interface' in include:
-                facts['interface'] = generate_interface_dict(f5, regex)
-            if 'self_ip' in include:
-                facts['self_ip'] = generate_self_ip_dict(f5, regex)
-            if 'trunk' in include:
-                facts['trunk'] = generate_trunk_dict(f5, regex)
-            if 'vlan' in include:
-                facts['vlan'] = generate_vlan_dict(f5, regex)
-            if 'virtual_server' in include:
-                facts['virtual_server'] = generate_vs_dict(f5, regex)
-            if 'pool' in include:
-                facts['pool'] = generate_pool_dict(f5, regex)
-            if 'device' in include:
-                facts['device'] = generate_device_dict(f5, regex)
-            if 'device_group' in include:
-                facts['device_group'] = generate_device_group_dict(f5, regex)
-            if 'traffic_group' in include:
-                facts['traffic_group'] = generate_traffic_group_dict(f5, regex)
-            if 'rule' in include:
-                facts['rule'] = generate_rule_dict(f5, regex)
-            if 'node' in include:
-                facts['node'] = generate_node_dict(f5, regex)
-            if 'virtual_address' in include:
-                facts['virtual_address'] = generate_virtual_address_dict(f5, regex)
-            if 'address_class' in include:
-                facts['address_class'] = generate_address_class_dict(f5, regex)
-            if 'software' in include:
+            if 'interface' in pending:
+                facts['interface'] = generate_interface_dict(f5, regex, collector, projection.get('interface'))
+            if 'self_ip' in pending:
+                facts['self_ip'] = generate_self_ip_dict(f5, regex, collector, projection.get('self_ip'))
+            if 'trunk' in pending:
+                facts['trunk'] = generate_trunk_dict(f5, regex, collector, projection.get('trunk'))
+            if 'vlan' in pending:
+                facts['vlan'] = generate_vlan_dict(f5, regex, collector, projection.get('vlan'))
+            if 'virtual_server' in pending:
+                facts['virtual_server'] = generate_vs_dict(f5, regex, collector, projection.get('virtual_server'))
+            if 'pool' in pending:
+                facts['pool'] = generate_pool_dict(f5, regex, collector, projection.get('pool'))
+            if 'device' in pending:
+                facts['device'] = generate_device_dict(f5, regex, collector, projection.get('device'))
+            if 'device_group' in pending:
+                facts['device_group'] = generate_device_group_dict(f5, regex, collector, projection.get('device_group'))
+            if 'traffic_group' in pending:
+                facts['traffic_group'] = generate_traffic_group_dict(f5, regex, collector, projection.get('traffic_group'))
+            if 'rule' in pending:
+                facts['rule'] = generate_rule_dict(f5, regex, collector, projection.get('rule'))
+            if 'node' in pending:
+                facts['node'] = generate_node_dict(f5, regex, collector, projection.get('node'))
+            if 'virtual_address' in pending:
+                facts['virtual_address'] = generate_virtual_address_dict(f5, regex, collector, projection.get('virtual_address'))
+            if 'address_class' in pending:
+                facts['address_class'] = generate_address_class_dict(f5, regex, collector, projection.get('address_class'))
+            if 'software' in pending:
                 facts['software'] = generate_software_list(f5)
-            if 'certificate' in include:
+            if 'certificate' in pending:
                 facts['certificate'] = generate_certificate_dict(f5, regex)
-            if 'key' in include:
+            if 'key' in pending:
                 facts['key'] = generate_key_dict(f5, regex)
-            if 'client_ssl_profile' in include:
-                facts['client_ssl_profile'] = generate_client_ssl_profile_dict(f5, regex)
-            if 'system_info' in include:
-                facts['system_info'] = generate_system_info_dict(f5)
+            if 'client_ssl_profile' in pending:
+                facts['client_ssl_profile'] = generate_client_ssl_profile_dict(f5, regex, collector, projection.get('client_ssl_profile'))
+            if 'system_info' in pending:
+                facts['system_info'] = generate_system_info_dict(f5, collector, projection.get('system_info'))
 
             # restore saved state
             if saved_active_folder and saved_active_folder != "/":
@@ -1683,7 +1999,12 @@ def main():
                saved_recursive_query_state != "STATE_ENABLED":
                 f5.set_recursive_query_state(saved_recursive_query_state)
 
-        result = {'ansible_facts': facts}
+            if cache:
+                for category in pending:
+                    cache.set(cache_key(category), facts[category])
+
+        result = {'ansible_facts': facts, 'timing': collector.timing,
+                  'cache_hits': cache_hits}
 
     except Exception, e:
         module.fail_json(msg="received exception: %s\ntraceback: %s" % (e, traceback.format_exc()))
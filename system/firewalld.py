@@ -86,6 +86,34 @@ options:
     required: false
     default: null
     version_added: "2.1"
+  ports:
+    description:
+      - "List of ports or port ranges, in the same form as I(port), to add/remove to/from the zone in one go."
+    required: false
+    default: null
+    version_added: "2.3"
+  services:
+    description:
+      - "List of services to add/remove to/from the zone in one go."
+    required: false
+    default: null
+    version_added: "2.3"
+  sources:
+    description:
+      - "List of sources/networks to add/remove to/from the zone in one go."
+    required: false
+    default: null
+    version_added: "2.3"
+  rich_rules:
+    description:
+      - "List of rich rules to add/remove to/from the zone in one go."
+      - "With any of I(ports), I(services), I(sources) or I(rich_rules), the permanent zone settings are read once,
+        compared in memory and written back with a single update. Runtime changes are computed from one read of each
+        runtime list and only the missing or extra entries are changed. Sources are only handled permanently, as with
+        I(source)."
+    required: false
+    default: null
+    version_added: "2.3"
 notes:
   - Not tested on any Debian based system.
   - Requires the python2 bindings of firewalld, who may not be installed by default if the distribution switched to python 3 
@@ -102,6 +130,18 @@ EXAMPLES = '''
 - firewalld: source='192.168.1.0/24' zone=internal state=enabled
 - firewalld: zone=trusted interface=eth2 permanent=true state=enabled
 - firewalld: masquerade=yes state=enabled permanent=true zone=dmz
+- firewalld:
+    zone: public
+    ports:
+      - 8080/tcp
+      - 8443/tcp
+      - 161-162/udp
+    services:
+      - http
+      - https
+    permanent: true
+    immediate: true
+    state: enabled
 '''
 
 import os
@@ -329,6 +369,98 @@ def set_rich_rule_disabled_permanent(zone, rule):
     fw_zone.update(fw_settings)
 
 
+####################
+# bulk zone handling
+#
+def converge_zone_permanent(zone, enable, ports, services, sources, rich_rules, check_mode):
+    fw_zone = fw.config().getZoneByName(zone)
+    fw_settings = fw_zone.getSettings()
+    changes = []
+
+    current = fw_settings.getPorts()
+    for port, protocol in ports:
+        if ((port, protocol) in current) != enable:
+            changes.append("%s/%s" % (port, protocol))
+            if enable:
+                fw_settings.addPort(port, protocol)
+            else:
+                fw_settings.removePort(port, protocol)
+
+    current = fw_settings.getServices()
+    for service in services:
+        if (service in current) != enable:
+            changes.append(service)
+            if enable:
+                fw_settings.addService(service)
+            else:
+                fw_settings.removeService(service)
+
+    current = fw_settings.getSources()
+    for source in sources:
+        if (source in current) != enable:
+            changes.append(source)
+            if enable:
+                fw_settings.addSource(source)
+            else:
+                fw_settings.removeSource(source)
+
+    current = fw_settings.getRichRules()
+    for rule in rich_rules:
+        # Convert the rule string to standard format
+        # before checking whether it is present
+        if (str(Rich_Rule(rule_str=rule)) in current) != enable:
+            changes.append(rule)
+            if enable:
+                fw_settings.addRichRule(rule)
+            else:
+                fw_settings.removeRichRule(rule)
+
+    if changes and not check_mode:
+        fw_zone.update(fw_settings)
+    return changes
+
+def converge_zone_runtime(zone, enable, ports, services, rich_rules, timeout, check_mode):
+    changes = []
+
+    if ports:
+        current = fw.getPorts(zone)
+        for port, protocol in ports:
+            if ([port, protocol] in current) != enable:
+                changes.append("%s/%s" % (port, protocol))
+                if check_mode:
+                    continue
+                if enable:
+                    set_port_enabled(zone, port, protocol, timeout)
+                else:
+                    set_port_disabled(zone, port, protocol)
+
+    if services:
+        current = fw.getServices(zone)
+        for service in services:
+            if (service in current) != enable:
+                changes.append(service)
+                if check_mode:
+                    continue
+                if enable:
+                    set_service_enabled(zone, service, timeout)
+                else:
+                    set_service_disabled(zone, service)
+
+    if rich_rules:
+        current = fw.getRichRules(zone)
+        for rule in rich_rules:
+            if (str(Rich_Rule(rule_str=rule)) in current) != enable:
+                changes.append(rule)
+                if check_mode:
+                    continue
+                if enable:
+                    set_rich_rule_enabled(zone, rule, timeout)
+                else:
+                    set_rich_rule_disabled(zone, rule)
+
+    return changes
+
+
 def main():
 
     module = AnsibleModule(
@@ -344,10 +476,16 @@ def main():
             timeout=dict(type='int',required=False,default=0),
             interface=dict(required=False,default=None),
             masquerade=dict(required=False,default=None),
+            ports=dict(required=False,default=None,type='list'),
+            services=dict(required=False,default=None,type='list'),
+            sources=dict(required=False,default=None,type='list'),
+            rich_rules=dict(required=False,default=None,type='list'),
         ),
         supports_check_mode=True
     )
-    if module.params['source'] == None and module.params['permanent'] == None:
+    bulk = [module.params[k] for k in ('ports', 'services', 'sources', 'rich_rules') if module.params[k] != None]
+    if module.params['source'] == None and module.params['permanent'] == None and \
+            (not bulk or module.params['ports'] or module.params['services'] or module.params['rich_rules']):
         module.fail_json(msg='permanent is a required parameter')
 
     if module.params['interface'] != None and module.params['zone'] == None:
@@ -409,6 +547,36 @@ def main():
     if modification_count > 1:
         module.fail_json(msg='can only operate on port, service, rich_rule or interface at once')
 
+    if bulk:
+        if modification_count > 0 or source != None:
+            module.fail_json(msg='ports, services, sources and rich_rules can not be combined with port, service, source, rich_rule, interface or masquerade')
+
+        enable = (desired_state == "enabled")
+        ports = []
+        for item in module.params['ports'] or []:
+            if '/' not in item:
+                module.fail_json(msg='improper port format (missing protocol?): %s' % item)
+            ports.append(tuple(item.split('/', 1)))
+        services = module.params['services'] or []
+        sources = module.params['sources'] or []
+        rich_rules = module.params['rich_rules'] or []
+
+        changes = []
+        if permanent:
+            changes = converge_zone_permanent(zone, enable, ports, services, sources, rich_rules, module.check_mode)
+            msgs.append('Permanent operation')
+        elif sources:
+            # sources are always handled permanently
+            changes = converge_zone_permanent(zone, enable, [], [], sources, [], module.check_mode)
+        if (immediate or not permanent) and (ports or services or rich_rules):
+            runtime_changes = converge_zone_runtime(zone, enable, ports, services, rich_rules, timeout, module.check_mode)
+            changes.extend([c for c in runtime_changes if c not in changes])
+            msgs.append('Non-permanent operation')
+
+        if changes:
+            msgs.append("Changed %s to %s" % (', '.join(changes), desired_state))
+        module.exit_json(changed=bool(changes), msg=', '.join(msgs))
+
     if service != None:
         if permanent:
             is_enabled = get_service_enabled_permanent(zone, service)
@@ -23,6 +23,16 @@ BINS = dict(
     ipv6='ip6tables',
 )
 
+SAVE_BINS = dict(
+    ipv4='iptables-save',
+    ipv6='ip6tables-save',
+)
+
+RESTORE_BINS = dict(
+    ipv4='iptables-restore',
+    ipv6='ip6tables-restore',
+)
+
 DOCUMENTATION = '''
 ---
 module: iptables
@@ -40,7 +50,20 @@ notes:
   - This module just deals with individual rules. If you need advanced
     chaining of rules the recommended way is to template the iptables restore
     file.
+  - With I(rules), presence is decided by comparing a normal form of each rule
+    with the output of iptables-save. Host names and service names are not
+    resolved, so give addresses and port numbers in such rules.
 options:
+  rules:
+    version_added: "2.3"
+    description:
+      - A list of rules to converge in one go. Every entry is a dictionary
+        taking the same options as the module itself (except I(ip_version)
+        and I(rules)); options left out default to the ones of the task.
+        The current ruleset is read once with iptables-save, and all needed
+        changes are applied in a single C(iptables-restore --noflush) call.
+    required: false
+    default: null
   table:
     description:
       - This option specifies the packet matching table which the command
@@ -75,7 +98,8 @@ options:
       - "Chain to operate on. This option can either be the name of a user
         defined chain or any of the builtin chains: 'INPUT', 'FORWARD',
         'OUTPUT', 'PREROUTING', 'POSTROUTING', 'SECMARK', 'CONNSECMARK'"
-    required: true
+      - Required unless I(rules) is given.
+    required: false
   protocol:
     description:
       - The protocol of the rule or of the packet to check. The specified
@@ -308,8 +332,29 @@ EXAMPLES = '''
 
 # Tag all outbound tcp packets with DSCP DiffServ class CS1
 - iptables: chain=OUTPUT jump=DSCP table=mangle set_dscp_mark_class=CS1 protocol=tcp
+
+# Converge several rules in one transaction
+- iptables:
+    chain: INPUT
+    jump: ACCEPT
+    rules:
+      - protocol: tcp
+        destination_port: 22
+        comment: ssh
+      - protocol: tcp
+        destination_port: 443
+      - source: 10.0.0.1
+        jump: DROP
+        action: insert
+      - source: 10.0.0.2
+        jump: DROP
+        state: absent
+  become: yes
 '''
 
+import pwd
+import shlex
+
 
 def append_param(rule, param, flag, is_list):
     if is_list:
@@ -398,6 +443,271 @@ def remove_rule(iptables_path, module, params):
     module.run_command(cmd, check_rc=True)
 
 
+# long options as iptables-save prints them
+OPTION_ALIASES = {
+    '--protocol': '-p',
+    '--source': '-s',
+    '--src': '-s',
+    '--destination': '-d',
+    '--dst': '-d',
+    '--in-interface': '-i',
+    '--out-interface': '-o',
+    '--jump': '-j',
+    '--goto': '-g',
+    '--match': '-m',
+    '--fragment': '-f',
+    '--source-port': '--sport',
+    '--destination-port': '--dport',
+}
+
+ICMP_TYPES = {
+    'echo-reply': '0',
+    'pong': '0',
+    'destination-unreachable': '3',
+    'source-quench': '4',
+    'redirect': '5',
+    'echo-request': '8',
+    'ping': '8',
+    'time-exceeded': '11',
+    'ttl-exceeded': '11',
+    'parameter-problem': '12',
+    'timestamp-request': '13',
+    'timestamp-reply': '14',
+}
+
+LIMIT_UNITS = {
+    's': 'sec',
+    'm': 'min',
+    'h': 'hour',
+    'd': 'day',
+}
+
+
+# options that iptables-save always prints, even when the rule left them
+# to their default, keyed by the target or match that implies them
+TARGET_DEFAULTS = {
+    'REJECT': {
+        'ipv4': ('--reject-with', 'icmp-port-unreachable'),
+        'ipv6': ('--reject-with', 'icmp6-port-unreachable'),
+    },
+}
+MATCH_DEFAULTS = {
+    'limit': (('--limit', '3/hour'), ('--limit-burst', '5')),
+}
+
+
+def dscp_class_value(dscp_class):
+    dscp_class = dscp_class.upper()
+    if dscp_class == 'EF':
+        return 46
+    if dscp_class.startswith('CS'):
+        return int(dscp_class[2:]) * 8
+    if dscp_class.startswith('AF'):
+        return int(dscp_class[2]) * 8 + int(dscp_class[3]) * 2
+    raise ValueError(dscp_class)
+
+
+def normalize_value(flag, value, ip_version):
+    if flag in ('-s', '-d'):
+        if '/' not in value:
+            value += (ip_version == 'ipv6') and '/128' or '/32'
+    elif flag == '-p':
+        value = value.lower()
+    elif flag in ('--state', '--ctstate'):
+        value = ','.join(sorted(value.split(',')))
+    elif flag == '--icmp-type':
+        value = ICMP_TYPES.get(value, value)
+    elif flag == '--limit' and '/' in value:
+        rate, unit = value.split('/', 1)
+        value = rate + '/' + LIMIT_UNITS.get(unit[:1], unit)
+    elif flag == '--uid-owner' and not value.isdigit():
+        try:
+            value = str(pwd.getpwnam(value).pw_uid)
+        except KeyError:
+            pass
+    elif flag == '--set-dscp':
+        try:
+            value = str(int(value, 0))
+        except ValueError:
+            pass
+    return value
+
+
+def normalize_rule(rule, ip_version):
+    """
+    Reduces a rule, as a list of arguments, to a form that compares equal
+    for the way construct_rule() and iptables-save spell the same rule.
+    """
+    options = []
+    negate = False
+    i = 0
+    while i < len(rule):
+        token = rule[i]
+        i += 1
+        if token == '!':
+            negate = True
+            continue
+        flag = OPTION_ALIASES.get(token, token)
+        values = []
+        while i < len(rule) and rule[i] != '!' and not (rule[i].startswith('-') and len(rule[i]) > 1 and not rule[i][1].isdigit()):
+            values.append(rule[i])
+            i += 1
+        if flag == '--set-dscp-class' and values:
+            try:
+                flag, values = '--set-dscp', [str(dscp_class_value(values[0]))]
+            except (ValueError, IndexError):
+                pass
+        options.append((negate, flag, tuple(normalize_value(flag, v, ip_version) for v in values)))
+        negate = False
+
+    flags = [flag for negate, flag, values in options]
+    defaults = []
+    for negate, flag, values in options:
+        if flag == '-j' and values and values[0] in TARGET_DEFAULTS:
+            defaults.append(TARGET_DEFAULTS[values[0]][ip_version])
+        elif flag == '-m' and values and values[0] in MATCH_DEFAULTS:
+            defaults.extend(MATCH_DEFAULTS[values[0]])
+    for flag, value in defaults:
+        if flag not in flags:
+            options.append((False, flag, (normalize_value(flag, value, ip_version),)))
+            flags.append(flag)
+
+    protocols = [values for negate, flag, values in options if flag == '-p']
+    normalized = []
+    for negate, flag, values in options:
+        # counters are not part of the rule; iptables-save adds an explicit
+        # match for the protocol given with -p
+        if flag == '-c':
+            continue
+        if flag == '-m' and (values,) == tuple(protocols[:1]):
+            continue
+        normalized.append((negate, flag, values))
+    return tuple(sorted(normalized))
+
+
+def get_ruleset(iptables_save_path, module, ip_version):
+    """
+    Reads the current rules once with iptables-save. Returns a dict of
+    (table, chain) to a dict of normalized rules to their number of
+    occurrences.
+    """
+    rc, out, err = module.run_command([iptables_save_path], check_rc=True)
+    ruleset = {}
+    table = None
+    for line in out.splitlines():
+        line = line.strip()
+        if line.startswith('*'):
+            table = line[1:]
+        elif line.startswith(':'):
+            ruleset.setdefault((table, line[1:].split()[0]), {})
+        elif line.startswith('-A '):
+            args = shlex.split(line)
+            rules = ruleset.setdefault((table, args[1]), {})
+            key = normalize_rule(args[2:], ip_version)
+            rules[key] = rules.get(key, 0) + 1
+    return ruleset
+
+
+def quote_restore_arg(arg):
+    if arg and not [c for c in arg if c in ' \t"\'']:
+        return arg
+    return '"%s"' % arg.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def restore_rules(iptables_restore_path, module, changes):
+    """
+    Applies changes, a list of (table, action, chain, rule) tuples, in a
+    single iptables-restore transaction that leaves other rules alone.
+    """
+    tables = []
+    lines = {}
+    for table, action, chain, rule in changes:
+        if table not in lines:
+            tables.append(table)
+            lines[table] = []
+        lines[table].append(' '.join([action, chain] + [quote_restore_arg(arg) for arg in rule]))
+
+    data = []
+    for table in tables:
+        data.append('*%s' % table)
+        data.extend(lines[table])
+        data.append('COMMIT')
+    module.run_command([iptables_restore_path, '--noflush'], data='\n'.join(data), check_rc=True)
+
+
+def converge_rules(module, ip_version):
+    iptables_save_path = module.get_bin_path(SAVE_BINS[ip_version], True)
+    iptables_restore_path = module.get_bin_path(RESTORE_BINS[ip_version], True)
+    ruleset = get_ruleset(iptables_save_path, module, ip_version)
+
+    entry_params = [k for k in module.params if k not in ('ip_version', 'rules')]
+    results = []
+    removals = []
+    appends = []
+    inserts = []
+    for entry in module.params['rules']:
+        if not isinstance(entry, dict):
+            module.fail_json(msg="Every entry of rules must be a dictionary")
+        unsupported = [k for k in entry if k not in entry_params]
+        if unsupported:
+            module.fail_json(msg="Unsupported options in rules entry: %s" % ', '.join(unsupported))
+        # entries do not go through the argument_spec checks, so check their values here
+        for k, v in entry.items():
+            spec = module.argument_spec[k]
+            if v is None:
+                continue
+            if spec.get('type', 'str') == 'str' and (isinstance(v, bool) or not isinstance(v, (basestring, int, float))):
+                module.fail_json(msg="%s must be a string in rules entry: %s" % (k, entry))
+            if spec.get('choices') and v not in spec['choices']:
+                module.fail_json(msg="value of %s must be one of: %s, got: %s in rules entry" % (k, ', '.join(spec['choices']), v))
+        params = dict((k, module.params[k]) for k in entry_params)
+        params.update(entry)
+        for k in ('match', 'ctstate'):
+            if not isinstance(params[k], list):
+                params[k] = [v.strip() for v in str(params[k]).split(',')]
+        for k, v in params.items():
+            if isinstance(v, (int, float)) and not isinstance(v, bool):
+                params[k] = str(v)
+        if not params['chain']:
+            module.fail_json(msg="Every entry of rules needs a chain")
+        if params['set_dscp_mark'] and params['set_dscp_mark_class']:
+            module.fail_json(msg="parameters are mutually exclusive: set_dscp_mark, set_dscp_mark_class")
+
+        rule = construct_rule(params)
+        rules = ruleset.setdefault((params['table'], params['chain']), {})
+        key = normalize_rule(rule, ip_version)
+        rule_is_present = rules.get(key, 0) > 0
+        should_be_present = (params['state'] == 'present')
+        changed = (rule_is_present != should_be_present)
+
+        if changed and should_be_present:
+            rules[key] = 1
+            if params['action'] == 'insert':
+                inserts.append((params['table'], '-I', params['chain'], rule))
+            else:
+                appends.append((params['table'], '-A', params['chain'], rule))
+        elif changed:
+            rules[key] -= 1
+            removals.append((params['table'], '-D', params['chain'], rule))
+
+        results.append(dict(
+            changed=changed,
+            table=params['table'],
+            chain=params['chain'],
+            rule=' '.join(rule),
+            state=params['state'],
+        ))
+
+    # inserted rules go to the top of their chain one after the other, so
+    # insert them in reverse to keep the order they were given in
+    inserts.reverse()
+    changes = removals + appends + inserts
+    if changes and not module.check_mode:
+        restore_rules(iptables_restore_path, module, changes)
+
+    module.exit_json(changed=bool(changes), ip_version=ip_version, rules=results)
+
+
 def main():
     module = AnsibleModule(
         supports_check_mode=True,
@@ -406,7 +716,7 @@ def main():
             state=dict(required=False, default='present', choices=['present', 'absent']),
             action=dict(required=False, default='append', type='str', choices=['append', 'insert']),
             ip_version=dict(required=False, default='ipv4', choices=['ipv4', 'ipv6']),
-            chain=dict(required=True, default=None, type='str'),
+            chain=dict(required=False, default=None, type='str'),
             protocol=dict(required=False, default=None, type='str'),
             source=dict(required=False, default=None, type='str'),
             to_source=dict(required=False, default=None, type='str'),
@@ -431,11 +741,19 @@ def main():
             uid_owner=dict(required=False, default=None, type='str'),
             reject_with=dict(required=False, default=None, type='str'),
             icmp_type=dict(required=False, default=None, type='str'),
+            rules=dict(required=False, default=None, type='list'),
         ),
         mutually_exclusive=(
             ['set_dscp_mark', 'set_dscp_mark_class'],
         ),
+        required_one_of=(
+            ['chain', 'rules'],
+        ),
     )
+
+    if module.params['rules'] is not None:
+        converge_rules(module, module.params['ip_version'])
+
     args = dict(
         changed=False,
         failed=False,
@@ -33,7 +33,8 @@ options:
     aliases: [ 'host' ]
     description:
       - The host to add or remove (must match a host specified in key)
-    required: true
+      - Required unless I(hosts) is given.
+    required: false
     default: null
   key:
     description:
@@ -51,6 +52,16 @@ options:
     choices: [ "present", "absent" ]
     required: no
     default: present
+  hosts:
+    description:
+      - A list of hosts to add or remove, each a dict with a C(name), an optional C(key) and an optional C(state)
+        (defaults to I(state)), with the same meaning as the options of the same name.
+      - The file is read once and all the changes are written back in a single atomic rewrite, which is much
+        faster than one task per host on large C(known_hosts) files.
+      - Mutually exclusive with I(name) and I(key).
+    required: false
+    default: null
+    version_added: "2.3"
 requirements: [ ]
 author: "Matthew Vernon (@mcv21)"
 '''
@@ -61,6 +72,17 @@ EXAMPLES = '''
   known_hosts: path='/etc/ssh/ssh_known_hosts'
                name='foo.com.invalid'
                key="{{ lookup('file', 'pubkeys/foo.com.invalid') }}"
+
+# Manage several hosts with a single rewrite of the known_hosts file
+- known_hosts:
+    path: /etc/ssh/ssh_known_hosts
+    hosts:
+      - name: foo.com.invalid
+        key: "{{ lookup('file', 'pubkeys/foo.com.invalid') }}"
+      - name: bar.com.invalid
+        key: "{{ lookup('file', 'pubkeys/bar.com.invalid') }}"
+      - name: old.com.invalid
+        state: absent
 '''
 
 # Makes sure public host keys are present or absent in the given known_hosts
@@ -72,27 +94,65 @@ EXAMPLES = '''
 #    key = line(s) to add to known_hosts file
 #    path = the known_hosts file to edit (default: ~/.ssh/known_hosts)
 #    state = absent|present (default: present)
+#    hosts = list of dicts with name, key and state, applied in one rewrite
 
 import os
 import os.path
 import tempfile
 import errno
 import re
+import base64
+import binascii
+import hmac
+try:
+    from hashlib import sha1
+except ImportError:
+    # python 2.4 has no hashlib; hmac accepts the sha module instead
+    import sha as sha1
 from ansible.module_utils.pycompat24 import get_exception
 from ansible.module_utils.basic import *
 
 def enforce_state(module, params):
     """
-    Add or remove key.
+    Add or remove key(s).
     """
 
-    host = params["name"]
-    key = params.get("key",None)
-    port = params.get("port",None)
     path = params.get("path")
     state = params.get("state")
-    #Find the ssh-keygen binary
-    sshkeygen = module.get_bin_path("ssh-keygen",True)
+
+    if params.get("hosts"):
+        entries = []
+        for entry in params["hosts"]:
+            if not isinstance(entry, dict) or not (entry.get("name") or entry.get("host")):
+                module.fail_json(msg="Each item in hosts must be a dict with at least a name: %s" % entry)
+            entries.append((entry.get("name") or entry.get("host"), entry.get("key", None), entry.get("state", state)))
+    else:
+        entries = [(params["name"], params.get("key", None), state)]
+
+    for host, key, host_state in entries:
+        if host_state not in ('present', 'absent'):
+            module.fail_json(msg="Invalid state '%s' for host %s" % (host_state, host))
+
+    #The file is read and indexed once; all changes are then made in memory
+    #and written back in a single atomic rewrite.
+    known_hosts = KnownHostsFile(module, path)
+
+    changed = False
+    for host, key, host_state in entries:
+        if enforce_host_state(module, known_hosts, host, key, host_state):
+            changed = True
+
+    if changed and not module.check_mode:
+        known_hosts.write()
+
+    params['changed'] = changed
+    return params
+
+def enforce_host_state(module, known_hosts, host, key, state):
+    """
+    Add or remove the key of a single host in known_hosts. Returns whether
+    anything changed.
+    """
 
     # Trailing newline in files gets lost, so re-add if necessary
     if key and key[-1] != '\n':
@@ -101,143 +161,227 @@ def enforce_state(module, params):
     if key is None and state != "absent":
         module.fail_json(msg="No key specified when adding a host")
 
-    sanity_check(module,host,key,sshkeygen)
+    sanity_check(module,host,key)
 
-    found,replace_or_add,found_line=search_for_host_key(module,host,key,path,sshkeygen)
+    found,replace_or_add,found_line=search_for_host_key(module,host,key,known_hosts)
+
+    #Only remove whole host if found and no key provided
+    if found and key is None and state=="absent":
+        known_hosts.remove_host(host)
+        return True
 
     #We will change state if found==True & state!="present"
     #or found==False & state=="present"
     #i.e found XOR (state=="present")
     #Alternatively, if replace is true (i.e. key present, and we must change it)
-    if module.check_mode:
-        module.exit_json(changed = replace_or_add or (state=="present") != found)
+    if replace_or_add or found != (state=="present"):
+        if found_line is not None and (replace_or_add or state=='absent'):
+            known_hosts.remove_line(found_line) # drop this line to replace its key
+        if state == 'present':
+            known_hosts.append(key)
+        return True
 
-    #Now do the work.
+    return False
 
-    #Only remove whole host if found and no key provided
-    if found and key is None and state=="absent":
-        module.run_command([sshkeygen,'-R',host,'-f',path], check_rc=True)
-        params['changed'] = True
+class KnownHostsFile(object):
+    '''
+    An in-memory copy of a known_hosts file.
 
-    #Next, add a new (or replacing) entry
-    if replace_or_add or found != (state=="present"):
+    Plain hostnames are indexed once when the file is read; hashed entries
+    are matched by computing the HMAC of the looked up host with the salt
+    of each entry, the same way ssh does. Line numbers start at 1, removed
+    lines are kept as None until the file is written back.
+    '''
+
+    def __init__(self, module, path):
+        self.module = module
+        self.path = path
+        self.lines = []
+        self._names = {}
+        self._patterns = []
+        self._hashed = []
+        self._hashed_matches = {}
         try:
-            inf=open(path,"r")
+            inf = open(path, "r")
         except IOError:
-            e = get_exception
-            if e.errno == errno.ENOENT:
-                inf=None
-            else:
+            e = get_exception()
+            if e.errno != errno.ENOENT:
                 module.fail_json(msg="Failed to read %s: %s" % \
                                      (path,str(e)))
+            return
         try:
-            outf=tempfile.NamedTemporaryFile(dir=os.path.dirname(path))
-            if inf is not None:
-                for line_number, line in enumerate(inf, start=1):
-                    if found_line==line_number and (replace_or_add or state=='absent'):
-                        continue # skip this line to replace its key
+            for line in inf:
+                self._add(line)
+        finally:
+            inf.close()
+
+    def _add(self, line):
+        self.lines.append(line)
+        line_number = len(self.lines)
+        entry = parse_known_hosts_line(line)
+        if entry is None:
+            return
+        if 'salt' in entry:
+            self._hashed.append((entry['salt'], entry['digest'], line_number))
+            for host, matches in self._hashed_matches.items():
+                if hash_host(host, entry['salt']) == entry['digest']:
+                    matches.append(line_number)
+        elif re.search(r'[*?!]', entry['hosts']):
+            self._patterns.append((entry['hosts'], line_number))
+        else:
+            for name in entry['hosts'].lower().split(','):
+                self._names.setdefault(name, []).append(line_number)
+
+    def line(self, line_number):
+        return self.lines[line_number - 1]
+
+    def lookup(self, host):
+        '''Return the numbers of the lines matching host, in file order.'''
+        matches = set(self._names.get(host.lower(), ()))
+        for patterns, line_number in self._patterns:
+            if match_host_patterns(patterns, host):
+                matches.add(line_number)
+        if host not in self._hashed_matches:
+            self._hashed_matches[host] = [line_number for salt, digest, line_number in self._hashed
+                                          if hash_host(host, salt) == digest]
+        matches.update(self._hashed_matches[host])
+        return sorted(n for n in matches if self.line(n) is not None)
+
+    def remove_line(self, line_number):
+        self.lines[line_number - 1] = None
+
+    def remove_host(self, host):
+        for line_number in self.lookup(host):
+            self.remove_line(line_number)
+
+    def append(self, key):
+        for index in range(len(self.lines) - 1, -1, -1):
+            line = self.lines[index]
+            if line is not None:
+                if not line.endswith('\n'):
+                    self.lines[index] = line + '\n'
+                break
+        for line in key.splitlines(True):
+            self._add(line)
+
+    def write(self):
+        path = self.path
+        try:
+            outf=tempfile.NamedTemporaryFile(mode='w', dir=os.path.dirname(path))
+            for line in self.lines:
+                if line is not None:
                     outf.write(line)
-                inf.close()
-            if state == 'present':
-                outf.write(key)
             outf.flush()
-            module.atomic_move(outf.name,path)
+            self.module.atomic_move(outf.name,path)
         except (IOError,OSError):
             e = get_exception()
-            module.fail_json(msg="Failed to write to file %s: %s" % \
-                                 (path,str(e)))
+            self.module.fail_json(msg="Failed to write to file %s: %s" % \
+                                      (path,str(e)))
 
         try:
             outf.close()
         except:
             pass
 
-        params['changed'] = True
-
-    return params
-
-def sanity_check(module,host,key,sshkeygen):
+def parse_known_hosts_line(line):
+    '''
+    Parse a known_hosts line into a dict with the optional marker, the host
+    field, the key type and the key. Hashed host fields (|1|salt|hash) also
+    get their decoded salt and digest. Returns None for blank lines, comments
+    and lines that cannot be parsed.
+    '''
+    fields = line.split()
+    if not fields or fields[0].startswith('#'):
+        return None
+    entry = dict(marker=None)
+    #The optional "marker" field, used for @cert-authority or @revoked
+    if fields[0].startswith('@'):
+        entry['marker'] = fields.pop(0)
+    if len(fields) < 3:
+        return None
+    entry['hosts'], entry['type'], entry['key'] = fields[:3]
+    if entry['hosts'].startswith('|1|'):
+        try:
+            salt, digest = entry['hosts'][3:].split('|')
+            entry['salt'] = base64.b64decode(salt)
+            entry['digest'] = base64.b64decode(digest)
+        except (ValueError, TypeError, binascii.Error):
+            return None
+    return entry
+
+def hash_host(host, salt):
+    '''Hash host the way ssh does for HashKnownHosts entries.'''
+    return hmac.new(salt, host.encode('utf-8'), sha1).digest()
+
+def match_host_patterns(patterns, host):
+    '''
+    Match host against a comma-separated list of hostname patterns, which
+    may use the * and ? wildcards and be negated with !, see sshd(8).
+    '''
+    host = host.lower()
+    matched = False
+    for pattern in patterns.lower().split(','):
+        negated = pattern.startswith('!')
+        if negated:
+            pattern = pattern[1:]
+        regex = re.escape(pattern).replace('\\*', '.*').replace('\\?', '.')
+        if re.match('^%s$' % regex, host):
+            if negated:
+                return False
+            matched = True
+    return matched
+
+def host_matches_entry(host, entry):
+    if 'salt' in entry:
+        return hash_host(host, entry['salt']) == entry['digest']
+    return match_host_patterns(entry['hosts'], host)
+
+def sanity_check(module,host,key):
     '''Check supplied key is sensible
 
     host and key are parameters provided by the user; If the host
     provided is inconsistent with the key supplied, then this function
     quits, providing an error to the user.
-    sshkeygen is the path to ssh-keygen, found earlier with get_bin_path
     '''
     #If no key supplied, we're doing a removal, and have nothing to check here.
     if key is None:
         return
-    #Rather than parsing the key ourselves, get ssh-keygen to do it
-    #(this is essential for hashed keys, but otherwise useful, as the
-    #key question is whether ssh-keygen thinks the key matches the host).
-
-    #The approach is to write the key to a temporary file,
-    #and then attempt to look up the specified host in that file.
-    try:
-        outf=tempfile.NamedTemporaryFile()
-        outf.write(key)
-        outf.flush()
-    except IOError:
-        e = get_exception()
-        module.fail_json(msg="Failed to write to temporary file %s: %s" % \
-                             (outf.name,str(e)))
-    rc,stdout,stderr=module.run_command([sshkeygen,'-F',host,
-                                         '-f',outf.name],
-                                        check_rc=True)
-    try:
-        outf.close()
-    except:
-        pass
-
-    if stdout=='': #host not found
-        module.fail_json(msg="Host parameter does not match hashed host field in supplied key")
-
-def search_for_host_key(module,host,key,path,sshkeygen):
-    '''search_for_host_key(module,host,key,path,sshkeygen) -> (found,replace_or_add,found_line)
-
-    Looks up host and keytype in the known_hosts file path; if it's there, looks to see
+    #The key question is whether ssh would match the key to the host, so
+    #hashed host fields are checked by hashing host with their salt.
+    for line in key.splitlines():
+        entry = parse_known_hosts_line(line)
+        if entry is not None and host_matches_entry(host, entry):
+            return
+
+    module.fail_json(msg="Host parameter does not match hashed host field in supplied key")
+
+def search_for_host_key(module,host,key,known_hosts):
+    '''search_for_host_key(module,host,key,known_hosts) -> (found,replace_or_add,found_line)
+
+    Looks up host and keytype in the known_hosts file; if it's there, looks to see
     if one of those entries matches key. Returns:
-    found (Boolean): is host found in path?
-    replace_or_add (Boolean): is the key in path different to that supplied by user?
+    found (Boolean): is host found in known_hosts?
+    replace_or_add (Boolean): is the key in known_hosts different to that supplied by user?
     found_line (int or None): the line where a key of the same type was found
     if found=False, then replace is always False.
-    sshkeygen is the path to ssh-keygen, found earlier with get_bin_path
+    known_hosts is the KnownHostsFile read earlier
     '''
-    if os.path.exists(path)==False:
-        return False, False, None
-    #openssh >=6.4 has changed ssh-keygen behaviour such that it returns
-    #1 if no host is found, whereas previously it returned 0
-    rc,stdout,stderr=module.run_command([sshkeygen,'-F',host,'-f',path],
-                                 check_rc=False)
-    if stdout=='' and stderr=='' and (rc==0 or rc==1):
-        return False, False, None #host not found, no other errors
-    if rc!=0: #something went wrong
-        module.fail_json(msg="ssh-keygen failed (rc=%d,stdout='%s',stderr='%s')" % (rc,stdout,stderr))
+    lines = known_hosts.lookup(host)
+    if not lines:
+        return False, False, None #host not found
 
     #If user supplied no key, we don't want to try and replace anything with it
     if key is None:
         return True, False, None
 
-    lines=stdout.split('\n')
     new_key = normalize_known_hosts_key(key, host)
 
-    for l in lines:
-        if l=='':
-            continue
-        elif l[0]=='#': # info output from ssh-keygen; contains the line number where key was found
-            try:
-                # This output format has been hardcoded in ssh-keygen since at least OpenSSH 4.0
-                # It always outputs the non-localized comment before the found key
-                found_line = int(re.search(r'found: line (\d+)', l).group(1))
-            except IndexError:
-                e = get_exception()
-                module.fail_json(msg="failed to parse output of ssh-keygen for line number: '%s'" % l)
-        else:
-            found_key = normalize_known_hosts_key(l,host)
-            if new_key==found_key: #found a match
-                return True, False, found_line  #found exactly the same key, don't replace
-            elif new_key['type'] == found_key['type']: # found a different key for the same key type
-                return True, True, found_line
+    for found_line in lines:
+        found_key = normalize_known_hosts_key(known_hosts.line(found_line),host)
+        if new_key==found_key: #found a match
+            return True, False, found_line  #found exactly the same key, don't replace
+        elif new_key['type'] == found_key['type']: # found a different key for the same key type
+            return True, True, found_line
     #No match found, return found and replace, but no line
     return True, True, None
 
@@ -269,11 +413,14 @@ def main():
 
     module = AnsibleModule(
         argument_spec = dict(
-            name      = dict(required=True,  type='str', aliases=['host']),
+            name      = dict(required=False, type='str', aliases=['host']),
             key       = dict(required=False,  type='str'),
             path      = dict(default="~/.ssh/known_hosts", type='path'),
             state     = dict(default='present', choices=['absent','present']),
+            hosts     = dict(required=False, type='list'),
             ),
+        required_one_of = [['name', 'hosts']],
+        mutually_exclusive = [['name', 'hosts'], ['key', 'hosts']],
         supports_check_mode = True
         )
 